@@ -22,6 +22,9 @@ const clearAuthStorage = () => {
 const DASH_PERIOD_KEY = "dashboardPeriod";
 const DASH_RANGE_KEY = "dashboardRange";
 
+// History / Export page through the full ledger in chunks of this size
+const ALL_EXPENSES_PAGE_SIZE = 1000;
+
 const readJSON = (key, fallback) => {
   try {
     const raw = getStored(key);
@@ -65,6 +68,8 @@ export function GlobalProvider({ children }) {
     const qs = new URLSearchParams();
     if (params.from) qs.set("from", params.from);
     if (params.to) qs.set("to", params.to);
+    if (params.limit) qs.set("limit", params.limit);
+    if (params.cursor) qs.set("cursor", params.cursor);
     return qs.toString() ? `${API_BASE}/api/expenses?${qs.toString()}` : `${API_BASE}/api/expenses`;
   };
 
@@ -171,14 +176,24 @@ export function GlobalProvider({ children }) {
     setAllExpensesError("");
 
     try {
-      const res = await fetch(buildExpensesUrl({}), { headers: authHeaders() });
-      const payload = await safeJson(res);
+      // ✅ keyset paging: follow next_cursor until the server says there is no more
+      const rows = [];
+      let cursor = "";
+      let payload = null;
 
-      if (!res.ok) throw new Error(payload?.message || "Failed to load expenses");
-      if (seq !== allExpensesReqSeqRef.current) return { ok: true, stale: true };
+      do {
+        const res = await fetch(buildExpensesUrl({ limit: ALL_EXPENSES_PAGE_SIZE, cursor }), { headers: authHeaders() });
+        payload = await safeJson(res);
 
-      setAllExpenses(Array.isArray(payload?.expenses) ? payload.expenses : []);
-      return { ok: true, payload };
+        if (!res.ok) throw new Error(payload?.message || "Failed to load expenses");
+        if (seq !== allExpensesReqSeqRef.current) return { ok: true, stale: true };
+
+        if (Array.isArray(payload?.expenses)) rows.push(...payload.expenses);
+        cursor = payload?.next_cursor || "";
+      } while (cursor);
+
+      setAllExpenses(rows);
+      return { ok: true, payload: { ...payload, expenses: rows } };
     } catch (e) {
       const msg = e?.message || "Failed to load expenses";
       setAllExpensesError(msg);
@@ -188,6 +203,29 @@ export function GlobalProvider({ children }) {
     }
   };
 
+  // ✅ server-side streamed export (csv | ndjson | json) -> Blob
+  const downloadExpensesExport = async ({ format = "csv", from, to, categories = [], includeNotes = true } = {}) => {
+    const t = getUserToken();
+    if (!t) return { ok: false, message: "No token" };
+
+    const qs = new URLSearchParams({ format });
+    if (from) qs.set("from", from);
+    if (to) qs.set("to", to);
+    for (const c of categories) qs.append("category", c);
+    if (!includeNotes) qs.set("notes", "0");
+
+    try {
+      const res = await fetch(`${API_BASE}/api/expenses/export?${qs.toString()}`, { headers: authHeaders() });
+      if (!res.ok) {
+        const payload = await safeJson(res);
+        throw new Error(payload?.message || "Export failed");
+      }
+      return { ok: true, blob: await res.blob() };
+    } catch (e) {
+      return { ok: false, message: e?.message || "Export failed" };
+    }
+  };
+
   const prependExpense = (created) => {
     if (!created) return;
     setExpenses((prev) => [created, ...prev]);
@@ -242,6 +280,59 @@ export function GlobalProvider({ children }) {
     setBudgetsError("");
   };
 
+  // =======================================
+  // Dashboard: expenses + budgets + categories in one request
+  // =======================================
+  // last body and ETag per section; sections the server reports unchanged come from here
+  const dashboardCacheRef = useRef({ etags: {}, sections: {} });
+
+  const fetchDashboard = async (params = {}) => {
+    const t = getUserToken();
+    if (!t) return { ok: false, message: "No token" };
+
+    const seq = ++expensesReqSeqRef.current;
+    setExpensesLoading(true);
+    setBudgetsLoading(true);
+    setExpensesError("");
+    setBudgetsError("");
+
+    try {
+      const qs = new URLSearchParams();
+      if (params.from) qs.set("from", params.from);
+      if (params.to) qs.set("to", params.to);
+
+      const cache = dashboardCacheRef.current;
+      const held = Object.values(cache.etags).map((tag) => `W/"${tag}"`);
+      const headers = held.length ? { ...authHeaders(), "If-None-Match": held.join(", ") } : authHeaders();
+
+      const res = await fetch(`${API_BASE}/api/dashboard?${qs.toString()}`, { headers });
+      const payload = res.status === 304 ? { unchanged: Object.keys(cache.etags) } : await safeJson(res);
+      if (!res.ok && res.status !== 304) throw new Error(payload?.message || "Failed to load dashboard");
+
+      const unchanged = new Set(payload?.unchanged || []);
+      const sections = {};
+      for (const name of ["expenses", "budgets", "categories"]) {
+        const body = unchanged.has(name) ? cache.sections[name] : payload?.[name];
+        sections[name] = Array.isArray(body) ? body : [];
+      }
+      if (payload?.etags) {
+        dashboardCacheRef.current = { etags: payload.etags, sections };
+      }
+
+      if (seq === expensesReqSeqRef.current) setExpenses(sections.expenses);
+      setBudgets(sections.budgets);
+      return { ok: true, categories: sections.categories };
+    } catch (e) {
+      const msg = e?.message || "Failed to load dashboard";
+      setExpensesError(msg);
+      setBudgetsError(msg);
+      return { ok: false, message: msg };
+    } finally {
+      setExpensesLoading(false);
+      setBudgetsLoading(false);
+    }
+  };
+
   // ---------------------------------------
   // Auth functions
   // ---------------------------------------
@@ -399,6 +490,7 @@ export function GlobalProvider({ children }) {
       allExpensesLoading,
       allExpensesError,
       fetchAllExpenses,
+      downloadExpensesExport,
 
       prependExpense,
       clearExpenses,
@@ -410,6 +502,9 @@ export function GlobalProvider({ children }) {
       fetchBudgets,
       prependBudget,
       clearBudgets,
+
+      // ✅ dashboard (expenses + budgets + categories)
+      fetchDashboard,
     }),
     [
       isAuthenticated,
@@ -366,7 +366,7 @@ export default function Dashboard() {
     budgets,
     budgetsLoading,
     budgetsError,
-    fetchBudgets,
+    fetchDashboard,
   } = useGlobal();
 
   const [pageError, setPageError] = useState("");
@@ -420,31 +420,6 @@ export default function Dashboard() {
     return { from: "", to: "" };
   }
 
-  const fetchCategories = async () => {
-    const token = getUserToken();
-    if (!token) return;
-
-    setCategoriesLoading(true);
-    try {
-      const res = await fetch(`${API_BASE}/api/settings/categories`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      const payload = await res.json().catch(() => null);
-      if (!res.ok) throw new Error(payload?.message || "Failed to load categories");
-
-      const cats = Array.isArray(payload?.categories) ? payload.categories : [];
-      setCategories(cats);
-
-      if (!expenseForm.category && cats.length) {
-        setExpenseForm((p) => ({ ...p, category: cats[0].name }));
-      }
-    } catch (e) {
-      setPageError(e?.message || "Failed to load categories");
-    } finally {
-      setCategoriesLoading(false);
-    }
-  };
-
   const addNewCategory = async (name) => {
     const token = getUserToken();
     if (!token) throw new Error("No token");
@@ -486,8 +461,16 @@ export default function Dashboard() {
     setPageError("");
     (async () => {
       try {
-        await Promise.all([fetchBudgets(), fetchExpenses(buildExpenseQueryForPeriod())]);
-        await fetchCategories();
+        // one request for all three; /api/dashboard loads them concurrently server-side
+        setCategoriesLoading(true);
+        const res = await fetchDashboard(buildExpenseQueryForPeriod());
+        setCategoriesLoading(false);
+        if (!res.ok) throw new Error(res.message);
+
+        setCategories(res.categories);
+        if (!expenseForm.category && res.categories.length) {
+          setExpenseForm((p) => ({ ...p, category: res.categories[0].name }));
+        }
       } catch (e) {
         setPageError(e?.message || "Failed to load dashboard data");
       }
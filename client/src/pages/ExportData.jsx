@@ -92,6 +92,7 @@ export default function ExportData() {
     allExpensesLoading,
     allExpensesError,
     fetchAllExpenses,
+    downloadExpensesExport,
     categories: dbCategories, // optional: from settings/categories API (array of {name,color} or array of strings)
   } = useGlobal();
 
@@ -303,8 +304,7 @@ export default function ExportData() {
     return JSON.stringify(data, null, 2);
   };
 
-  const downloadTextFile = (content, mimeType, extension) => {
-    const blob = new Blob([content], { type: mimeType });
+  const downloadBlob = (blob, extension) => {
     const url = URL.createObjectURL(blob);
     const a = document.createElement("a");
     a.href = url;
@@ -315,6 +315,21 @@ export default function ExportData() {
     URL.revokeObjectURL(url);
   };
 
+  const downloadTextFile = (content, mimeType, extension) => downloadBlob(new Blob([content], { type: mimeType }), extension);
+
+  // ✅ CSV / JSON are streamed by the server (no need to build the file from every row in memory)
+  const downloadFromServer = async (format, extension) => {
+    const r = await downloadExpensesExport({
+      format,
+      from: selectedRange === "all" ? "" : activeRange.from,
+      to: selectedRange === "all" ? "" : activeRange.to,
+      categories: selectedCategories.includes("All") ? [] : selectedCategories,
+      includeNotes,
+    });
+    if (!r.ok) throw new Error(r.message);
+    downloadBlob(r.blob, extension);
+  };
+
   const handleExport = async () => {
     setIsExporting(true);
     setExportSuccess(false);
@@ -325,9 +340,9 @@ export default function ExportData() {
       if (customRangeInvalid) throw new Error("Start date cannot be after end date.");
 
       if (selectedFormat === "csv") {
-        downloadTextFile(generateCSV(), "text/csv;charset=utf-8", "csv");
+        await downloadFromServer("csv", "csv");
       } else if (selectedFormat === "json") {
-        downloadTextFile(generateJSON(), "application/json;charset=utf-8", "json");
+        await downloadFromServer("json", "json");
       } else if (selectedFormat === "pdf") {
         const html = `<!doctype html>
 <html>
@@ -370,10 +385,8 @@ ${includeNotes ? `<td>${(e.notes || "").replace(/</g, "&lt;")}</td>` : ""}
 </body>
 </html>`;
         downloadTextFile(html, "text/html;charset=utf-8", "html");
-      } else if (selectedFormat === "excel") {
-        downloadTextFile(generateCSV(), "text/csv;charset=utf-8", "csv");
       } else {
-        downloadTextFile(generateCSV(), "text/csv;charset=utf-8", "csv");
+        await downloadFromServer("csv", "csv");
       }
 
       setExportSuccess(true);
@@ -7,14 +7,26 @@ load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 from app.config import Config
 from app.extensions import cors
-from app.db.mongo import init_mongo
+from app.utils.json_provider import init_json
+from app.db.mongo import init_mongo, get_db
+from app.utils.instrumentation import init_instrumentation
+from app.db.indexes import init_indexes, register_index_commands
 from app.routes import register_routes
+from app.commands import register_commands
+from app.model.settingsModel.settings_model import configure_category_cache
+from app.utils.auth import configure_auth_cache
+from app.model.authModel.user_model import configure_profile_cache
+from app.utils.passwords import configure_from_config as configure_password_hashing
+from app.model.expenseModel.expense_schema import configure_expense_schema
+from app.model.ownerModel.owner_model import configure_owner_key
+from app.utils.dashboard import configure_dashboard_pool
 
 def create_app():
     load_dotenv()  # loads .env
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_json(app)
 
     # CORS (allow React dev server)
     cors.init_app(app, resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS") or "*"}})
@@ -22,7 +34,47 @@ def create_app():
     # Mongo init
     init_mongo(app)
 
+    # Metrics hooks + command listener (before anything creates the Mongo client)
+    init_instrumentation(app)
+
+    # Indexes: once per process, never per request
+    init_indexes(app, get_db(app))
+    register_index_commands(app)
+
+    # Caches
+    configure_category_cache(
+        maxsize=app.config.get("CATEGORY_CACHE_MAX_ENTRIES"),
+        ttl=app.config.get("CATEGORY_CACHE_TTL_SECONDS"),
+    )
+    configure_auth_cache(
+        maxsize=app.config.get("AUTH_CACHE_MAX_ENTRIES"),
+        ttl=app.config.get("AUTH_CACHE_TTL_SECONDS"),
+        revocation_refresh=app.config.get("AUTH_REVOCATION_REFRESH_SECONDS"),
+    )
+    configure_profile_cache(
+        maxsize=app.config.get("PROFILE_CACHE_MAX_ENTRIES"),
+        ttl=app.config.get("PROFILE_CACHE_TTL_SECONDS"),
+    )
+
+    # Expense documents: v1 + v2 reads until the migration has run
+    configure_expense_schema(dual_read=app.config.get("EXPENSE_DUAL_READ"))
+
+    # Owner key: which of userEmail / uid queries filter on, and whether userEmail is still written
+    configure_owner_key(
+        read_key=app.config.get("OWNER_READ_KEY"),
+        write_email=app.config.get("OWNER_WRITE_EMAIL"),
+    )
+
+    # Password hashing scheme/cost + bounded hashing pool
+    configure_password_hashing(app.config)
+
+    # GET /api/dashboard section loaders
+    configure_dashboard_pool(workers=app.config.get("DASHBOARD_WORKERS"))
+
     # Routes
     register_routes(app)
 
+    # CLI
+    register_commands(app)
+
     return app
@@ -0,0 +1,336 @@
+# app/async_app.py
+"""
+Optional ASGI serving mode (Quart + PyMongo async) for the read-heavy dashboard
+endpoints. Each request awaits Mongo instead of parking a worker thread, so one
+process can hold many concurrent dashboard loads.
+
+Run with:  hypercorn asgi:app   (pip install -r requirements-async.txt)
+
+Validation and query building are shared with the Flask app through the model
+build_* helpers; only the driver calls live in the *_async model modules.
+"""
+import asyncio
+from functools import wraps
+
+from quart import Quart, current_app, g, jsonify, make_response, request
+
+from app.config import Config
+from app.db.mongo_async import close_async_mongo, get_async_db, init_async_mongo
+from app.model.budgetModel.budget_model import budget_months, next_budget_cursor
+from app.model.budgetModel import budget_model_async
+from app.model.expenseModel.expense_model import SyncTokenExpired, next_expense_cursor, with_budget
+from app.model.expenseModel import expense_model_async
+from app.model.expenseModel.expense_schema import configure_expense_schema
+from app.model.ownerModel.owner_model import configure_owner_key, to_uid
+from app.model.settingsModel import settings_model_async
+from app.model.settingsModel.settings_model import configure_category_cache
+from app.model.versionModel.version_model import BUDGETS, EXPENSES, SETTINGS, VERSIONS_COLLECTION, build_etag
+from app.model.versionModel import version_model_async
+from app.utils.auth import (
+    REVOKED_COLLECTION,
+    apply_revocations,
+    cached_claims,
+    claims_for,
+    configure_auth_cache,
+    get_jwt_secret,
+    is_revoked_locally,
+    revocations_query,
+    token_digest,
+)
+from app.utils.dashboard import SECTIONS, combined_etag, section_etags, unchanged_sections
+from app.utils.json_provider import init_json
+from app.utils.periods import range_from_args
+
+
+def require_auth(fn):
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        auth = request.headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return jsonify({"success": False, "message": "Missing Bearer token"}), 401
+        token = auth.split(" ", 1)[1].strip()
+        secret = get_jwt_secret(current_app.config)
+        try:
+            revoked_col = get_async_db(current_app)[REVOKED_COLLECTION]
+            query = revocations_query()
+            if query is not None:
+                apply_revocations(await revoked_col.find(*query).to_list(None))
+            digest = token_digest(token)
+            claims = None if is_revoked_locally(digest) else cached_claims(token, secret)
+            if claims is None:
+                revoked = is_revoked_locally(digest) or (
+                    await revoked_col.find_one({"_id": digest}, {"_id": 1}) is not None
+                )
+                claims = claims_for(token, secret, revoked)
+            g.user = claims
+        except Exception:
+            return jsonify({"success": False, "message": "Invalid or expired token"}), 401
+        return await fn(*args, **kwargs)
+    return wrapper
+
+
+def get_authed_email():
+    u = getattr(g, "user", {}) or {}
+    return (u.get("email") or "").strip().lower()
+
+
+def get_authed_uid():
+    u = getattr(g, "user", {}) or {}
+    return to_uid(u.get("uid"))
+
+
+def conditional_get(*names):
+    """
+    Async twin of app/utils/conditional.py: same version counters and the same ETag
+    as the Flask route for the same URL, so a client can switch modes without a refetch.
+    Use below @require_auth.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            userEmail = get_authed_email()
+            db = get_async_db(current_app)
+            versions = await version_model_async.get_versions(db[VERSIONS_COLLECTION], userEmail, names)
+            etag = build_etag(userEmail, versions, request.full_path)
+
+            if request.if_none_match.contains_weak(etag):
+                resp = current_app.response_class("", status=304)
+                resp.set_etag(etag, weak=True)
+                resp.headers["Cache-Control"] = "private, no-cache"
+                return resp
+
+            resp = await make_response(await fn(*args, **kwargs))
+            if resp.status_code == 200:
+                resp.set_etag(etag, weak=True)
+                resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return wrapper
+    return decorator
+
+
+def _register_routes(app):
+    @app.get("/api/health")
+    async def health():
+        await app.extensions["async_mongo_client"].admin.command("ping")
+        return jsonify({"status": "ok", "db": get_async_db(app).name, "mode": "asgi"})
+
+    @app.get("/api/expenses")
+    @require_auth
+    @conditional_get(EXPENSES)
+    async def list_expenses():
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        limit = request.args.get("limit", 200)
+        try:
+            date_from, date_to = range_from_args(request.args)
+            items = await expense_model_async.get_expenses(
+                get_async_db(app)["expenses"],
+                userEmail=userEmail,
+                uid=uid,
+                date_from=date_from,
+                date_to=date_to,
+                limit=limit,
+                skip=request.args.get("skip", 0),
+                cursor=request.args.get("cursor"),
+                categories=request.args.getlist("category"),
+                min_amount=request.args.get("min"),
+                max_amount=request.args.get("max"),
+                q=request.args.get("q"),
+            )
+            return jsonify({"success": True, "expenses": items, "next_cursor": next_expense_cursor(items, limit)}), 200
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.get("/api/expenses/changes")
+    @require_auth
+    async def expense_changes():
+        db = get_async_db(app)
+        try:
+            res = await expense_model_async.get_expense_changes(
+                db["expenses"],
+                db["expense_tombstones"],
+                userEmail=get_authed_email(),
+                uid=get_authed_uid(),
+                since=request.args.get("since"),
+                limit=request.args.get("limit", 500),
+            )
+            return jsonify({"success": True, **res}), 200
+        except SyncTokenExpired as e:
+            return jsonify({"success": False, "message": str(e)}), 410
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.get("/api/expenses/summary")
+    @require_auth
+    @conditional_get(EXPENSES, BUDGETS)
+    async def expenses_summary():
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        try:
+            date_from, date_to = range_from_args(request.args)
+            db = get_async_db(app)
+            summary, budget = await asyncio.gather(
+                expense_model_async.summarize_expenses(
+                    db["expenses"], userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to
+                ),
+                budget_model_async.sum_budgets(
+                    db["budgets"], userEmail=userEmail, uid=uid, **budget_months(date_from, date_to)
+                ),
+            )
+            return jsonify({"success": True, "summary": with_budget(summary, budget, date_from, date_to)}), 200
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.post("/api/expenses/add")
+    @require_auth
+    async def add_expense():
+        data = await request.get_json(silent=True) or {}
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        db = get_async_db(app)
+        try:
+            allowed = await settings_model_async.get_allowed_categories(db["settings"], userEmail, uid=uid)
+            exp = await expense_model_async.create_expense(
+                db["expenses"],
+                userEmail=userEmail,
+                uid=uid,
+                title=data.get("title"),
+                amount=data.get("amount"),
+                category=data.get("category"),
+                date=data.get("date"),
+                notes=data.get("notes", ""),
+                allowed_categories=allowed,
+                rollups_col=db["expense_rollups"],
+            )
+            return jsonify({"success": True, "message": "Expense added", "expense": exp}), 201
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.get("/api/budgets")
+    @require_auth
+    @conditional_get(BUDGETS)
+    async def list_all_budgets():
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        limit = request.args.get("limit", 200)
+        try:
+            items = await budget_model_async.list_budgets(
+                get_async_db(app)["budgets"],
+                userEmail=userEmail,
+                uid=uid,
+                month=request.args.get("month"),
+                limit=limit,
+                skip=request.args.get("skip", 0),
+                cursor=request.args.get("cursor"),
+            )
+            return jsonify({"success": True, "budgets": items, "next_cursor": next_budget_cursor(items, limit)}), 200
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.get("/api/settings/categories")
+    @require_auth
+    @conditional_get(SETTINGS)
+    async def get_categories():
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        try:
+            cats = await settings_model_async.list_categories(get_async_db(app)["settings"], userEmail, uid=uid)
+            return jsonify({"success": True, "categories": cats}), 200
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+    @app.get("/api/dashboard")
+    @require_auth
+    async def dashboard():
+        userEmail = get_authed_email()
+        uid = get_authed_uid()
+        limit = request.args.get("limit", 200)
+        try:
+            date_from, date_to = range_from_args(request.args)
+            db = get_async_db(app)
+            versions = await version_model_async.get_versions(db[VERSIONS_COLLECTION], userEmail, SECTIONS.values())
+            etags = section_etags(userEmail, versions, {"expenses": f"{date_from}|{date_to}|{limit}"})
+            etag = combined_etag(etags)
+
+            unchanged = unchanged_sections(request.if_none_match, etags)
+            if len(unchanged) == len(SECTIONS):
+                resp = app.response_class("", status=304)
+            else:
+                loaders = {
+                    "expenses": lambda: expense_model_async.get_expenses(
+                        db["expenses"], userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to, limit=limit
+                    ),
+                    "budgets": lambda: budget_model_async.list_budgets(db["budgets"], userEmail=userEmail, uid=uid),
+                    "categories": lambda: settings_model_async.list_categories(db["settings"], userEmail, uid=uid),
+                }
+                names = [name for name in loaders if name not in unchanged]
+                data = dict(zip(names, await asyncio.gather(*(loaders[name]() for name in names))))
+                resp = jsonify({
+                    "success": True,
+                    **{name: data.get(name) for name in SECTIONS},
+                    "next_cursor": next_expense_cursor(data["expenses"], limit) if "expenses" in data else None,
+                    "etags": etags,
+                    "unchanged": sorted(unchanged),
+                })
+            resp.set_etag(etag, weak=True)
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        except Exception:
+            return jsonify({"success": False, "message": "Server error"}), 500
+
+
+def create_async_app():
+    app = Quart(__name__)
+    app.config.from_object(Config)
+    init_json(app)
+
+    configure_category_cache(
+        maxsize=app.config.get("CATEGORY_CACHE_MAX_ENTRIES"),
+        ttl=app.config.get("CATEGORY_CACHE_TTL_SECONDS"),
+    )
+    configure_auth_cache(
+        maxsize=app.config.get("AUTH_CACHE_MAX_ENTRIES"),
+        ttl=app.config.get("AUTH_CACHE_TTL_SECONDS"),
+        revocation_refresh=app.config.get("AUTH_REVOCATION_REFRESH_SECONDS"),
+    )
+    configure_expense_schema(dual_read=app.config.get("EXPENSE_DUAL_READ"))
+    configure_owner_key(
+        read_key=app.config.get("OWNER_READ_KEY"),
+        write_email=app.config.get("OWNER_WRITE_EMAIL"),
+    )
+
+    @app.before_serving
+    async def _startup():
+        await init_async_mongo(app)
+
+    @app.after_serving
+    async def _shutdown():
+        await close_async_mongo(app)
+
+    # CORS (same origins as the Flask app)
+    origins = app.config.get("CORS_ORIGINS") or []
+
+    @app.after_request
+    async def _cors(resp):
+        origin = request.headers.get("Origin")
+        if origin and (not origins or origin in origins):
+            resp.headers["Access-Control-Allow-Origin"] = origin
+            resp.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
+            resp.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
+            resp.headers["Vary"] = "Origin"
+        return resp
+
+    _register_routes(app)
+    return app
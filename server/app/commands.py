@@ -0,0 +1,116 @@
+# app/commands.py
+"""
+Maintenance commands, run with `flask --app run <group> <command>`.
+"""
+import click
+
+from app.db.indexes import retire_email_indexes
+from app.db.mongo import get_db
+from app.model.expenseModel.expense_model import backfill_search_terms, migrate_expenses_v2
+from app.model.ownerModel.owner_model import OWNER_COLLECTIONS, backfill_owner_uid, resolve_uid
+from app.model.rollupModel.rollup_model import rebuild_rollups, verify_rollups
+
+
+def _owner_args(db, user_email):
+    if not user_email:
+        return {}
+    return {"userEmail": user_email, "uid": resolve_uid(db["users"], user_email)}
+
+
+def register_commands(app):
+    @app.cli.group("rollups")
+    def rollups_group():
+        """Maintain the expense_rollups collection."""
+
+    @rollups_group.command("rebuild")
+    @click.option("--user", "user_email", default=None, help="Only rebuild this user's buckets.")
+    def rollups_rebuild(user_email):
+        """Recompute monthly rollups from raw expenses."""
+        db = get_db(app)
+        n = rebuild_rollups(db["expenses"], db["expense_rollups"], **_owner_args(db, user_email))
+        click.echo(f"Wrote {n} rollup buckets")
+
+    @rollups_group.command("verify")
+    @click.option("--user", "user_email", default=None, help="Only verify this user's buckets.")
+    def rollups_verify(user_email):
+        """Compare stored rollups against raw expenses; exits 1 on mismatch."""
+        db = get_db(app)
+        diffs = verify_rollups(db["expenses"], db["expense_rollups"], **_owner_args(db, user_email))
+        for d in diffs:
+            click.echo(
+                f"{d['userEmail']} {d['month']} {d['category']}: "
+                f"expected {d['expected']['total']:.2f}/{d['expected']['count']} "
+                f"got {d['actual']['total']:.2f}/{d['actual']['count']}"
+            )
+        if diffs:
+            raise SystemExit(1)
+        click.echo("Rollups OK")
+
+    @app.cli.group("expenses")
+    def expenses_group():
+        """Maintain the expenses collection."""
+
+    @expenses_group.command("migrate-v2")
+    @click.option("--batch-size", default=1000, show_default=True, help="Documents per bulk_write.")
+    @click.option("--user", "user_email", default=None, help="Only migrate this user's expenses.")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoint and scan from the first _id.")
+    def expenses_migrate_v2(batch_size, user_email, restart):
+        """Rewrite legacy (v1) expenses as schema v2; resumable."""
+        db = get_db(app)
+        stats = migrate_expenses_v2(
+            db["expenses"], meta_col=db["_meta"], batch_size=batch_size, userEmail=user_email, restart=restart
+        )
+        click.echo(
+            f"Scanned {stats['scanned']}, upgraded {stats['upgraded']}, "
+            f"errors {stats['errors']} (last _id {stats['lastId']})"
+        )
+        if stats["errors"]:
+            raise SystemExit(1)
+
+    @expenses_group.command("index-terms")
+    @click.option("--batch-size", default=1000, show_default=True, help="Documents per bulk_write.")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoint and scan from the first _id.")
+    def expenses_index_terms(batch_size, restart):
+        """Add search terms to expenses written before search existed; resumable."""
+        db = get_db(app)
+        stats = backfill_search_terms(db["expenses"], meta_col=db["_meta"], batch_size=batch_size, restart=restart)
+        click.echo(f"Scanned {stats['scanned']}, indexed {stats['updated']} (last _id {stats['lastId']})")
+
+    @app.cli.group("owner-key")
+    def owner_key_group():
+        """Move per-user documents from the userEmail owner key to uid."""
+
+    def _echo_stats(stats, verb):
+        for name, st in stats.items():
+            click.echo(f"{name:<20}scanned {st['scanned']}, {verb} {st['updated']}, orphans {st['orphans']}")
+
+    @owner_key_group.command("backfill")
+    @click.option("--batch-size", default=1000, show_default=True, help="Documents per bulk_write.")
+    @click.option(
+        "--collection", "collections", multiple=True, type=click.Choice(OWNER_COLLECTIONS),
+        help="Only these collections (repeatable; default all).",
+    )
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoints and scan from the first _id.")
+    def owner_key_backfill(batch_size, collections, restart):
+        """Set uid on documents that only have userEmail; resumable."""
+        stats = backfill_owner_uid(
+            get_db(app), collections=collections or OWNER_COLLECTIONS, batch_size=batch_size, restart=restart
+        )
+        _echo_stats(stats, "set uid on")
+
+    @owner_key_group.command("drop-email")
+    @click.option("--batch-size", default=1000, show_default=True, help="Documents per bulk_write.")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoints and scan from the first _id.")
+    def owner_key_drop_email(batch_size, restart):
+        """Unset userEmail where uid is set, then drop the userEmail-led indexes (contract step)."""
+        db = get_db(app)
+        try:
+            stats = backfill_owner_uid(db, batch_size=batch_size, restart=restart, drop_email=True)
+            _echo_stats(stats, "unset userEmail on")
+            changed = retire_email_indexes(db)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        for col, names in changed.items():
+            dropped = [n[1:] for n in names if n.startswith("-")]
+            if dropped:
+                click.echo(f"{col}: dropped {', '.join(dropped)}")
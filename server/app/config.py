@@ -1,14 +1,91 @@
 import os
 
+
+def _int_env(name, default=None):
+    v = os.getenv(name)
+    return int(v) if v not in (None, "") else default
+
+
 class Config:
     FLASK_ENV = os.getenv("FLASK_ENV", "development")
     FLASK_DEBUG = os.getenv("FLASK_DEBUG", "0") == "1"
 
     MONGO_URI = os.getenv("MONGO_URI")
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+    # Reconcile indexes once at startup (set 0 to manage them only via `flask ensure-indexes`)
+    MONGO_AUTO_INDEXES = os.getenv("MONGO_AUTO_INDEXES", "1") == "1"
+
+    # Connection pool / driver tuning (unset -> driver default: 100 connections, none kept
+    # warm, no idle limit, and checkouts wait for a free connection indefinitely)
+    MONGO_MAX_POOL_SIZE = _int_env("MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE = _int_env("MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS = _int_env("MONGO_MAX_IDLE_TIME_MS")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    # Comma-separated, tried in order; the server picks the first it supports
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+    # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE") or None
+    MONGO_RETRY_WRITES = os.getenv("MONGO_RETRY_WRITES", "1") == "1"
+    MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "daily-expense-manager")
 
-    JWT_SECRET = os.getenv("JWT_SECRET")
+    JWT_SECRET = os.getenv("JWT_SECRET")  # app.utils.auth.get_jwt_secret() applies the dev fallback
     JWT_EXPIRES_SECONDS = int(os.getenv("JWT_EXPIRES_SECONDS", "2592000"))  # 7 days
+    # Comma-separated emails allowed on admin-only routes (GET /api/auth/users)
+    ADMIN_EMAILS = os.getenv("ADMIN_EMAILS", "")
+
+    # Verified-token cache (entries also never outlive the token's exp)
+    AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    # how often each process pulls tokens revoked by other workers (app/utils/auth.py)
+    AUTH_REVOCATION_REFRESH_SECONDS = float(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "5"))
+
+    # GET /api/auth/me profile cache (per process, keyed by uid)
+    PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+    PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+
+    # Password hashing (see app/utils/passwords.py; compare costs with `python -m bench.bench_passwords`)
+    # default = what werkzeug 3.x generate_password_hash() stores (scrypt:32768:8:1), so existing hashes
+    # are not rehashed on deploy; changing the method/cost upgrades users on their next sign-in
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")  # scrypt | pbkdf2 | argon2
+    PASSWORD_PBKDF2_ITERATIONS = _int_env("PASSWORD_PBKDF2_ITERATIONS", 600000)
+    PASSWORD_SCRYPT_N = _int_env("PASSWORD_SCRYPT_N", 32768)
+    PASSWORD_SCRYPT_R = _int_env("PASSWORD_SCRYPT_R", 8)
+    PASSWORD_SCRYPT_P = _int_env("PASSWORD_SCRYPT_P", 1)
+    PASSWORD_ARGON2_TIME_COST = _int_env("PASSWORD_ARGON2_TIME_COST", 3)
+    PASSWORD_ARGON2_MEMORY_KIB = _int_env("PASSWORD_ARGON2_MEMORY_KIB", 65536)
+    PASSWORD_ARGON2_PARALLELISM = _int_env("PASSWORD_ARGON2_PARALLELISM", 1)
+    # at most WORKERS hashes run at once per process; MAX_PENDING more may queue
+    PASSWORD_HASH_WORKERS = _int_env("PASSWORD_HASH_WORKERS", 2)
+    PASSWORD_HASH_MAX_PENDING = _int_env("PASSWORD_HASH_MAX_PENDING", 32)
+    PASSWORD_HASH_WAIT_SECONDS = float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", "5"))
+
+    # Request/Mongo metrics on /api/metrics + Server-Timing (see app/utils/instrumentation.py)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+    METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "1") == "1"
+
+    # auto (orjson if installed) | orjson | stdlib
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
 
     # Comma-separated origins
     CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
+
+    # POST /api/expenses/bulk
+    BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+    BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "20000"))
+
+    # GET /api/dashboard: threads per process loading its sections concurrently
+    DASHBOARD_WORKERS = _int_env("DASHBOARD_WORKERS", 4)
+
+    # Category rename/merge/delete: expenses rewritten per chunk of ids (0 = one update_many)
+    CATEGORY_REWRITE_CHUNK_SIZE = int(os.getenv("CATEGORY_REWRITE_CHUNK_SIZE", "0"))
+
+    # Expense schema v2: keep reading legacy v1 documents until `flask expenses migrate-v2` is done
+    EXPENSE_DUAL_READ = os.getenv("EXPENSE_DUAL_READ", "1") == "1"
+
+    # Owner key cutover (app/model/ownerModel/owner_model.py): email -> ObjectId uid
+    OWNER_READ_KEY = os.getenv("OWNER_READ_KEY", "email")
+    OWNER_WRITE_EMAIL = os.getenv("OWNER_WRITE_EMAIL", "1") == "1"
+
+    # Per-user allowed-category cache used by expense validation
+    CATEGORY_CACHE_TTL_SECONDS = float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "60"))
+    CATEGORY_CACHE_MAX_ENTRIES = int(os.getenv("CATEGORY_CACHE_MAX_ENTRIES", "10000"))
@@ -0,0 +1,441 @@
+# app/db/indexes.py
+"""
+Single source of truth for MongoDB indexes.
+
+Indexes are reconciled once per process from create_app() (or on demand with
+`flask ensure-indexes`), never from request handlers. The applied
+INDEX_SCHEMA_VERSION is recorded in the `_meta` collection so a process that
+starts against an up-to-date database skips the DDL round trips entirely.
+
+An index is never dropped and recreated under the same name at startup: that
+would leave its queries scanning until the rebuild ends, in every worker at once.
+Changing an index's keys or options means giving it a new name in INDEX_SPECS
+and listing the old name in DROPPED_INDEXES; the new index is built first and the
+old one dropped after. An existing index that does not match its spec (or a new
+one that conflicts with an existing index) is logged and left alone until
+`flask ensure-indexes --rebuild` is run.
+
+The same `_meta` document records whether the owner-key contract step has run
+(`emailRetired`, set by `flask owner-key drop-email`); from then on the
+userEmail-led indexes are dropped instead of reconciled.
+"""
+import logging
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from app.model.ownerModel.owner_model import UID, read_key, writes_email
+
+log = logging.getLogger(__name__)
+
+# Bump whenever INDEX_SPECS changes.
+INDEX_SCHEMA_VERSION = 10
+
+# how long deleted-expense tombstones are kept for /api/expenses/changes
+TOMBSTONE_TTL_SECONDS = 30 * 24 * 3600
+
+META_COLLECTION = "_meta"
+META_ID = "indexes"
+
+# collection -> [(name, keys, options)]
+# Each index serves named query shapes (see app/db/query_plans.py); trailing fields
+# exist so those queries are answered from the index alone (covered). Names are never
+# reused for different keys or options (see the module docstring).
+#
+# Owner key cutover (app/model/ownerModel/owner_model.py): every userEmail-led index
+# has a uid-led twin with the same suffix, so both read modes are indexed while the
+# backfill runs. Unique owner indexes are partial on the key existing, since each
+# document carries one key or both. Once the contract step has run, index_specs()
+# leaves the userEmail-led ones out and retired_indexes() drops them.
+_HAS_EMAIL = {"partialFilterExpression": {"userEmail": {"$exists": True}}}
+_HAS_UID = {"partialFilterExpression": {"uid": {"$exists": True}}}
+
+
+def _owner_twins(name, keys, options):
+    """
+    The userEmail-led index and its uid-led twin (non-unique indexes only).
+    """
+    uid_keys = [("uid" if k == "userEmail" else k, d) for k, d in keys]
+    return [(name, keys, options), (name.replace("userEmail", "uid"), uid_keys, options)]
+
+
+INDEX_SPECS = {
+    "users": [
+        ("email_1", [("email", ASCENDING)], {"unique": True}),
+    ],
+    "expenses": [
+        # list/export: _id tiebreak lets keyset pages (date, _id) resume straight off the index;
+        # summary: category/amount/v ride along so the range aggregation is covered
+        *_owner_twins(
+            "idx_userEmail_date_desc_covering",
+            [
+                ("userEmail", ASCENDING),
+                ("date", DESCENDING),
+                ("_id", DESCENDING),
+                ("category", ASCENDING),
+                ("amountMinor", ASCENDING),
+                ("amount", ASCENDING),
+                ("v", ASCENDING),
+            ],
+            {},
+        ),
+        # incremental sync: (updatedAt, _id) keyset walk per user
+        *_owner_twins(
+            "idx_userEmail_updatedAt",
+            [("userEmail", ASCENDING), ("updatedAt", ASCENDING), ("_id", ASCENDING)],
+            {},
+        ),
+        # search (app/model/expenseModel/expense_search.py): the planner hints one of these;
+        # category/amount trail the sort keys so the other filters run on index keys.
+        # The (owner, category) prefix also serves category rename/merge/delete rewrites.
+        *_owner_twins(
+            "idx_userEmail_category_date_desc",
+            [
+                ("userEmail", ASCENDING),
+                ("category", ASCENDING),
+                ("date", DESCENDING),
+                ("_id", DESCENDING),
+                ("amountMinor", ASCENDING),
+                ("amount", ASCENDING),
+            ],
+            {},
+        ),
+        *_owner_twins(
+            "idx_userEmail_terms_date_desc",
+            [
+                ("userEmail", ASCENDING),
+                ("terms", ASCENDING),
+                ("date", DESCENDING),
+                ("_id", DESCENDING),
+                ("category", ASCENDING),
+                ("amountMinor", ASCENDING),
+                ("amount", ASCENDING),
+            ],
+            {},
+        ),
+    ],
+    "expense_tombstones": [
+        *_owner_twins(
+            "idx_userEmail_updatedAt",
+            [("userEmail", ASCENDING), ("updatedAt", ASCENDING), ("_id", ASCENDING)],
+            {},
+        ),
+        ("ttl_deletedAt", [("deletedAt", ASCENDING)], {"expireAfterSeconds": TOMBSTONE_TTL_SECONDS}),
+    ],
+    "budgets": [
+        # list without a month filter
+        *_owner_twins(
+            "userEmail_1_createdAt_-1__id_-1",
+            [("userEmail", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+            {},
+        ),
+        # list for one month, month lookups, and the (covered) month-range sum
+        *_owner_twins(
+            "userEmail_1_month_1_createdAt_-1__id_-1_amount_1",
+            [
+                ("userEmail", ASCENDING),
+                ("month", ASCENDING),
+                ("createdAt", DESCENDING),
+                ("_id", DESCENDING),
+                ("amount", ASCENDING),
+            ],
+            {},
+        ),
+    ],
+    "expense_rollups": [
+        (
+            "uniq_rollup_user_month_category_partial",
+            [("userEmail", ASCENDING), ("month", ASCENDING), ("category", ASCENDING)],
+            {"unique": True, **_HAS_EMAIL},
+        ),
+        (
+            "uniq_rollup_uid_month_category",
+            [("uid", ASCENDING), ("month", ASCENDING), ("category", ASCENDING)],
+            {"unique": True, **_HAS_UID},
+        ),
+    ],
+    "settings": [
+        ("uniq_user_settings_partial", [("userEmail", ASCENDING)], {"unique": True, **_HAS_EMAIL}),
+        ("uniq_uid_settings", [("uid", ASCENDING)], {"unique": True, **_HAS_UID}),
+    ],
+    # revoked JWT digests; Mongo drops each one once the token would have expired anyway
+    "revoked_tokens": [
+        ("ttl_expiresAt", [("expiresAt", ASCENDING)], {"expireAfterSeconds": 0}),
+        # each process's periodic pull of recent revocations (app/utils/auth.py)
+        ("revokedAt_1", [("revokedAt", ASCENDING)], {}),
+    ],
+}
+
+# Indexes an earlier INDEX_SCHEMA_VERSION created that no query needs any more, or
+# that were replaced under a new name: they only cost write amplification and RAM,
+# so ensure_indexes() drops them once the replacements exist.
+DROPPED_INDEXES = {
+    "expenses": [
+        "idx_userEmail_createdAt_desc",
+        # fewer keys than idx_*_date_desc_covering
+        "idx_userEmail_date_desc",
+        "idx_uid_date_desc",
+    ],
+    "budgets": [
+        # prefix of userEmail_1_month_1_createdAt_-1__id_-1_amount_1
+        "userEmail_1_month_1",
+        # without the _id tiebreak / amount
+        "userEmail_1_createdAt_-1",
+        "uid_1_createdAt_-1",
+        "userEmail_1_month_1_createdAt_-1",
+        "uid_1_month_1_createdAt_-1",
+    ],
+    # not partial: would reject a second document without userEmail
+    "expense_rollups": ["uniq_rollup_user_month_category"],
+    "settings": ["uniq_user_settings"],
+}
+
+
+
+def _email_led(keys) -> bool:
+    return bool(keys) and keys[0][0] == "userEmail"
+
+
+def index_specs(email_retired: bool = False) -> dict:
+    """
+    INDEX_SPECS for the current owner-key phase: without the userEmail-led indexes
+    once the contract step has run.
+    """
+    if not email_retired:
+        return INDEX_SPECS
+    return {
+        name: [spec for spec in specs if not _email_led(spec[1])]
+        for name, specs in INDEX_SPECS.items()
+    }
+
+
+def retired_indexes(email_retired: bool = False) -> dict:
+    """
+    DROPPED_INDEXES, plus the userEmail-led index names once the contract step has run.
+    """
+    if not email_retired:
+        return DROPPED_INDEXES
+    out = {name: list(names) for name, names in DROPPED_INDEXES.items()}
+    for name, specs in INDEX_SPECS.items():
+        out.setdefault(name, []).extend(n for n, keys, _ in specs if _email_led(keys))
+    return out
+
+
+# Index-level options compared against list_indexes() output.
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _same_index(existing: dict, keys, options: dict) -> bool:
+    if list(dict(existing.get("key", {})).items()) != [(k, d) for k, d in keys]:
+        return False
+    for opt in _COMPARED_OPTIONS:
+        if existing.get(opt) != options.get(opt):
+            # unique=False and a missing flag mean the same thing
+            if not existing.get(opt) and not options.get(opt):
+                continue
+            return False
+    return True
+
+
+def reconcile_collection(col, specs, rebuild: bool = False) -> list[str]:
+    """
+    Create missing indexes. Indexes not in specs are left alone (retired_indexes()
+    lists the ones to remove). An index whose keys/options drifted from its spec, or
+    a new one that conflicts with an existing index, is only dropped and rebuilt with
+    rebuild=True; otherwise it is logged and reported as "!name".
+    Returns the names of indexes that were created or rebuilt.
+    """
+    existing = {}
+    try:
+        for idx in col.list_indexes():
+            existing[idx.get("name")] = idx
+    except OperationFailure:
+        existing = {}
+
+    changed = []
+    for name, keys, options in specs:
+        ex = existing.get(name)
+        if ex is not None and _same_index(ex, keys, options):
+            continue
+        if ex is not None and not rebuild:
+            log.warning("Index %s.%s differs from its spec; rename it or run ensure-indexes --rebuild", col.name, name)
+            changed.append(f"!{name}")
+            continue
+
+        try:
+            if ex is not None:
+                _drop_index(col, name)
+            col.create_index(keys, name=name, **options)
+        except OperationFailure as e:
+            # 85 IndexOptionsConflict / 86 IndexKeySpecsConflict: same keys under another name/options
+            if getattr(e, "code", None) not in (85, 86):
+                raise
+            if not rebuild:
+                log.warning("Index %s.%s conflicts with an existing index: %s", col.name, name, e)
+                changed.append(f"!{name}")
+                continue
+            _drop_index(col, keys)
+            col.create_index(keys, name=name, **options)
+        changed.append(name)
+
+    return changed
+
+
+def _drop_index(col, name_or_keys) -> None:
+    try:
+        col.drop_index(name_or_keys)
+    except OperationFailure as e:
+        # 27 IndexNotFound: another worker dropped it first
+        if getattr(e, "code", None) != 27:
+            raise
+
+
+def ensure_collection_indexes(db_or_col, collection_name: str | None = None) -> list[str]:
+    """
+    Reconcile one collection. Accepts a Database + name, or a Collection directly.
+    """
+    if collection_name is None:
+        col = db_or_col
+        collection_name = col.name
+    else:
+        col = db_or_col[collection_name]
+    specs = index_specs(email_indexes_retired(col.database))
+    return reconcile_collection(col, specs.get(collection_name, []))
+
+
+def drop_retired_indexes(db, email_retired: bool = False, skip=()) -> dict:
+    """
+    Drop retired_indexes() that still exist, except in the `skip` collections.
+    Returns {collection: [dropped names]}.
+    """
+    dropped = {}
+    for name, retired in retired_indexes(email_retired).items():
+        if name in skip:
+            continue
+        col = db[name]
+        try:
+            present = {idx.get("name") for idx in col.list_indexes()}
+        except OperationFailure:
+            continue
+        for idx_name in retired:
+            if idx_name in present:
+                _drop_index(col, idx_name)
+                dropped.setdefault(name, []).append(idx_name)
+    return dropped
+
+
+def _meta_doc(db) -> dict:
+    return db[META_COLLECTION].find_one({"_id": META_ID}, {"version": 1, "emailRetired": 1}) or {}
+
+
+def get_applied_version(db) -> int | None:
+    return _meta_doc(db).get("version")
+
+
+def email_indexes_retired(db) -> bool:
+    return bool(_meta_doc(db).get("emailRetired"))
+
+
+def ensure_indexes(db, force: bool = False, rebuild: bool = False) -> dict:
+    """
+    Reconcile every collection in INDEX_SPECS unless the stored schema version
+    is already current, then drop retired indexes (after their replacements were
+    built). Returns {collection: [changed index names]}; dropped ones are prefixed
+    with '-', ones left unresolved (see reconcile_collection) with '!'. While any
+    is unresolved, that collection keeps its retired indexes and the version is
+    not recorded, so the next start reports it again.
+    """
+    meta = _meta_doc(db)
+    if not force and meta.get("version") == INDEX_SCHEMA_VERSION:
+        return {}
+
+    email_retired = bool(meta.get("emailRetired"))
+    changed = {}
+    for name, specs in index_specs(email_retired).items():
+        changed[name] = reconcile_collection(db[name], specs, rebuild=rebuild)
+    unresolved = {name for name, names in changed.items() if any(n.startswith("!") for n in names)}
+    for name, names in drop_retired_indexes(db, email_retired, skip=unresolved).items():
+        changed[name] = changed.get(name, []) + [f"-{n}" for n in names]
+    if unresolved:
+        return changed
+
+    db[META_COLLECTION].update_one(
+        {"_id": META_ID},
+        {"$set": {"version": INDEX_SCHEMA_VERSION, "appliedAt": datetime.utcnow()}},
+        upsert=True,
+    )
+    return changed
+
+
+def retire_email_indexes(db) -> dict:
+    """
+    Owner-key contract step: record that documents no longer carry userEmail and
+    drop the userEmail-led indexes. Every later ensure_indexes() keeps them dropped.
+    Returns ensure_indexes()'s {collection: [changed index names]}.
+    """
+    if read_key() != UID or writes_email():
+        raise ValueError("Set OWNER_READ_KEY=uid and OWNER_WRITE_EMAIL=0 before retiring userEmail indexes")
+    db[META_COLLECTION].update_one(
+        {"_id": META_ID},
+        {"$set": {"emailRetired": True, "emailRetiredAt": datetime.utcnow()}},
+        upsert=True,
+    )
+    return ensure_indexes(db, force=True)
+
+
+def init_indexes(app, db) -> None:
+    """
+    Startup hook: reconcile once per process. Failures are logged, not raised,
+    so a briefly unreachable cluster doesn't stop the app from booting.
+    """
+    if not app.config.get("MONGO_AUTO_INDEXES", True):
+        return
+    try:
+        changed = ensure_indexes(db)
+        if any(changed.values()):
+            log.info("Mongo indexes reconciled: %s", changed)
+    except Exception:
+        log.exception("Mongo index bootstrap failed; run `flask ensure-indexes`")
+
+
+def register_index_commands(app) -> None:
+    import click
+
+    from app.db.mongo import get_db
+
+    @app.cli.command("ensure-indexes")
+    @click.option("--force", is_flag=True, help="Reconcile even if the schema version is current.")
+    @click.option(
+        "--rebuild", is_flag=True,
+        help="Drop and recreate indexes that differ from their spec (their queries scan until rebuilt).",
+    )
+    def ensure_indexes_command(force, rebuild):
+        """Create MongoDB indexes declared in app/db/indexes.py and drop retired ones."""
+        changed = ensure_indexes(get_db(app), force=force or rebuild, rebuild=rebuild)
+        if not changed:
+            click.echo(f"Indexes already at version {INDEX_SCHEMA_VERSION}")
+            return
+        for col, names in changed.items():
+            click.echo(f"{col}: {', '.join(names) if names else 'up to date'}")
+        if any(n.startswith("!") for names in changed.values() for n in names):
+            raise click.ClickException("indexes marked ! differ from their spec; see the log, or use --rebuild")
+        click.echo(f"Index schema version {INDEX_SCHEMA_VERSION} recorded")
+
+    @app.cli.command("check-query-plans")
+    @click.option("--user", "user_email", required=True, help="Explain the queries for this user's data.")
+    @click.option("--limit", default=50, show_default=True, help="Page size used for list queries.")
+    def check_query_plans_command(user_email, limit):
+        """Explain the hot queries and fail on COLLSCANs, wrong indexes or over-scanning."""
+        from app.db.query_plans import check_query_plans
+
+        results = check_query_plans(get_db(app), userEmail=user_email, limit=limit)
+        for r in results:
+            status = "ok" if not r["problems"] else "FAIL: " + "; ".join(r["problems"])
+            bound = "-" if r["maxDocsExamined"] is None else r["maxDocsExamined"]
+            click.echo(
+                f"{r['name']:<26}{','.join(r['indexes']) or '-':<36}"
+                f"docs {r['docsExamined']}/{bound}  {status}"
+            )
+        if any(r["problems"] for r in results):
+            raise SystemExit(1)
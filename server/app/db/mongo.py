@@ -1,27 +1,99 @@
+import os
+import threading
+
 from pymongo import MongoClient
 from pymongo.server_api import ServerApi
 
-_client = None
+from app.db.pool_metrics import PoolStatsListener
+
+_client_lock = threading.Lock()
+
+
+def client_options(config) -> dict:
+    """
+    MongoClient keyword arguments built from Config (unset values keep driver defaults).
+    """
+    opts = {
+        "server_api": ServerApi("1"),
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": config.get("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "retryWrites": config.get("MONGO_RETRY_WRITES"),
+        "readPreference": config.get("MONGO_READ_PREFERENCE"),
+        "appname": config.get("MONGO_APP_NAME"),
+    }
+    compressors = config.get("MONGO_COMPRESSORS")
+    if compressors:
+        opts["compressors"] = compressors
+    return {k: v for k, v in opts.items() if v is not None}
+
 
 def init_mongo(app):
     """
-    Creates a MongoClient and stores it on app.extensions.
+    Validates Mongo settings and prepares lazy, fork-safe client creation.
+    The MongoClient itself is built on first use in each process (see get_client),
+    so a gunicorn --preload master never hands its sockets to forked workers.
     """
-    global _client
     uri = app.config.get("MONGO_URI")
-    # print(uri)
     if not uri:
         raise RuntimeError("MONGO_URI is missing. Set it in .env")
 
-    _client = MongoClient(uri, server_api=ServerApi("1"))
-    app.extensions["mongo_client"] = _client
+    app.extensions["mongo_client"] = None
+    app.extensions["mongo_client_pid"] = None
+    app.extensions["mongo_pool_stats"] = PoolStatsListener()
 
-def get_db(app):
+
+def get_client(app):
     """
-    Returns the configured database handle.
+    Returns this process's MongoClient, creating it after a fork if needed.
     """
+    pid = os.getpid()
     client = app.extensions.get("mongo_client")
-    if client is None:
+    if client is not None and app.extensions.get("mongo_client_pid") == pid:
+        return client
+
+    if "mongo_pool_stats" not in app.extensions:
         raise RuntimeError("Mongo client not initialized. Did you call init_mongo?")
+
+    with _client_lock:
+        client = app.extensions.get("mongo_client")
+        if client is not None and app.extensions.get("mongo_client_pid") == pid:
+            return client
+
+        stats = app.extensions["mongo_pool_stats"]
+        stats.reset()
+        listeners = [stats]
+        if app.extensions.get("mongo_command_listener") is not None:
+            listeners.append(app.extensions["mongo_command_listener"])  # see app/utils/instrumentation.py
+        client = MongoClient(
+            app.config.get("MONGO_URI"),
+            event_listeners=listeners,
+            **client_options(app.config),
+        )
+        app.extensions["mongo_client"] = client
+        app.extensions["mongo_client_pid"] = pid
+        return client
+
+
+def get_db(app):
+    """
+    Returns the configured database handle.
+    """
     db_name = app.config.get("MONGO_DB_NAME")
-    return client[db_name]
+    return get_client(app)[db_name]
+
+
+def get_pool_stats(app) -> dict:
+    """
+    Pool counters for this process plus the effective pool settings.
+    """
+    stats = app.extensions.get("mongo_pool_stats")
+    client = app.extensions.get("mongo_client")
+    snap = stats.snapshot() if stats else {}
+    snap["pid"] = os.getpid()
+    snap["clientReady"] = client is not None and app.extensions.get("mongo_client_pid") == os.getpid()
+    snap["config"] = {
+        k: v for k, v in client_options(app.config).items() if k != "server_api"
+    }
+    return snap
@@ -0,0 +1,30 @@
+# app/db/mongo_async.py
+"""
+Async Mongo access for the ASGI app (app/asgi.py), using PyMongo's native
+async API. The client binds to the running event loop, so it is created in a
+before_serving hook rather than at import/app-creation time.
+"""
+from pymongo import AsyncMongoClient
+
+from app.db.mongo import client_options
+
+
+async def init_async_mongo(app):
+    uri = app.config.get("MONGO_URI")
+    if not uri:
+        raise RuntimeError("MONGO_URI is missing. Set it in .env")
+
+    app.extensions["async_mongo_client"] = AsyncMongoClient(uri, **client_options(app.config))
+
+
+async def close_async_mongo(app):
+    client = app.extensions.pop("async_mongo_client", None)
+    if client is not None:
+        await client.close()
+
+
+def get_async_db(app):
+    client = app.extensions.get("async_mongo_client")
+    if client is None:
+        raise RuntimeError("Async Mongo client not initialized. Is the app serving?")
+    return client[app.config.get("MONGO_DB_NAME")]
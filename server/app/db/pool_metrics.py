@@ -0,0 +1,120 @@
+# app/db/pool_metrics.py
+"""
+CMAP (connection pool) listener that keeps cheap in-process counters so we can
+tell pool starvation apart from slow queries. Exposed on /api/health/pool.
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+# upper bounds (ms) for the checkout-latency histogram
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.pools_created = 0
+            self.pools_cleared = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts_started = 0
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.checkins = 0
+            self.waiting = 0
+            self.max_waiting = 0
+            self.checkout_ms_total = 0.0
+            self.checkout_ms_max = 0.0
+            self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    # pool lifecycle
+    def pool_created(self, event):
+        with self._lock:
+            self.pools_created += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # connection lifecycle
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # checkout / checkin
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.checkouts_started += 1
+            self.waiting += 1
+            if self.waiting > self.max_waiting:
+                self.max_waiting = self.waiting
+
+    def connection_checked_out(self, event):
+        ms = (event.duration or 0.0) * 1000
+        with self._lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.checkout_ms_total += ms
+            if ms > self.checkout_ms_max:
+                self.checkout_ms_max = ms
+            for i, bound in enumerate(CHECKOUT_BUCKETS_MS):
+                if ms <= bound:
+                    self.checkout_buckets[i] += 1
+                    break
+            else:
+                self.checkout_buckets[-1] += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"le_{b}ms": n for b, n in zip(CHECKOUT_BUCKETS_MS, self.checkout_buckets)}
+            buckets["gt_%dms" % CHECKOUT_BUCKETS_MS[-1]] = self.checkout_buckets[-1]
+            return {
+                "since": self.started_at,
+                "pools": {"created": self.pools_created, "cleared": self.pools_cleared},
+                "connections": {
+                    "created": self.connections_created,
+                    "closed": self.connections_closed,
+                    "open": self.connections_created - self.connections_closed,
+                    "inUse": self.checkouts - self.checkins,
+                },
+                "checkout": {
+                    "started": self.checkouts_started,
+                    "succeeded": self.checkouts,
+                    "failed": dict(self.checkout_failures),
+                    "waitingNow": self.waiting,
+                    "maxWaiting": self.max_waiting,
+                    "avgMs": round(self.checkout_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                    "maxMs": round(self.checkout_ms_max, 3),
+                    "histogram": buckets,
+                },
+            }
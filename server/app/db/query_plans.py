@@ -0,0 +1,176 @@
+# app/db/query_plans.py
+"""
+Explain-plan checks for the hot query shapes, run against a real mongod:
+
+    flask --app run check-query-plans --user someone@example.com [--limit 50]
+
+Each shape is built with the same helpers the routes use and explained with
+executionStats. A shape fails when it needs a COLLSCAN, uses an index other
+than the one declared for it in app/db/indexes.py, or examines more documents
+than its bound (0 = must be covered). Exits 1 on any failure, so it can gate
+a deploy after index or query changes. Shapes filter on the active owner key
+(OWNER_READ_KEY), and the expected index follows it. Search shapes are explained
+with the hint the list query sends, so they check the planned index's cost.
+"""
+from app.model.budgetModel.budget_model import build_list_pipeline as build_budget_list_pipeline
+from app.model.budgetModel.budget_model import build_sum_pipeline
+from app.model.expenseModel.expense_model import build_list_options, build_list_pipeline, build_summary_pipeline
+from app.model.ownerModel.owner_model import UID, owner_filter, owner_index, read_key, resolve_uid
+
+
+def _search(owner: dict, limit: int, **search):
+    return build_list_pipeline(**owner, **search, limit=limit), build_list_options(search)
+
+
+def _shapes(userEmail: str, limit: int, uid=None):
+    """
+    (name, collection, pipeline, expected index, max docs examined, aggregate options);
+    a max of None means the count depends on the data (blocking sort over all matches).
+    """
+    owner = {"userEmail": userEmail, "uid": uid}
+    category_pipeline, category_options = _search(owner, limit, categories=["Food", "Bills"])
+    amount_pipeline, amount_options = _search(owner, limit, min_amount="10", max_amount="50")
+    text_pipeline, text_options = _search(owner, limit, q="lu")
+
+    return [
+        (
+            "expenses.list",
+            "expenses",
+            build_list_pipeline(**owner, limit=limit),
+            owner_index("idx_userEmail_date_desc_covering"),
+            limit,
+            {},
+        ),
+        (
+            "expenses.list.range",
+            "expenses",
+            build_list_pipeline(**owner, date_from="2000-01-01", date_to="2100-12-31", limit=limit),
+            owner_index("idx_userEmail_date_desc_covering"),
+            # with EXPENSE_DUAL_READ the range is an $or of v2/v1 bounds, each branch may fetch `limit`
+            2 * limit,
+            {},
+        ),
+        # $in over sorted per-category runs: merged in order, so no more than a page is fetched
+        (
+            "expenses.search.category",
+            "expenses",
+            category_pipeline,
+            owner_index("idx_userEmail_category_date_desc"),
+            limit,
+            category_options,
+        ),
+        # amount bounds are checked on index keys; only matching rows are fetched
+        (
+            "expenses.search.amount",
+            "expenses",
+            amount_pipeline,
+            owner_index("idx_userEmail_date_desc_covering"),
+            limit,
+            amount_options,
+        ),
+        # prefix bounds on terms: matches are sorted in memory, so no fixed bound
+        (
+            "expenses.search.text",
+            "expenses",
+            text_pipeline,
+            owner_index("idx_userEmail_terms_date_desc"),
+            None,
+            text_options,
+        ),
+        (
+            "expenses.summary",
+            "expenses",
+            build_summary_pipeline(**owner, date_from="2000-01-01", date_to="2100-12-31"),
+            owner_index("idx_userEmail_date_desc_covering"),
+            0,
+            {},
+        ),
+        (
+            "expenses.changes",
+            "expenses",
+            [
+                {"$match": owner_filter(userEmail, uid)},
+                {"$sort": {"updatedAt": 1, "_id": 1}},
+                {"$limit": limit + 1},
+            ],
+            owner_index("idx_userEmail_updatedAt"),
+            limit + 1,
+            {},
+        ),
+        (
+            "budgets.list",
+            "budgets",
+            build_budget_list_pipeline(**owner, limit=limit),
+            owner_index("userEmail_1_createdAt_-1__id_-1"),
+            limit,
+            {},
+        ),
+        (
+            "budgets.sum",
+            "budgets",
+            build_sum_pipeline(**owner, month_from="2000-01", month_to="2100-12"),
+            owner_index("userEmail_1_month_1_createdAt_-1__id_-1_amount_1"),
+            0,
+            {},
+        ),
+    ]
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for v in node.values():
+            yield from _walk(v)
+    elif isinstance(node, list):
+        for v in node:
+            yield from _walk(v)
+
+
+def summarize_explain(explain: dict) -> dict:
+    """
+    Stages, index names and docs examined from an explain document (classic or SBE,
+    find or aggregate). Only the winning plans are inspected, not rejected ones.
+    """
+    stages, indexes, examined = set(), set(), 0
+    for node in _walk(explain):
+        plan = node.get("winningPlan")
+        if isinstance(plan, dict):
+            for p in _walk(plan):
+                if isinstance(p.get("stage"), str):
+                    stages.add(p["stage"])
+                if isinstance(p.get("indexName"), str):
+                    indexes.add(p["indexName"])
+        stats = node.get("executionStats")
+        if isinstance(stats, dict) and "totalDocsExamined" in stats:
+            examined = max(examined, int(stats["totalDocsExamined"]))
+    return {"stages": sorted(stages), "indexes": sorted(indexes), "docsExamined": examined}
+
+
+def check_query_plans(db, *, userEmail: str, limit: int = 50) -> list:
+    """
+    Returns one result per shape: {name, stages, indexes, docsExamined, maxDocsExamined, problems}.
+    """
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+
+    uid = resolve_uid(db["users"], userEmail) if read_key() == UID else None
+    results = []
+    for name, col, pipeline, index, max_examined, options in _shapes(userEmail, int(limit), uid):
+        explain = db.command(
+            "explain",
+            {"aggregate": col, "pipeline": pipeline, "cursor": {}, **options},
+            verbosity="executionStats",
+        )
+        summary = summarize_explain(explain)
+
+        problems = []
+        if "COLLSCAN" in summary["stages"]:
+            problems.append("collection scan")
+        if index not in summary["indexes"]:
+            problems.append(f"expected index {index}, got {', '.join(summary['indexes']) or 'none'}")
+        if max_examined is not None and summary["docsExamined"] > max_examined:
+            problems.append(f"examined {summary['docsExamined']} docs (max {max_examined})")
+
+        results.append({"name": name, **summary, "maxDocsExamined": max_examined, "problems": problems})
+    return results
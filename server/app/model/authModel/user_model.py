@@ -1,17 +1,103 @@
+import hashlib
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
-from werkzeug.security import generate_password_hash
-from werkzeug.security import check_password_hash
 
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, ReturnDocument
 from pymongo.collection import Collection
 from pymongo.errors import DuplicateKeyError
 
+from app.db.indexes import ensure_collection_indexes
+from app.utils.cache import TTLCache
+from app.utils.pagination import decode_cursor, encode_cursor, parse_limit
+from app.utils.passwords import check_password, hash_password, needs_rehash
+
+# uid -> (sanitized profile, etag); served to GET /api/auth/me
+_profile_cache = TTLCache(maxsize=10000, ttl=300)
+
 
 def ensure_user_indexes(users: Collection) -> None:
     """
-    Create indexes (safe to call repeatedly).
+    Reconcile user indexes declared in app/db/indexes.py (safe to call repeatedly).
+    """
+    ensure_collection_indexes(users)
+
+
+def configure_profile_cache(maxsize: int | None = None, ttl: float | None = None) -> None:
+    _profile_cache.configure(maxsize=maxsize, ttl=ttl)
+
+
+def invalidate_user_profile(uid) -> None:
+    _profile_cache.delete(str(uid))
+
+
+def profile_etag(user: Dict[str, Any]) -> str:
+    """
+    Changes whenever a profile write bumps updatedAt.
+    """
+    updated = user.get("updatedAt")
+    stamp = updated.isoformat() if isinstance(updated, datetime) else str(updated)
+    return hashlib.sha1(f"{user.get('_id')}|{stamp}".encode()).hexdigest()
+
+
+def get_user_profile(users: Collection, uid: Optional[str], email: Optional[str] = None):
+    """
+    Returns (user, etag) for the token's uid, from the per-process cache when fresh.
+    Tokens without a usable uid fall back to an (uncached) email lookup.
     """
-    users.create_index("email", unique=True)
+    try:
+        oid = ObjectId(uid)
+    except (InvalidId, TypeError):
+        oid = None
+
+    if oid is None:
+        user = get_user_by_email(users, email) if email else None
+        return (user, profile_etag(user)) if user else None
+
+    key = str(oid)
+    hit = _profile_cache.get(key)
+    if hit is not None:
+        return hit
+
+    user = users.find_one({"_id": oid}, {"passwordHash": 0})
+    if not user:
+        return None
+    user["_id"] = key
+    entry = (user, profile_etag(user))
+    _profile_cache.set(key, entry)
+    return entry
+
+
+def update_user_profile(users: Collection, uid: str, *, name=None) -> Optional[Dict[str, Any]]:
+    """
+    Updates editable profile fields. Raises ValueError on invalid input.
+    """
+    try:
+        oid = ObjectId(uid)
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid user id")
+
+    update = {}
+    if name is not None:
+        name = str(name).strip()
+        if not name:
+            raise ValueError("Name is required")
+        update["name"] = name
+    if not update:
+        raise ValueError("Nothing to update")
+
+    update["updatedAt"] = datetime.now(timezone.utc)
+    user = users.find_one_and_update(
+        {"_id": oid},
+        {"$set": update},
+        projection={"passwordHash": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    invalidate_user_profile(oid)
+    if user:
+        user["_id"] = str(user["_id"])
+    return user
 
 
 def create_user(users: Collection, name: str, email: str, password: str) -> Dict[str, Any]:
@@ -23,7 +109,7 @@ def create_user(users: Collection, name: str, email: str, password: str) -> Dict
     user_doc = {
         "name": name.strip(),
         "email": email.strip().lower(),
-        "passwordHash": generate_password_hash(password),  # pbkdf2:sha256
+        "passwordHash": hash_password(password),  # scheme/cost from Config (app/utils/passwords.py)
         "createdAt": now,
         "updatedAt": now,
     }
@@ -39,18 +125,105 @@ def create_user(users: Collection, name: str, email: str, password: str) -> Dict
 def find_user_by_email(users: Collection, email: str) -> Optional[Dict[str, Any]]:
     return users.find_one({"email": email.strip().lower()}, {"passwordHash": 0})
 
-def get_all_users(users: Collection):
+# fields a caller may request with ?fields= (passwordHash is never selectable)
+USER_FIELDS = ("_id", "name", "email", "createdAt", "updatedAt")
+
+
+def parse_user_fields(fields) -> list:
     """
-    Returns all users without passwordHash.
+    "name,email" -> ["name", "email"]; empty -> all USER_FIELDS. Raises ValueError.
+    """
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",")]
+    wanted = [f for f in (fields or []) if f]
+    if not wanted:
+        return list(USER_FIELDS)
+    unknown = [f for f in wanted if f not in USER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(wanted))
+
+
+def _email_prefix_range(prefix: str) -> dict:
+    # half-open range on the unique email index (tighter bounds than an anchored regex)
+    prefix = prefix.strip().lower()
+    return {"$gte": prefix, "$lt": prefix + "\uffff"}
+
+
+def _shape_user(doc, fields) -> Dict[str, Any]:
+    out = {}
+    for f in fields:
+        if f not in doc:
+            continue
+        v = doc[f]
+        if f == "_id":
+            v = str(v)
+        elif isinstance(v, datetime):
+            v = v.isoformat()
+        out[f] = v
+    return out
+
+
+def build_users_query(*, email_prefix=None, cursor=None):
+    """
+    Returns (filter, sort). With an email prefix the walk is ordered by email so it
+    stays on the unique email index; otherwise by _id.
+    """
+    q = {}
+    if email_prefix:
+        q["email"] = _email_prefix_range(email_prefix)
+        sort = [("email", ASCENDING)]
+    else:
+        sort = [("_id", ASCENDING)]
+
+    if cursor:
+        key, oid = decode_cursor(cursor)
+        if email_prefix:
+            q["email"] = {**q["email"], "$gt": key}
+        else:
+            q["_id"] = {"$gt": oid}
+    return q, sort
+
+
+def list_users(users: Collection, *, limit=200, cursor=None, fields=None, email_prefix=None):
+    """
+    One keyset page of users (passwordHash never leaves Mongo).
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    fields = parse_user_fields(fields)
+    limit = parse_limit(limit)
+    q, sort = build_users_query(email_prefix=email_prefix, cursor=cursor)
+    # _id/email ride along for the cursor even when not requested
+    projection = {f: 1 for f in set(fields) | {"_id", "email"}}
+    docs = list(users.find(q, projection).sort(sort).limit(limit))
+
+    next_cursor = None
+    if len(docs) == limit:
+        last = docs[-1]
+        next_cursor = encode_cursor(last["email"] if email_prefix else "", last["_id"])
+    return [_shape_user(d, fields) for d in docs], next_cursor
+
+
+def iter_users(users: Collection, *, fields=None, email_prefix=None, batch_size=1000):
+    """
+    Lazily yields projected users for full dumps; memory stays flat.
     """
-    cursor = users.find({}, {"passwordHash": 0})
-    result = []
+    fields = parse_user_fields(fields)
+    q, sort = build_users_query(email_prefix=email_prefix)
+    projection = {f: 1 for f in fields}
+    if "_id" not in fields:
+        projection["_id"] = 0
+    cur = users.find(q, projection).sort(sort).batch_size(int(batch_size))
+    for d in cur:
+        yield _shape_user(d, fields)
 
-    for doc in cursor:
-        doc["_id"] = str(doc["_id"])
-        result.append(doc)
 
-    return result
+def get_all_users(users: Collection):
+    """
+    Returns all users without passwordHash.
+    Prefer list_users/iter_users: this materializes the whole collection.
+    """
+    return list(iter_users(users))
 
 
 def get_user_by_email(users: Collection, email: str):
@@ -95,7 +268,18 @@ def verify_user_password(users: Collection, email: str, password: str):
         return None, 404, "User not found"
 
     stored_hash = user.get("passwordHash")
-    if not stored_hash or not check_password_hash(stored_hash, password):
+    if not stored_hash or not check_password(stored_hash, password):
         return None, 401, "Invalid email or password"
 
+    if needs_rehash(stored_hash):
+        # upgrade to the configured scheme/cost; the filter skips it if another login already did
+        try:
+            users.update_one(
+                {"_id": user["_id"], "passwordHash": stored_hash},
+                {"$set": {"passwordHash": hash_password(password)}},
+            )
+        except Exception:
+            # the old hash still verifies; try again on the next sign-in
+            pass
+
     return sanitize_user(user), None, None
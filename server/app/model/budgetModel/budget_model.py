@@ -1,12 +1,17 @@
 # app/model/budgetModel/budget_model.py
 from datetime import datetime
-from pymongo import ASCENDING, DESCENDING
+from bson import ObjectId
+from pymongo import DESCENDING
+
+from app.db.indexes import ensure_collection_indexes
+from app.model.ownerModel.owner_model import owner_fields, owner_filter
+from app.model.versionModel.version_model import BUDGETS, bump_version
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, keyset_after
 
 
 def ensure_budget_indexes(budgets_col):
-    budgets_col.create_index([("userEmail", ASCENDING), ("month", ASCENDING)])
-    budgets_col.create_index([("userEmail", ASCENDING), ("createdAt", DESCENDING)])
-    budgets_col.create_index([("userEmail", ASCENDING), ("month", ASCENDING), ("createdAt", DESCENDING)])
+    # declared in app/db/indexes.py; reconciled at startup
+    return ensure_collection_indexes(budgets_col)
 
 
 def _validate_month(month: str) -> str:
@@ -43,7 +48,18 @@ def serialize_budget(doc):
     }
 
 
-def create_budget(budgets_col, *, userEmail, month, amount, notes=""):
+LIST_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "userEmail": 1,
+    "month": 1,
+    "amount": 1,
+    "notes": {"$ifNull": ["$notes", ""]},
+    "createdAt": 1,
+    "updatedAt": 1,
+}
+
+
+def create_budget(budgets_col, *, userEmail, month, amount, notes="", uid=None):
     userEmail = (userEmail or "").strip().lower()
     notes = (notes or "").strip()
     month = _validate_month(month)
@@ -62,7 +78,7 @@ def create_budget(budgets_col, *, userEmail, month, amount, notes=""):
     now = datetime.utcnow()  # ✅ store datetime object
 
     payload = {
-        "userEmail": userEmail,
+        **owner_fields(userEmail, uid),
         "month": month,
         "amount": amount,
         "notes": notes,
@@ -72,22 +88,101 @@ def create_budget(budgets_col, *, userEmail, month, amount, notes=""):
 
     res = budgets_col.insert_one(payload)
     payload["_id"] = res.inserted_id
+    bump_version(budgets_col, userEmail, BUDGETS)
     return serialize_budget(payload)
 
 
-def list_budgets(budgets_col, *, userEmail, limit=200, skip=0, month=None):
+def delete_budget_by_id(budgets_col, *, userEmail, budget_id, uid=None) -> bool:
+    """
+    Deletes one of the user's budgets. Raises InvalidId for a malformed id.
+    """
+    userEmail = (userEmail or "").strip().lower()
+    res = budgets_col.delete_one({**owner_filter(userEmail, uid), "_id": ObjectId(budget_id)})
+    if res.deleted_count != 1:
+        return False
+    bump_version(budgets_col, userEmail, BUDGETS)
+    return True
+
+
+def build_list_pipeline(*, userEmail, limit=200, skip=0, month=None, cursor=None, uid=None) -> list:
     userEmail = (userEmail or "").strip().lower()
     if not userEmail:
         raise ValueError("User email is required")
 
-    q = {"userEmail": userEmail}
+    q = owner_filter(userEmail, uid)
     if month:
         q["month"] = _validate_month(month)
 
-    cur = (
-        budgets_col.find(q)
-        .sort("createdAt", DESCENDING)
-        .skip(int(skip))
-        .limit(int(limit))
-    )
-    return [serialize_budget(d) for d in cur]
+    if cursor:
+        key, oid = decode_cursor(cursor)
+        q.update(keyset_after("createdAt", key, oid))
+        skip = 0
+
+    # datetimes are left as-is; the app JSON provider renders them as ISO 8601
+    pipeline = [
+        {"$match": q},
+        {"$sort": {"createdAt": DESCENDING, "_id": DESCENDING}},
+    ]
+    if int(skip):
+        pipeline.append({"$skip": int(skip)})
+    pipeline += [
+        {"$limit": parse_limit(limit)},
+        {"$project": LIST_PROJECTION},
+    ]
+    return pipeline
+
+
+def list_budgets(budgets_col, *, userEmail, limit=200, skip=0, month=None, cursor=None, uid=None):
+    pipeline = build_list_pipeline(userEmail=userEmail, uid=uid, limit=limit, skip=skip, month=month, cursor=cursor)
+    return list(budgets_col.aggregate(pipeline))
+
+def next_budget_cursor(items, limit):
+    if not items or len(items) < parse_limit(limit):
+        return None
+    last = items[-1]
+    created = last["createdAt"]
+    if isinstance(created, str):
+        created = datetime.fromisoformat(created)
+    return encode_cursor(created, last["_id"])
+
+
+def budget_months(date_from=None, date_to=None) -> dict:
+    """
+    Month bounds (sum_budgets kwargs) covering an expense date range.
+    """
+    return {
+        "month_from": date_from[:7] if date_from else None,
+        "month_to": date_to[:7] if date_to else None,
+    }
+
+
+def build_sum_pipeline(*, userEmail, month_from=None, month_to=None, uid=None) -> list:
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+
+    q = owner_filter(userEmail, uid)
+    if month_from or month_to:
+        q["month"] = {}
+        if month_from:
+            q["month"]["$gte"] = _validate_month(month_from)
+        if month_to:
+            q["month"]["$lte"] = _validate_month(month_to)
+
+    return [
+        {"$match": q},
+        {"$group": {"_id": None, "total": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+    ]
+
+
+def shape_sum(res: dict | None) -> dict:
+    res = res or {}
+    return {"total": float(res.get("total", 0)), "count": int(res.get("count", 0))}
+
+
+def sum_budgets(budgets_col, *, userEmail, month_from=None, month_to=None, uid=None):
+    """
+    Total budget amount for months in [month_from, month_to] (both optional, YYYY-MM).
+    """
+    pipeline = build_sum_pipeline(userEmail=userEmail, uid=uid, month_from=month_from, month_to=month_to)
+    return shape_sum(next(budgets_col.aggregate(pipeline), None))
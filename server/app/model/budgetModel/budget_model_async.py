@@ -0,0 +1,15 @@
+# app/model/budgetModel/budget_model_async.py
+from app.model.budgetModel.budget_model import build_list_pipeline, build_sum_pipeline, shape_sum
+
+
+async def list_budgets(budgets_col, *, userEmail, limit=200, skip=0, month=None, cursor=None, uid=None):
+    pipeline = build_list_pipeline(userEmail=userEmail, uid=uid, limit=limit, skip=skip, month=month, cursor=cursor)
+    cur = await budgets_col.aggregate(pipeline)
+    return await cur.to_list()
+
+
+async def sum_budgets(budgets_col, *, userEmail, month_from=None, month_to=None, uid=None):
+    pipeline = build_sum_pipeline(userEmail=userEmail, uid=uid, month_from=month_from, month_to=month_to)
+    cur = await budgets_col.aggregate(pipeline)
+    rows = await cur.to_list(1)
+    return shape_sum(rows[0] if rows else None)
@@ -1,73 +1,79 @@
 # app/model/expenseModel/expense_model.py
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, ReturnDocument
-from pymongo.errors import OperationFailure
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.indexes import TOMBSTONE_TTL_SECONDS, ensure_collection_indexes
+from app.model.expenseModel.expense_schema import (
+    AMOUNT_EXPR,
+    AMOUNT_MINOR_EXPR,
+    DAY_EXPR,
+    SCHEMA_VERSION,
+    STORED_AMOUNT_FIELDS,
+    VERSION_EXPR,
+    amount_range_filter,
+    bson_order_key,
+    build_v2_upgrade,
+    date_in_values,
+    date_range_filter,
+    day_str,
+    dual_read_enabled,
+    expense_amount,
+    from_minor,
+    parse_day,
+    parse_ts,
+    to_minor,
+)
+from app.model.expenseModel.expense_search import parse_categories, plan_list_index, search_terms, terms_filter
+from app.model.ownerModel.owner_model import owner_emails, owner_fields, owner_filter, resolve_uid
+from app.model.rollupModel.rollup_model import rollup_add, rollup_move_category, rollup_on_update
+from app.model.versionModel.version_model import EXPENSES, bump_version
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, cursor_issued_at, keyset_after_typed
 
 
 def ensure_expense_indexes(expenses_col):
     """
-    Create indexes safely.
-    If an index exists with the same NAME but different KEYS/OPTIONS, drop it and recreate.
-    Also avoids crashing your API with OperationFailure.
+    Reconcile expense indexes declared in app/db/indexes.py.
+    Runs at startup / via `flask ensure-indexes`; not meant for request handlers.
     """
-    desired = [
-        ("idx_userEmail_date_desc", [("userEmail", ASCENDING), ("date", DESCENDING)]),
-        ("idx_userEmail_createdAt_desc", [("userEmail", ASCENDING), ("createdAt", DESCENDING)]),
-    ]
-
-    existing = {}
-    try:
-        for idx in expenses_col.list_indexes():
-            existing[idx.get("name")] = idx
-    except Exception:
-        existing = {}
-
-    for name, keys in desired:
-        try:
-            if name in existing:
-                ex = existing[name]
-                ex_key = dict(ex.get("key", {}))
-                want_key = dict(keys)
-
-                if ex_key != want_key:
-                    expenses_col.drop_index(name)
-
-            expenses_col.create_index(keys, name=name)
-
-        except OperationFailure as e:
-            if getattr(e, "code", None) in (85, 86):
-                try:
-                    expenses_col.drop_index(name)
-                    expenses_col.create_index(keys, name=name)
-                except Exception:
-                    pass
-            else:
-                raise
-
-
-def _to_iso_date(date_str: str) -> str:
-    date_str = (date_str or "").strip()
-    dt = datetime.strptime(date_str, "%Y-%m-%d")
-    return dt.strftime("%Y-%m-%d")
+    return ensure_collection_indexes(expenses_col)
 
 
 def serialize_expense(doc):
+    # accepts stored v1 and v2 documents (see expense_schema.py); API shape is the same
     if not doc:
         return None
     return {
         "_id": str(doc.get("_id")),
         "userEmail": doc.get("userEmail"),
         "title": doc.get("title"),
-        "amount": float(doc.get("amount", 0)),
+        "amount": expense_amount(doc),
         "category": doc.get("category"),
-        "date": doc.get("date"),
+        "date": day_str(doc.get("date")),
         "notes": doc.get("notes", ""),
         "createdAt": doc.get("createdAt"),
         "updatedAt": doc.get("updatedAt"),
+        "v": int(doc.get("v") or 1),
     }
 
 
+# Same shape as serialize_expense, built by Mongo so list endpoints can hand
+# documents straight to the JSON provider without a per-row Python dict.
+LIST_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "userEmail": 1,
+    "title": 1,
+    "amount": AMOUNT_EXPR,
+    "category": 1,
+    "date": DAY_EXPR,
+    "notes": {"$ifNull": ["$notes", ""]},
+    "createdAt": 1,
+    "updatedAt": 1,
+    "v": VERSION_EXPR,
+}
+
+
 def _normalize_category(cat: str) -> str:
     cat = " ".join((cat or "").strip().split())
     if not cat:
@@ -90,7 +96,12 @@ def _category_allowed(category: str, allowed_categories: set[str] | None) -> boo
     return category in allowed
 
 
-def create_expense(expenses_col, *, userEmail, title, amount, category, date, notes="", allowed_categories=None):
+def _build_expense_doc(
+    *, userEmail, title, amount, category, date, notes="", allowed_categories=None, now=None, uid=None
+):
+    """
+    Validates one expense and returns the document to insert (raises ValueError).
+    """
     title = (title or "").strip()
     notes = (notes or "").strip()
     userEmail = (userEmail or "").strip().lower()
@@ -100,17 +111,13 @@ def create_expense(expenses_col, *, userEmail, title, amount, category, date, no
     if not title:
         raise ValueError("Title is required")
 
-    try:
-        amount = float(amount)
-    except Exception:
-        raise ValueError("Amount must be a number")
-
-    if amount <= 0:
+    amount_minor = to_minor(amount)
+    if amount_minor <= 0:
         raise ValueError("Amount must be > 0")
 
     if not date:
         raise ValueError("Date is required")
-    date_iso = _to_iso_date(date)
+    day = parse_day(date)
 
     category = _normalize_category(category)
 
@@ -118,48 +125,300 @@ def create_expense(expenses_col, *, userEmail, title, amount, category, date, no
     if not _category_allowed(category, allowed_categories):
         raise ValueError("Invalid category")
 
-    now = datetime.utcnow().isoformat()
-    payload = {
-        "userEmail": userEmail,
+    now = now or datetime.utcnow()
+    return {
+        "v": SCHEMA_VERSION,
+        **owner_fields(userEmail, uid),
         "title": title,
-        "amount": amount,
+        "amountMinor": amount_minor,
         "category": category,
-        "date": date_iso,
+        "date": day,
         "notes": notes,
+        "terms": search_terms(title, notes),
         "createdAt": now,
         "updatedAt": now,
     }
 
+
+def create_expense(
+    expenses_col,
+    *,
+    userEmail,
+    title,
+    amount,
+    category,
+    date,
+    notes="",
+    allowed_categories=None,
+    rollups_col=None,
+    uid=None,
+):
+    payload = _build_expense_doc(
+        userEmail=userEmail,
+        uid=uid,
+        title=title,
+        amount=amount,
+        category=category,
+        date=date,
+        notes=notes,
+        allowed_categories=allowed_categories,
+    )
+
     res = expenses_col.insert_one(payload)
     payload["_id"] = res.inserted_id
+    if rollups_col is not None:
+        rollup_add(rollups_col, [payload])
+    bump_version(expenses_col, userEmail, EXPENSES)
     return serialize_expense(payload)
 
 
-def get_expenses(expenses_col, *, userEmail, date_from=None, date_to=None, limit=200, skip=0):
+def _dedup_key(doc):
+    return (day_str(doc["date"]), doc["title"], round(expense_amount(doc), 2))
+
+
+def bulk_create_expenses(
+    expenses_col, *, userEmail, rows, allowed_categories=None, chunk_size=500, dedup=False, rollups_col=None, uid=None
+):
+    """
+    Validates and inserts many expenses with unordered insert_many in chunks.
+    `rows` is an iterable of dicts (title, amount, category, date, notes); each row is
+    validated with the same rules as create_expense.
+    With dedup=True, rows matching an existing (date, title, amount) are skipped, so
+    re-importing the same file is a no-op.
+    Returns {"inserted": n, "duplicates": n, "errors": [{"row": i, "message": str}]}.
+    """
     userEmail = (userEmail or "").strip().lower()
-    if not userEmail:
+    if not userEmail or "@" not in userEmail:
         raise ValueError("User email is required")
 
-    q = {"userEmail": userEmail}
+    chunk_size = max(1, int(chunk_size))
+    result = {"inserted": 0, "duplicates": 0, "errors": []}
+    seen = set()
+
+    def _flush(batch):
+        # batch: [(row_no, doc)]
+        if dedup:
+            dates = sorted({d["date"] for _, d in batch})
+            existing = expenses_col.find(
+                {**owner_filter(userEmail, uid), "date": {"$in": date_in_values(dates)}},
+                {"_id": 0, "date": 1, "title": 1, **STORED_AMOUNT_FIELDS},
+            )
+            known = {_dedup_key(d) for d in existing}
+            fresh = []
+            for row_no, d in batch:
+                if _dedup_key(d) in known:
+                    result["duplicates"] += 1
+                else:
+                    fresh.append((row_no, d))
+            batch = fresh
+
+        if not batch:
+            return
+
+        failed = set()
+        try:
+            res = expenses_col.insert_many([d for _, d in batch], ordered=False)
+            result["inserted"] += len(res.inserted_ids)
+        except BulkWriteError as e:
+            details = e.details or {}
+            result["inserted"] += int(details.get("nInserted", 0))
+            for we in details.get("writeErrors", []):
+                failed.add(we.get("index", 0))
+                row_no = batch[we.get("index", 0)][0]
+                result["errors"].append({"row": row_no, "message": we.get("errmsg") or "Write failed"})
+
+        if rollups_col is not None:
+            rollup_add(rollups_col, [d for i, (_, d) in enumerate(batch) if i not in failed])
+
+    batch = []
+    now = datetime.utcnow()
+    for row_no, row in enumerate(rows, start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("Row must be a JSON object")
+            doc = _build_expense_doc(
+                userEmail=userEmail,
+                uid=uid,
+                title=row.get("title"),
+                amount=row.get("amount"),
+                category=row.get("category"),
+                date=row.get("date"),
+                notes=row.get("notes", ""),
+                allowed_categories=allowed_categories,
+                now=now,
+            )
+        except ValueError as e:
+            result["errors"].append({"row": row_no, "message": str(e)})
+            continue
+
+        if dedup:
+            key = _dedup_key(doc)
+            if key in seen:
+                result["duplicates"] += 1
+                continue
+            seen.add(key)
 
-    if date_from or date_to:
-        q["date"] = {}
-        if date_from:
-            q["date"]["$gte"] = _to_iso_date(date_from)
-        if date_to:
-            q["date"]["$lte"] = _to_iso_date(date_to)
+        batch.append((row_no, doc))
+        if len(batch) >= chunk_size:
+            _flush(batch)
+            batch = []
 
-    cur = expenses_col.find(q).sort("date", DESCENDING).skip(int(skip)).limit(int(limit))
-    return [serialize_expense(d) for d in cur]
+    if batch:
+        _flush(batch)
 
+    if result["inserted"]:
+        bump_version(expenses_col, userEmail, EXPENSES)
+    return result
 
-def update_expense(expenses_col, *, expense_id, userEmail, patch: dict, allowed_categories=None):
+
+# build_* helpers do no I/O; expense_model_async.py reuses them with the async driver.
+def build_range_query(*, userEmail, date_from=None, date_to=None, uid=None) -> dict:
     userEmail = (userEmail or "").strip().lower()
     if not userEmail:
         raise ValueError("User email is required")
 
-    oid = ObjectId(expense_id)
+    q = owner_filter(userEmail, uid)
+    q.update(date_range_filter(date_from, date_to))
+    return q
+
+
+def build_list_query(
+    *, userEmail, date_from=None, date_to=None, categories=None, min_amount=None, max_amount=None, q=None, uid=None
+) -> dict:
+    """
+    Range query plus the optional search filters (see expense_search.py).
+    """
+    query = build_range_query(userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+    clauses = []
+    if categories:
+        query["category"] = {"$in": [_normalize_category(c) for c in categories]}
+    for extra in (amount_range_filter(min_amount, max_amount), terms_filter(q)):
+        if extra:
+            clauses.append(extra)
+    return {"$and": [query, *clauses]} if clauses else query
 
+
+def build_list_options(search: dict) -> dict:
+    """
+    aggregate() options for a filtered list: the planned index as a hint. Plain
+    date-range lists are left to Mongo's planner, which already picks the date index.
+    """
+    if not any(search.get(k) not in (None, "", []) for k in ("categories", "min_amount", "max_amount", "q")):
+        return {}
+    return {"hint": plan_list_index(categories=search.get("categories"), q=search.get("q"))}
+
+
+def build_list_pipeline(
+    *,
+    userEmail,
+    date_from=None,
+    date_to=None,
+    limit=200,
+    skip=0,
+    cursor=None,
+    categories=None,
+    min_amount=None,
+    max_amount=None,
+    q=None,
+    uid=None,
+) -> list:
+    """
+    Newest first, ordered by (date, _id) DESC.
+    Pass `cursor` (from next_expense_cursor) for keyset paging; `skip` is ignored then.
+    """
+    q = build_list_query(
+        userEmail=userEmail,
+        uid=uid,
+        date_from=date_from,
+        date_to=date_to,
+        categories=categories,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        q=q,
+    )
+
+    if cursor:
+        key, oid = decode_cursor(cursor)
+        q = {"$and": [q, keyset_after_typed("date", key, oid)]}
+        skip = 0
+
+    pipeline = [
+        {"$match": q},
+        {"$sort": {"date": DESCENDING, "_id": DESCENDING}},
+    ]
+    if int(skip):
+        pipeline.append({"$skip": int(skip)})
+    pipeline += [
+        {"$limit": parse_limit(limit)},
+        {"$project": LIST_PROJECTION},
+    ]
+    return pipeline
+
+
+def build_summary_pipeline(*, userEmail, date_from=None, date_to=None, uid=None) -> list:
+    q = build_range_query(userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+    return [
+        {"$match": q},
+        # integer cents so the sums below are exact
+        {"$project": {"_id": 0, "minor": AMOUNT_MINOR_EXPR, "category": 1, "day": DAY_EXPR}},
+        {
+            "$facet": {
+                "totals": [
+                    {"$group": {"_id": None, "total": {"$sum": "$minor"}, "count": {"$sum": 1}}},
+                ],
+                "byCategory": [
+                    {"$group": {"_id": "$category", "total": {"$sum": "$minor"}, "count": {"$sum": 1}}},
+                    {"$sort": {"total": DESCENDING}},
+                ],
+                "byDay": [
+                    {"$group": {"_id": "$day", "total": {"$sum": "$minor"}, "count": {"$sum": 1}}},
+                    {"$sort": {"_id": ASCENDING}},
+                ],
+            }
+        },
+    ]
+
+
+def shape_summary(res: dict | None) -> dict:
+    res = res or {}
+    totals = (res.get("totals") or [{}])[0]
+
+    # totals arrive in minor units
+    return {
+        "total": from_minor(round(totals.get("total", 0))),
+        "count": int(totals.get("count", 0)),
+        "byCategory": [
+            {"category": d.get("_id") or "Other", "total": from_minor(round(d.get("total", 0))), "count": int(d.get("count", 0))}
+            for d in res.get("byCategory") or []
+        ],
+        "byDay": [
+            {"date": d.get("_id"), "total": from_minor(round(d.get("total", 0))), "count": int(d.get("count", 0))}
+            for d in res.get("byDay") or []
+        ],
+    }
+
+
+def with_budget(summary: dict, budget: dict, date_from=None, date_to=None) -> dict:
+    """
+    Adds spend-vs-budget figures (budget from sum_budgets) to a shape_summary result.
+    """
+    return {
+        **summary,
+        "budget": {
+            "total": budget["total"],
+            "spent": summary["total"],
+            "remaining": budget["total"] - summary["total"],
+            "exceeded": budget["total"] > 0 and summary["total"] > budget["total"],
+        },
+        "from": date_from,
+        "to": date_to,
+    }
+
+
+def build_expense_update(patch: dict, allowed_categories=None) -> dict:
+    """
+    Validates a PUT body into the $set document (raises ValueError).
+    """
     allowed_fields = {"title", "amount", "category", "date", "notes"}
     update = {}
 
@@ -174,13 +433,10 @@ def update_expense(expenses_col, *, expense_id, userEmail, patch: dict, allowed_
             update["title"] = v
 
         elif k == "amount":
-            try:
-                v = float(v)
-            except Exception:
-                raise ValueError("Amount must be a number")
+            v = to_minor(v)
             if v <= 0:
                 raise ValueError("Amount must be > 0")
-            update["amount"] = v
+            update["amountMinor"] = v
 
         elif k == "category":
             cat = _normalize_category(v)
@@ -194,7 +450,7 @@ def update_expense(expenses_col, *, expense_id, userEmail, patch: dict, allowed_
         elif k == "date":
             if not v:
                 raise ValueError("Date is required")
-            update["date"] = _to_iso_date(v)
+            update["date"] = parse_day(v)
 
         elif k == "notes":
             update["notes"] = (v or "").strip()
@@ -202,22 +458,491 @@ def update_expense(expenses_col, *, expense_id, userEmail, patch: dict, allowed_
     if not update:
         raise ValueError("No valid fields to update")
 
-    update["updatedAt"] = datetime.utcnow().isoformat()
+    update["updatedAt"] = datetime.utcnow()
+    return update
+
+
+def get_expenses(
+    expenses_col,
+    *,
+    userEmail,
+    date_from=None,
+    date_to=None,
+    limit=200,
+    skip=0,
+    cursor=None,
+    categories=None,
+    min_amount=None,
+    max_amount=None,
+    q=None,
+    uid=None,
+):
+    """
+    One page of expenses; categories (list), min_amount/max_amount and q (words in
+    title/notes) narrow it server-side.
+    """
+    search = {"categories": parse_categories(categories), "min_amount": min_amount, "max_amount": max_amount, "q": q}
+    pipeline = build_list_pipeline(
+        userEmail=userEmail,
+        uid=uid,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        **search,
+    )
+    return list(expenses_col.aggregate(pipeline, **build_list_options(search)))
+
+
+def next_expense_cursor(items, limit):
+    """
+    Cursor for the page after `items`, or None when this was the last page.
+    """
+    if not items or len(items) < parse_limit(limit):
+        return None
+    last = items[-1]
+    # the key must have the stored type (v2 dates vs legacy strings) to resume correctly
+    key = parse_day(last["date"]) if int(last.get("v") or 1) >= SCHEMA_VERSION else last["date"]
+    return encode_cursor(key, last["_id"])
+
+
+EXPORT_FIELDS = ("date", "title", "amount", "category", "notes")
+
+
+def iter_expenses(
+    expenses_col,
+    *,
+    userEmail,
+    date_from=None,
+    date_to=None,
+    categories=None,
+    include_notes=True,
+    batch_size=1000,
+    uid=None,
+):
+    """
+    Lazily yields lean expense dicts (newest first) for exports.
+    Only the exported fields are projected and the cursor is fetched in batches,
+    so memory stays flat no matter how many rows the user has.
+    """
+    q = build_range_query(userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+
+    if categories:
+        q["category"] = {"$in": [_normalize_category(c) for c in categories]}
+
+    fields = [f for f in EXPORT_FIELDS if include_notes or f != "notes"]
+    projection = {f: 1 for f in fields} | STORED_AMOUNT_FIELDS
 
-    res = expenses_col.find_one_and_update(
-        {"_id": oid, "userEmail": userEmail},
-        {"$set": update},
-        return_document=ReturnDocument.AFTER,
+    cur = (
+        expenses_col.find(q, projection)
+        .sort([("date", DESCENDING), ("_id", DESCENDING)])
+        .batch_size(int(batch_size))
     )
+    for d in cur:
+        item = {
+            "_id": str(d["_id"]),
+            "date": day_str(d.get("date")),
+            "title": d.get("title") or "",
+            "amount": expense_amount(d),
+            "category": d.get("category") or "Other",
+        }
+        if include_notes:
+            item["notes"] = d.get("notes") or ""
+        yield item
+
+
+def summarize_expenses(expenses_col, *, userEmail, date_from=None, date_to=None, uid=None):
+    """
+    Aggregates a user's expenses inside Mongo (single round trip).
+    Returns {total, count, byCategory: [{category,total,count}], byDay: [{date,total,count}]}.
+    """
+    pipeline = build_summary_pipeline(userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+    return shape_summary(next(expenses_col.aggregate(pipeline), None))
+
+
+def update_expense(
+    expenses_col, *, expense_id, userEmail, patch: dict, allowed_categories=None, rollups_col=None, uid=None
+):
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+
+    oid = ObjectId(expense_id)
+    update = build_expense_update(patch, allowed_categories)
+
+    owned = {**owner_filter(userEmail, uid), "_id": oid}
+
+    # BEFORE: rollups need the old date/category/amount, and `after` is cheap to derive
+    for _ in range(3):
+        terms = _terms_update(expenses_col, owned, update)
+        if terms is None:
+            return None
+        fields, guard = terms
+        before, fields = _patch_expense(expenses_col, owned, fields, guard)
+        if before or not guard:
+            break
+        # the unpatched title/notes changed under us: re-read it and retry
+    if not before:
+        return None
+
+    after = {**before, **fields}
+    if "amountMinor" in fields:
+        after.pop("amount", None)
+    if rollups_col is not None:
+        rollup_on_update(rollups_col, before, after)
+    bump_version(expenses_col, userEmail, EXPENSES)
+    return serialize_expense(after)
+
+
+def _terms_update(expenses_col, owned, update):
+    """
+    (update, guard) with `terms` recomputed in the same $set whenever title or notes
+    change. A patch carrying only one of them reads the other first; the guard
+    (merged into the update filter) makes the write miss if that field changed
+    meanwhile. None when the document does not exist.
+    """
+    changed = [f for f in ("title", "notes") if f in update]
+    if not changed:
+        return update, {}
+    if len(changed) == 2:
+        return {**update, "terms": search_terms(update["title"], update["notes"])}, {}
+
+    other = "notes" if changed[0] == "title" else "title"
+    current = expenses_col.find_one(owned, {other: 1})
+    if current is None:
+        return None
+    merged = {other: current.get(other), **update}
+    return {**update, "terms": search_terms(merged.get("title"), merged.get("notes"))}, {other: current.get(other)}
 
-    return serialize_expense(res)
+
+def _patch_expense(expenses_col, owned, update, guard=None):
+    """
+    Applies `update` and returns (doc before, fields set). A legacy v1 document is
+    rewritten as v2 in the same atomic update, so no document ever mixes versions.
+    `guard` is extra filter fields the document must still match.
+    """
+    owned = {**owned, **(guard or {})}
+    for _ in range(2):
+        before = expenses_col.find_one_and_update(
+            {**owned, "v": SCHEMA_VERSION},
+            {"$set": update},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before or not dual_read_enabled():
+            return before, update
+
+        legacy = expenses_col.find_one(owned)
+        if not legacy:
+            return None, update
+        upgrade = build_v2_upgrade({**legacy, **update})
+        if upgrade is None:
+            continue  # migrated between the two reads
+
+        fields = {**upgrade["$set"], **update}
+        before = expenses_col.find_one_and_update(
+            {**owned, "v": {"$ne": SCHEMA_VERSION}},
+            {"$set": fields, "$unset": upgrade["$unset"]},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before:
+            return before, fields
+    return None, update
+
+
+def write_tombstones(tombstones_col, *, userEmail, expense_ids, now=None, uid=None) -> None:
+    """
+    Records deletions for /api/expenses/changes (expired by a TTL index).
+    The tombstone _id is the expense _id, so it sorts in the same keyset as live rows.
+    """
+    if tombstones_col is None or not expense_ids:
+        return
+    now = now or datetime.utcnow()
+    tombstones_col.bulk_write(
+        [
+            UpdateOne(
+                {"_id": oid},
+                {"$set": {**owner_fields(userEmail, uid), "updatedAt": now, "deletedAt": now}},
+                upsert=True,
+            )
+            for oid in expense_ids
+        ],
+        ordered=False,
+    )
 
 
-def delete_expense(expenses_col, *, expense_id, userEmail):
+def reassign_category(expenses_col, *, userEmail, sources, target, rollups_col=None, chunk_size=0, uid=None) -> int:
+    """
+    Moves every expense in `sources` to `target` (rename, merge, delete-with-reassign).
+    chunk_size=0 is one update_many for the whole ledger; otherwise ids are collected
+    and rewritten chunk_size at a time, so a huge ledger never holds one long write.
+    updatedAt is bumped so /api/expenses/changes re-delivers the rows. Returns the count moved.
+    """
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+    sources = [_normalize_category(s) for s in sources]
+    target = _normalize_category(target)
+    sources = [s for s in sources if s != target]
+    if not sources:
+        return 0
+
+    match = {**owner_filter(userEmail, uid), "category": {"$in": sources}}
+    update = {"$set": {"category": target, "updatedAt": datetime.utcnow()}}
+    moved = 0
+    if not chunk_size:
+        moved = expenses_col.update_many(match, update).modified_count
+    else:
+        while True:
+            # matched rows leave the filter once rewritten, so each pass starts from the top
+            ids = [d["_id"] for d in expenses_col.find(match, {"_id": 1}).limit(int(chunk_size))]
+            if not ids:
+                break
+            moved += expenses_col.update_many({"_id": {"$in": ids}, "category": {"$in": sources}}, update).modified_count
+
+    if rollups_col is not None:
+        rollup_move_category(rollups_col, userEmail=userEmail, uid=uid, sources=sources, target=target)
+    if moved:
+        bump_version(expenses_col, userEmail, EXPENSES)
+    return moved
+
+
+def delete_expense(expenses_col, *, expense_id, userEmail, rollups_col=None, tombstones_col=None, uid=None):
     userEmail = (userEmail or "").strip().lower()
     if not userEmail:
         raise ValueError("User email is required")
 
     oid = ObjectId(expense_id)
-    res = expenses_col.delete_one({"_id": oid, "userEmail": userEmail})
-    return res.deleted_count == 1
+    if rollups_col is None:
+        res = expenses_col.delete_one({**owner_filter(userEmail, uid), "_id": oid})
+        if res.deleted_count != 1:
+            return False
+    else:
+        doc = expenses_col.find_one_and_delete(
+            {**owner_filter(userEmail, uid), "_id": oid},
+            projection={"userEmail": 1, "uid": 1, "date": 1, "category": 1, **STORED_AMOUNT_FIELDS},
+        )
+        if not doc:
+            return False
+        rollup_add(rollups_col, [doc], sign=-1)
+
+    write_tombstones(tombstones_col, userEmail=userEmail, uid=uid, expense_ids=[oid])
+    bump_version(expenses_col, userEmail, EXPENSES)
+    return True
+
+
+class SyncTokenExpired(ValueError):
+    """The since-token predates tombstone retention; the client must reload everything."""
+
+
+# re-deliver this many trailing seconds once caught up, so writes whose updatedAt was
+# stamped just before a concurrent read are not skipped (clients upsert by _id)
+CHANGES_SAFETY_SECONDS = 5
+
+
+CHANGES_SORT = [("updatedAt", ASCENDING), ("_id", ASCENDING)]
+
+
+def changes_query(owner: dict, key, oid) -> dict:
+    """
+    Filter for the (updatedAt, _id) keyset after the since token (key, oid).
+    """
+    q = dict(owner)
+    if key is not None:
+        q.update(keyset_after_typed("updatedAt", key, oid, ascending=True))
+    return q
+
+
+def parse_since(since):
+    """
+    (updatedAt key, _id, issued_at) of a since token, (None, None, None) without one.
+    issued_at is when the token's sync started; tokens without the stamp fall back to
+    their key. Raises ValueError when malformed, SyncTokenExpired when older than
+    tombstone retention.
+    """
+    if not since:
+        return None, None, None
+    key, oid = decode_cursor(since)
+    try:
+        issued = cursor_issued_at(since) or parse_ts(key)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid since token")
+    if (datetime.utcnow() - issued).total_seconds() > TOMBSTONE_TTL_SECONDS:
+        raise SyncTokenExpired("since token is too old, reload all expenses")
+    return key, oid, issued
+
+
+def shape_changes(ups: list, dels: list, *, key, oid, limit: int, issued=None) -> dict:
+    """
+    Merges up to limit + 1 live rows and tombstones (each in keyset order) into one page.
+
+    Keys of an initial sync can be arbitrarily old, so the next token carries when the
+    sync started (issued, or now for a first page) until it catches up; deletes after
+    that point keep their tombstones for TOMBSTONE_TTL_SECONDS from it.
+    """
+    now = datetime.utcnow()
+    merged = sorted(
+        [(d["updatedAt"], d["_id"], False, d) for d in ups] + [(d["updatedAt"], d["_id"], True, d) for d in dels],
+        key=lambda t: (bson_order_key(t[0]), t[1]),
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changes, deleted = [], []
+    for _, _, is_tombstone, d in merged:
+        if is_tombstone:
+            deleted.append(str(d["_id"]))
+        else:
+            changes.append(serialize_expense(d))
+
+    floor = now - timedelta(seconds=CHANGES_SAFETY_SECONDS)
+    if merged:
+        last_key, last_oid = merged[-1][0], merged[-1][1]
+    elif key is not None:
+        last_key, last_oid = key, oid
+    else:
+        last_key, last_oid = floor, ObjectId("0" * 24)
+
+    if not has_more and bson_order_key(last_key) > bson_order_key(floor):
+        last_key, last_oid = floor, ObjectId("0" * 24)
+
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "next_since": encode_cursor(last_key, last_oid, issued_at=(issued or now) if has_more else now),
+        "has_more": has_more,
+    }
+
+
+def get_expense_changes(expenses_col, tombstones_col, *, userEmail, since=None, limit=500, uid=None):
+    """
+    Expenses created/updated and ids deleted after the `since` token, oldest first.
+    Without a token, every live expense is returned (initial sync, no tombstones).
+    Returns {"changes": [...], "deleted": [id, ...], "next_since": token, "has_more": bool};
+    keep calling with next_since while has_more is true.
+    """
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+    limit = parse_limit(limit, default=500)
+    key, oid, issued = parse_since(since)
+    q = changes_query(owner_filter(userEmail, uid), key, oid)
+
+    ups = list(expenses_col.find(q).sort(CHANGES_SORT).limit(limit + 1))
+    dels = []
+    if since and tombstones_col is not None:
+        dels = list(tombstones_col.find(q, {"updatedAt": 1}).sort(CHANGES_SORT).limit(limit + 1))
+    return shape_changes(ups, dels, key=key, oid=oid, limit=limit, issued=issued)
+
+
+MIGRATION_V2_ID = "expense_schema_v2"
+
+
+def migrate_expenses_v2(expenses_col, *, meta_col=None, batch_size=1000, userEmail=None, restart=False) -> dict:
+    """
+    Rewrites v1 expenses as v2 in _id order, one unordered bulk_write per batch.
+    Progress (last _id) is checkpointed in `_meta` after every batch, so an
+    interrupted run resumes where it stopped; restart=True scans from the start.
+    Each update re-checks `v` in its filter, so running next to live writes is safe.
+    Returns {"scanned", "upgraded", "errors", "lastId"}.
+    """
+    if meta_col is None:
+        meta_col = expenses_col.database["_meta"]
+    batch_size = max(1, int(batch_size))
+
+    ckpt_id = MIGRATION_V2_ID if not userEmail else f"{MIGRATION_V2_ID}:{userEmail.strip().lower()}"
+    last_id = None
+    if not restart:
+        ckpt = meta_col.find_one({"_id": ckpt_id}, {"lastId": 1}) or {}
+        last_id = ckpt.get("lastId")
+
+    users_col = expenses_col.database["users"]
+    q = {"v": {"$ne": SCHEMA_VERSION}}
+    if userEmail:
+        q.update(owner_filter(userEmail, resolve_uid(users_col, userEmail)))
+
+    stats = {"scanned": 0, "upgraded": 0, "errors": 0, "lastId": None}
+    while True:
+        page_q = {**q, "_id": {"$gt": last_id}} if last_id is not None else q
+        batch = list(expenses_col.find(page_q).sort("_id", ASCENDING).limit(batch_size))
+        if not batch:
+            break
+
+        ops, upgraded = [], []
+        for d in batch:
+            try:
+                upgrade = build_v2_upgrade(d)
+            except ValueError:  # unparseable date/amount: leave it for a human
+                stats["errors"] += 1
+                continue
+            if upgrade:
+                ops.append(UpdateOne({"_id": d["_id"], "v": {"$ne": SCHEMA_VERSION}}, upgrade))
+                upgraded.append(d)
+        if ops:
+            res = expenses_col.bulk_write(ops, ordered=False)
+            stats["upgraded"] += res.modified_count
+        for u in owner_emails(users_col, upgraded):
+            bump_version(expenses_col, u, EXPENSES)
+
+        last_id = batch[-1]["_id"]
+        stats["scanned"] += len(batch)
+        meta_col.update_one(
+            {"_id": ckpt_id},
+            {"$set": {"lastId": last_id, "updatedAt": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    stats["lastId"] = str(last_id) if last_id is not None else None
+    return stats
+
+
+TERMS_BACKFILL_ID = "expense_search_terms"
+
+
+def backfill_search_terms(expenses_col, *, meta_col=None, batch_size=1000, restart=False) -> dict:
+    """
+    Sets `terms` (see expense_search.py) on expenses written before it existed, in
+    _id order with a checkpoint in `_meta` like migrate_expenses_v2. Each update
+    re-checks that `terms` is still missing, so live writes win.
+    Returns {"scanned", "updated", "lastId"}.
+    """
+    if meta_col is None:
+        meta_col = expenses_col.database["_meta"]
+    batch_size = max(1, int(batch_size))
+
+    last_id = None
+    if not restart:
+        last_id = (meta_col.find_one({"_id": TERMS_BACKFILL_ID}, {"lastId": 1}) or {}).get("lastId")
+
+    q = {"terms": {"$exists": False}}
+    stats = {"scanned": 0, "updated": 0, "lastId": None}
+    while True:
+        page_q = {**q, "_id": {"$gt": last_id}} if last_id is not None else q
+        batch = list(
+            expenses_col.find(page_q, {"title": 1, "notes": 1, "userEmail": 1, "uid": 1})
+            .sort("_id", ASCENDING)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        ops = [
+            UpdateOne({"_id": d["_id"], **q}, {"$set": {"terms": search_terms(d.get("title"), d.get("notes"))}})
+            for d in batch
+        ]
+        res = expenses_col.bulk_write(ops, ordered=False)
+        stats["updated"] += res.modified_count
+        # search results changed: expire cached list ETags
+        for u in owner_emails(expenses_col.database["users"], batch):
+            bump_version(expenses_col, u, EXPENSES)
+
+        last_id = batch[-1]["_id"]
+        stats["scanned"] += len(batch)
+        meta_col.update_one(
+            {"_id": TERMS_BACKFILL_ID},
+            {"$set": {"lastId": last_id, "updatedAt": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    stats["lastId"] = str(last_id) if last_id is not None else None
+    return stats
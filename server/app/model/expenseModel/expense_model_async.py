@@ -0,0 +1,107 @@
+# app/model/expenseModel/expense_model_async.py
+"""
+Async counterparts of expense_model for the ASGI app. Validation and query
+building come from the shared build_* helpers; only the driver calls differ.
+"""
+from app.model.expenseModel.expense_model import (
+    CHANGES_SORT,
+    _build_expense_doc,
+    build_list_options,
+    build_list_pipeline,
+    build_summary_pipeline,
+    changes_query,
+    parse_since,
+    serialize_expense,
+    shape_changes,
+    shape_summary,
+)
+from app.model.expenseModel.expense_search import parse_categories
+from app.model.ownerModel.owner_model import owner_filter
+from app.model.rollupModel.rollup_model import build_rollup_ops
+from app.model.versionModel.version_model import EXPENSES
+from app.model.versionModel.version_model_async import bump_version
+from app.utils.pagination import parse_limit
+
+
+async def create_expense(
+    expenses_col,
+    *,
+    userEmail,
+    title,
+    amount,
+    category,
+    date,
+    notes="",
+    allowed_categories=None,
+    rollups_col=None,
+    uid=None,
+):
+    payload = _build_expense_doc(
+        userEmail=userEmail,
+        uid=uid,
+        title=title,
+        amount=amount,
+        category=category,
+        date=date,
+        notes=notes,
+        allowed_categories=allowed_categories,
+    )
+
+    res = await expenses_col.insert_one(payload)
+    payload["_id"] = res.inserted_id
+    if rollups_col is not None:
+        await rollups_col.bulk_write(build_rollup_ops([payload]), ordered=False)
+    await bump_version(expenses_col, userEmail, EXPENSES)
+    return serialize_expense(payload)
+
+
+async def get_expenses(
+    expenses_col,
+    *,
+    userEmail,
+    date_from=None,
+    date_to=None,
+    limit=200,
+    skip=0,
+    cursor=None,
+    categories=None,
+    min_amount=None,
+    max_amount=None,
+    q=None,
+    uid=None,
+):
+    search = {"categories": parse_categories(categories), "min_amount": min_amount, "max_amount": max_amount, "q": q}
+    pipeline = build_list_pipeline(
+        userEmail=userEmail,
+        uid=uid,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        **search,
+    )
+    cur = await expenses_col.aggregate(pipeline, **build_list_options(search))
+    return await cur.to_list()
+
+
+async def summarize_expenses(expenses_col, *, userEmail, date_from=None, date_to=None, uid=None):
+    pipeline = build_summary_pipeline(userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+    cur = await expenses_col.aggregate(pipeline)
+    rows = await cur.to_list(1)
+    return shape_summary(rows[0] if rows else None)
+
+
+async def get_expense_changes(expenses_col, tombstones_col, *, userEmail, since=None, limit=500, uid=None):
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+    limit = parse_limit(limit, default=500)
+    key, oid, issued = parse_since(since)
+    q = changes_query(owner_filter(userEmail, uid), key, oid)
+
+    ups = await expenses_col.find(q).sort(CHANGES_SORT).limit(limit + 1).to_list(None)
+    dels = []
+    if since and tombstones_col is not None:
+        dels = await tombstones_col.find(q, {"updatedAt": 1}).sort(CHANGES_SORT).limit(limit + 1).to_list(None)
+    return shape_changes(ups, dels, key=key, oid=oid, limit=limit, issued=issued)
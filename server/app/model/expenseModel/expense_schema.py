@@ -0,0 +1,186 @@
+# app/model/expenseModel/expense_schema.py
+"""
+Expense document versions.
+
+    v1 (legacy)  date "YYYY-MM-DD", createdAt/updatedAt isoformat strings, amount float
+    v2           v=2, date BSON date (UTC midnight), createdAt/updatedAt BSON dates,
+                 amountMinor int (cents) -> exact $sum, smaller docs and index keys
+
+New writes are always v2. Until `flask expenses migrate-v2` has finished, reads accept
+both (EXPENSE_DUAL_READ=1); set it to 0 afterwards to drop the legacy query branches.
+A document is always entirely v1 or v2 (writes that touch a v1 doc upgrade all of it),
+so the Mongo expressions below can branch on `v` alone.
+"""
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+SCHEMA_VERSION = 2
+MINOR_PER_UNIT = 100
+
+_state = {"dual_read": True}
+
+
+def configure_expense_schema(dual_read: bool | None = None) -> None:
+    if dual_read is not None:
+        _state["dual_read"] = bool(dual_read)
+
+
+def dual_read_enabled() -> bool:
+    return _state["dual_read"]
+
+
+# ---------- python-side conversions ----------
+def to_minor(amount) -> int:
+    """
+    12.345 -> 1235 (half-up). Goes through str so 0.1 + binary noise doesn't leak in.
+    """
+    try:
+        return int((Decimal(str(amount)) * MINOR_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError("Amount must be a number")
+
+
+def from_minor(minor) -> float:
+    return int(minor or 0) / MINOR_PER_UNIT
+
+
+def parse_day(value) -> datetime:
+    """
+    "YYYY-MM-DD" (or a datetime) -> naive UTC midnight. Raises ValueError.
+    """
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime((value or "").strip(), "%Y-%m-%d")
+
+
+def day_str(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return (value or "")[:10]
+
+
+def month_str(value) -> str:
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m")
+    return (value or "")[:7]
+
+
+def parse_ts(value) -> datetime:
+    """
+    Stored timestamp (datetime or isoformat string) -> naive UTC datetime.
+    """
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def expense_amount(doc: dict) -> float:
+    if doc.get("amountMinor") is not None:
+        return from_minor(doc["amountMinor"])
+    return float(doc.get("amount", 0) or 0)
+
+
+def expense_minor(doc: dict) -> int:
+    if doc.get("amountMinor") is not None:
+        return int(doc["amountMinor"])
+    return to_minor(doc.get("amount", 0) or 0)
+
+
+def bson_order_key(value):
+    """
+    Sort key matching Mongo's order for a field holding legacy strings and dates
+    (every string sorts before every date).
+    """
+    return (1, value) if isinstance(value, datetime) else (0, value or "")
+
+
+# ---------- Mongo expressions (aggregation) ----------
+_IS_V2 = {"$eq": [{"$ifNull": ["$v", 1]}, SCHEMA_VERSION]}
+
+DAY_EXPR = {"$cond": [_IS_V2, {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}, "$date"]}
+MONTH_EXPR = {"$cond": [_IS_V2, {"$dateToString": {"format": "%Y-%m", "date": "$date"}}, {"$substrCP": ["$date", 0, 7]}]}
+AMOUNT_EXPR = {"$cond": [_IS_V2, {"$divide": ["$amountMinor", MINOR_PER_UNIT]}, "$amount"]}
+# integer cents for both versions, so $sum over it is exact
+AMOUNT_MINOR_EXPR = {
+    "$cond": [_IS_V2, "$amountMinor", {"$round": [{"$multiply": ["$amount", MINOR_PER_UNIT]}, 0]}]
+}
+VERSION_EXPR = {"$ifNull": ["$v", 1]}
+
+# fields a v2 document stores instead of/in addition to v1 (for find() projections)
+STORED_AMOUNT_FIELDS = {"amount": 1, "amountMinor": 1, "v": 1}
+
+
+# ---------- query builders ----------
+def date_range_filter(date_from=None, date_to=None) -> dict:
+    """
+    Filter on `date` for an inclusive [from, to] range of YYYY-MM-DD strings.
+    """
+    if not date_from and not date_to:
+        return {}
+
+    v2, v1 = {}, {}
+    if date_from:
+        v2["$gte"] = parse_day(date_from)
+        v1["$gte"] = day_str(v2["$gte"])
+    if date_to:
+        v2["$lte"] = parse_day(date_to)
+        v1["$lte"] = day_str(v2["$lte"])
+
+    if not dual_read_enabled():
+        return {"date": v2}
+    return {"$or": [{"date": v2}, {"date": v1}]}
+
+
+def amount_range_filter(min_amount=None, max_amount=None) -> dict:
+    """
+    Filter for an inclusive [min, max] amount range (either bound optional).
+    """
+    if min_amount in (None, "") and max_amount in (None, ""):
+        return {}
+
+    v2, v1 = {}, {}
+    if min_amount not in (None, ""):
+        v2["$gte"] = to_minor(min_amount)
+        v1["$gte"] = from_minor(v2["$gte"])
+    if max_amount not in (None, ""):
+        v2["$lte"] = to_minor(max_amount)
+        v1["$lte"] = from_minor(v2["$lte"])
+    if "$gte" in v2 and "$lte" in v2 and v2["$gte"] > v2["$lte"]:
+        raise ValueError("Minimum amount must be <= maximum amount")
+
+    if not dual_read_enabled():
+        return {"amountMinor": v2}
+    return {"$or": [{"amountMinor": v2}, {"amountMinor": {"$exists": False}, "amount": v1}]}
+
+
+def date_in_values(days) -> list:
+    """
+    $in values matching any of the given days in either representation.
+    """
+    values = [parse_day(d) for d in days]
+    if dual_read_enabled():
+        values += [day_str(d) for d in values]
+    return values
+
+
+# ---------- v1 -> v2 ----------
+def needs_upgrade(doc: dict) -> bool:
+    return int(doc.get("v") or 1) < SCHEMA_VERSION
+
+
+def build_v2_upgrade(doc: dict) -> dict | None:
+    """
+    Update document turning a stored v1 expense into v2 (None if already v2).
+    """
+    if not needs_upgrade(doc):
+        return None
+
+    fields = {"v": SCHEMA_VERSION, "amountMinor": expense_minor(doc)}
+    if doc.get("date") is not None:
+        d = doc["date"]
+        fields["date"] = parse_day(d if isinstance(d, datetime) else day_str(d))
+    for ts in ("createdAt", "updatedAt"):
+        if doc.get(ts) is not None:
+            fields[ts] = parse_ts(doc[ts])
+    return {"$set": fields, "$unset": {"amount": ""}}
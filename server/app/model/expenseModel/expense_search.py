@@ -0,0 +1,94 @@
+# app/model/expenseModel/expense_search.py
+"""
+Server-side search for GET /api/expenses: category (multi), amount range and a
+free-text `q` over title and notes.
+
+Text search uses a compact per-user token index instead of a Mongo text index
+(a collection can only have one of those, and the owner-key cutover needs a
+userEmail-led and a uid-led copy of every index). Each expense stores `terms`,
+the distinct lowercased words of its title and notes. The query words become
+prefix matches on `terms`, so "gro" finds "Groceries" while the user types.
+Documents written before `terms` existed are indexed by
+`flask expenses index-terms`.
+
+plan_list_index() picks the compound index for a filter combination; the list
+query passes it to Mongo as a hint (see INDEX_SPECS in app/db/indexes.py).
+"""
+import re
+
+from app.model.ownerModel.owner_model import owner_index
+
+# \w is unicode-aware, so non-Latin titles tokenize too
+_WORD_RE = re.compile(r"\w+")
+
+MAX_TERMS = 32  # per document
+MAX_TERM_LENGTH = 24  # longer words are truncated (prefix queries still match)
+MIN_TERM_LENGTH = 2
+MAX_QUERY_TERMS = 5
+MAX_CATEGORIES = 50
+
+
+def _words(text: str) -> list:
+    return [w[:MAX_TERM_LENGTH] for w in _WORD_RE.findall((text or "").lower())]
+
+
+def search_terms(*texts) -> list:
+    """
+    Sorted distinct tokens stored on an expense (from title and notes).
+    """
+    terms = {w for t in texts for w in _words(t) if len(w) >= MIN_TERM_LENGTH}
+    return sorted(terms)[:MAX_TERMS]
+
+
+def query_terms(q) -> list:
+    q = (q or "").strip()
+    if len(q) > 100:
+        raise ValueError("Search query must be <= 100 characters")
+    words = list(dict.fromkeys(_words(q)))
+    if len(words) > MAX_QUERY_TERMS:
+        raise ValueError(f"Search query must have <= {MAX_QUERY_TERMS} words")
+    return words
+
+
+def terms_filter(q) -> dict:
+    """
+    Every word must match: complete words exactly, the last one as a prefix.
+    """
+    words = query_terms(q)
+    if not words:
+        return {}
+    clauses = [{"terms": w} for w in words[:-1]]
+    clauses.append({"terms": {"$regex": "^" + re.escape(words[-1])}})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def parse_categories(values) -> list:
+    cats = []
+    for v in values or []:
+        for name in str(v).split(","):
+            name = " ".join(name.split())
+            if name and name != "All" and name not in cats:
+                cats.append(name)
+    if len(cats) > MAX_CATEGORIES:
+        raise ValueError(f"At most {MAX_CATEGORIES} categories")
+    return cats
+
+
+def plan_list_index(*, categories=None, q=None) -> str:
+    """
+    Index for a list query, most selective filter first:
+
+        q           (owner, terms, date, _id, ...)     words narrow hardest
+        categories  (owner, category, date, _id, ...)  $in merges sorted runs
+        otherwise   (owner, date, _id, ...)            amount is filtered on index keys
+
+    Every choice keeps category and amountMinor in the key, so the remaining
+    filters are applied before any document is fetched.
+    """
+    if query_terms(q):
+        name = "idx_userEmail_terms_date_desc"
+    elif categories:
+        name = "idx_userEmail_category_date_desc"
+    else:
+        name = "idx_userEmail_date_desc_covering"
+    return owner_index(name)
@@ -0,0 +1,193 @@
+# app/model/ownerModel/owner_model.py
+"""
+Owner key of per-user documents (expenses, tombstones, budgets, settings, rollups).
+
+Documents used to be owned by the lowercased `userEmail` string, which leads every
+compound index. The compact key is `uid`, the user's ObjectId (12 bytes, already in
+the JWT). The cutover runs online in four steps:
+
+    1. expand    new writes store `uid` next to `userEmail` (always on now)
+    2. backfill  `flask owner-key backfill` sets `uid` on older documents, resumably
+    3. switch    OWNER_READ_KEY=uid: queries, upserts and unique keys use `uid`
+    4. contract  OWNER_WRITE_EMAIL=0, `flask owner-key drop-email`; once it completes
+                 it drops the userEmail-led indexes (retire_email_indexes in app/db/indexes.py)
+
+Both keys are written until step 4, so reads can move between them (and back)
+at any point of the cutover.
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, UpdateOne
+
+EMAIL = "email"
+UID = "uid"
+
+# collections carrying an owner key (data_versions stays keyed by email: one tiny doc per user)
+OWNER_COLLECTIONS = ("expenses", "expense_tombstones", "budgets", "settings", "expense_rollups")
+BACKFILL_ID = "owner_uid"
+
+_state = {"read_key": EMAIL, "write_email": True}
+
+
+def configure_owner_key(read_key: str | None = None, write_email: bool | None = None) -> None:
+    if read_key is not None:
+        read_key = read_key.strip().lower()
+        if read_key not in (EMAIL, UID):
+            raise ValueError("OWNER_READ_KEY must be email or uid")
+        _state["read_key"] = read_key
+    if write_email is not None:
+        _state["write_email"] = bool(write_email)
+
+
+def read_key() -> str:
+    return _state["read_key"]
+
+
+def writes_email() -> bool:
+    return _state["write_email"]
+
+
+def to_uid(uid) -> ObjectId | None:
+    if uid is None or isinstance(uid, ObjectId):
+        return uid
+    try:
+        return ObjectId(str(uid))
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid user id")
+
+
+def owner_filter(userEmail: str | None, uid=None) -> dict:
+    """
+    Equality filter on the active owner key.
+    """
+    if _state["read_key"] == UID:
+        oid = to_uid(uid)
+        if oid is None:
+            raise ValueError("User id is required")
+        return {"uid": oid}
+    return {"userEmail": (userEmail or "").strip().lower()}
+
+
+def owner_fields(userEmail: str | None, uid=None) -> dict:
+    """
+    Owner fields stamped on a new document.
+    """
+    fields = {}
+    oid = to_uid(uid)
+    if oid is not None:
+        fields["uid"] = oid
+    elif _state["read_key"] == UID:
+        raise ValueError("User id is required")
+    if _state["write_email"] or oid is None:
+        fields["userEmail"] = (userEmail or "").strip().lower()
+    return fields
+
+
+def owner_of(doc: dict) -> tuple:
+    """
+    (userEmail, uid) of a stored document, for code that writes on its behalf.
+    """
+    return doc.get("userEmail"), doc.get("uid")
+
+
+def owner_value(doc: dict):
+    """
+    Value of the active owner key in a document (or group key).
+    """
+    return doc.get("uid") if _state["read_key"] == UID else doc.get("userEmail")
+
+
+def owner_index(name: str) -> str:
+    """
+    Name of the index for the active owner key; every userEmail-led index has a
+    uid-led twin (see INDEX_SPECS in app/db/indexes.py).
+    """
+    return name.replace("userEmail", "uid") if _state["read_key"] == UID else name
+
+
+def resolve_uid(users_col, userEmail: str) -> ObjectId | None:
+    """
+    uid for an email, for CLI paths that only know the email.
+    """
+    doc = users_col.find_one({"email": (userEmail or "").strip().lower()}, {"_id": 1})
+    return doc["_id"] if doc else None
+
+
+def owner_emails(users_col, docs) -> set:
+    """
+    Emails owning the given documents (data_versions is keyed by email). Documents
+    that no longer carry userEmail (after drop-email) are resolved from `uid` with
+    one users lookup; uids without a user are left out.
+    """
+    emails, uids = set(), set()
+    for d in docs:
+        if d.get("userEmail"):
+            emails.add(d["userEmail"])
+        elif d.get("uid") is not None:
+            uids.add(d["uid"])
+    if uids:
+        emails.update(u["email"] for u in users_col.find({"_id": {"$in": sorted(uids)}}, {"email": 1}))
+    return emails
+
+
+def backfill_owner_uid(db, *, collections=OWNER_COLLECTIONS, batch_size=1000, restart=False, drop_email=False) -> dict:
+    """
+    Sets `uid` on documents that only have `userEmail` (or, with drop_email=True,
+    unsets `userEmail` where `uid` is present). Walks each collection in _id order,
+    one unordered bulk_write per batch, and checkpoints the last _id in `_meta`,
+    so an interrupted run resumes. Each update re-checks its condition in the filter.
+    Returns {collection: {"scanned", "updated", "orphans"}}; orphans have no matching user.
+    """
+    if drop_email and (_state["write_email"] or _state["read_key"] != UID):
+        raise ValueError("Set OWNER_READ_KEY=uid and OWNER_WRITE_EMAIL=0 before dropping userEmail")
+
+    meta = db["_meta"]
+    users = db["users"]
+    batch_size = max(1, int(batch_size))
+    phase = "drop_email" if drop_email else "uid"
+    cond = {"uid": {"$exists": True}, "userEmail": {"$exists": True}} if drop_email else {
+        "uid": {"$exists": False},
+        "userEmail": {"$exists": True},
+    }
+
+    out = {}
+    for name in collections:
+        col = db[name]
+        ckpt_id = f"{BACKFILL_ID}:{phase}:{name}"
+        last_id = None
+        if not restart:
+            last_id = (meta.find_one({"_id": ckpt_id}, {"lastId": 1}) or {}).get("lastId")
+
+        stats = {"scanned": 0, "updated": 0, "orphans": 0}
+        while True:
+            q = {**cond, "_id": {"$gt": last_id}} if last_id is not None else cond
+            batch = list(col.find(q, {"userEmail": 1}).sort("_id", ASCENDING).limit(batch_size))
+            if not batch:
+                break
+
+            if drop_email:
+                ops = [UpdateOne({"_id": d["_id"], **cond}, {"$unset": {"userEmail": ""}}) for d in batch]
+            else:
+                emails = sorted({d.get("userEmail") for d in batch if d.get("userEmail")})
+                uids = {u["email"]: u["_id"] for u in users.find({"email": {"$in": emails}}, {"email": 1})}
+                ops = []
+                for d in batch:
+                    oid = uids.get(d.get("userEmail"))
+                    if oid is None:
+                        stats["orphans"] += 1
+                        continue
+                    ops.append(UpdateOne({"_id": d["_id"], **cond}, {"$set": {"uid": oid}}))
+            if ops:
+                stats["updated"] += col.bulk_write(ops, ordered=False).modified_count
+
+            last_id = batch[-1]["_id"]
+            stats["scanned"] += len(batch)
+            meta.update_one(
+                {"_id": ckpt_id},
+                {"$set": {"lastId": last_id, "updatedAt": datetime.utcnow()}},
+                upsert=True,
+            )
+        out[name] = stats
+    return out
@@ -0,0 +1,243 @@
+# app/model/rollupModel/rollup_model.py
+"""
+Materialized monthly totals: one document per (owner, month, category)
+holding {totalMinor, count}, where the owner is the active key from owner_model.
+Totals are integer minor units (like expense amountMinor), so any number of
+$inc deltas sums exactly; they become currency only when serialized.
+Kept current with $inc deltas from the expense write paths; rebuild_rollups()
+recomputes it from raw expenses.
+
+Buckets written before totalMinor carry a float `total`; bucket_minor() reads
+both until `flask rollups rebuild` has rewritten them.
+"""
+from datetime import datetime
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.model.expenseModel.expense_schema import (
+    AMOUNT_MINOR_EXPR,
+    MONTH_EXPR,
+    expense_minor,
+    from_minor,
+    month_str,
+    to_minor,
+)
+from app.model.ownerModel.owner_model import UID, owner_fields, owner_filter, owner_of, owner_value, read_key
+
+
+def _bucket_filter(userEmail: str, month: str, category: str, uid=None) -> dict:
+    return {**owner_filter(userEmail, uid), "month": month, "category": category or "Other"}
+
+
+def bucket_minor(doc: dict) -> int:
+    # legacy buckets: a float `total`, possibly with totalMinor deltas applied on top since
+    return int(doc.get("totalMinor") or 0) + (to_minor(doc["total"]) if doc.get("total") else 0)
+
+
+def _inc_op(owner, month, category, minor_delta, count_delta):
+    userEmail, uid = owner
+    bucket = _bucket_filter(userEmail, month, category, uid)
+    update = {
+        "$inc": {"totalMinor": int(minor_delta), "count": int(count_delta)},
+        "$set": {"updatedAt": datetime.utcnow()},
+    }
+    # the other owner key rides along on insert, so buckets carry both during the cutover
+    extra = {k: v for k, v in owner_fields(userEmail, uid).items() if k not in bucket}
+    if extra:
+        update["$setOnInsert"] = extra
+    return UpdateOne(bucket, update, upsert=True)
+
+
+def build_rollup_ops(docs, sign: int = 1) -> list:
+    """
+    $inc operations adding (sign=1) or removing (sign=-1) expense docs from their
+    buckets. Docs that share a bucket are merged into one $inc.
+    """
+    deltas = {}
+    for d in docs:
+        key = (owner_of(d), month_str(d.get("date")), d.get("category") or "Other")
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + expense_minor(d), count + 1)
+
+    return [_inc_op(o, m, c, sign * total, sign * count) for (o, m, c), (total, count) in deltas.items()]
+
+
+def rollup_add(rollups_col, docs, sign: int = 1) -> None:
+    ops = build_rollup_ops(docs, sign)
+    if ops:
+        rollups_col.bulk_write(ops, ordered=False)
+
+
+def rollup_on_update(rollups_col, before: dict, after: dict) -> None:
+    """
+    Moves an expense between buckets when its date/category changed, or
+    applies the amount delta in place otherwise.
+    """
+    if not before or not after:
+        return
+
+    old_key = (month_str(before.get("date")), before.get("category") or "Other")
+    new_key = (month_str(after.get("date")), after.get("category") or "Other")
+    old_amount = expense_minor(before)
+    new_amount = expense_minor(after)
+    owner = owner_of(before)
+
+    if old_key == new_key:
+        if new_amount != old_amount:
+            rollups_col.bulk_write([_inc_op(owner, *old_key, new_amount - old_amount, 0)])
+        return
+
+    rollups_col.bulk_write(
+        [
+            _inc_op(owner, *old_key, -old_amount, -1),
+            _inc_op(owner, *new_key, new_amount, 1),
+        ],
+        ordered=False,
+    )
+
+
+def rollup_move_category(rollups_col, *, userEmail, sources, target, uid=None) -> int:
+    """
+    Folds a user's buckets for `sources` into `target`, month by month, after the
+    expenses themselves were re-categorized. Returns the buckets folded.
+
+    Each source bucket is taken with find_one_and_delete and its value $inc'ed into
+    the target, so a concurrent delta for a source bucket is never lost: it either
+    lands before the take (and moves with it) or recreates the source bucket after.
+    A crash between the two steps under-counts the target; rebuild_rollups() repairs it.
+    """
+    sources = [s for s in sources if s != target]
+    if not sources:
+        return 0
+    owned = owner_filter(userEmail, uid)
+    folded = 0
+    for b in list(rollups_col.find({**owned, "category": {"$in": sources}}, {"_id": 1})):
+        taken = rollups_col.find_one_and_delete({"_id": b["_id"]})
+        if taken is None:
+            continue  # folded by a concurrent rename
+        op = _inc_op((userEmail, uid), taken["month"], target, bucket_minor(taken), taken.get("count", 0))
+        rollups_col.bulk_write([op])
+        folded += 1
+    return folded
+
+
+def get_rollups(rollups_col, *, userEmail, month_from=None, month_to=None, uid=None) -> list:
+    """
+    Buckets for a user in [month_from, month_to] (YYYY-MM, both optional), oldest first.
+    """
+    userEmail = (userEmail or "").strip().lower()
+    if not userEmail:
+        raise ValueError("User email is required")
+
+    q = {**owner_filter(userEmail, uid), "count": {"$gt": 0}}
+    if month_from or month_to:
+        q["month"] = {}
+        if month_from:
+            q["month"]["$gte"] = month_from
+        if month_to:
+            q["month"]["$lte"] = month_to
+
+    cur = rollups_col.find(q, {"_id": 0, "month": 1, "category": 1, "totalMinor": 1, "total": 1, "count": 1}).sort(
+        [("month", ASCENDING), ("category", ASCENDING)]
+    )
+    return [
+        {
+            "month": d["month"],
+            "category": d.get("category") or "Other",
+            "total": from_minor(bucket_minor(d)),
+            "count": int(d.get("count", 0)),
+        }
+        for d in cur
+    ]
+
+
+def _recompute(expenses_col, owner=None):
+    # group on the active key only; the other one is carried along ($max skips missing values),
+    # so a half-backfilled user still yields one bucket per (month, category)
+    key_field, other = ("uid", "userEmail") if read_key() == UID else ("userEmail", "uid")
+    pipeline = [
+        {"$match": owner or {}},
+        {
+            "$group": {
+                "_id": {
+                    key_field: f"${key_field}",
+                    "month": MONTH_EXPR,
+                    "category": {"$ifNull": ["$category", "Other"]},
+                },
+                other: {"$max": f"${other}"},
+                "total": {"$sum": AMOUNT_MINOR_EXPR},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    for d in expenses_col.aggregate(pipeline, allowDiskUse=True):
+        keys = {**d["_id"], other: d.get(other)}
+        yield {
+            **{k: v for k, v in keys.items() if v is not None},
+            "totalMinor": int(round(d["total"])),
+            "count": int(d["count"]),
+        }
+
+
+def _owner_match(userEmail=None, uid=None):
+    if not userEmail and uid is None:
+        return None
+    return owner_filter(userEmail, uid)
+
+
+def rebuild_rollups(expenses_col, rollups_col, *, userEmail=None, uid=None, batch_size=1000) -> int:
+    """
+    Recompute buckets from raw expenses (one user, or everyone). Returns buckets written.
+    Run while writes are quiet: deltas applied mid-rebuild can be lost.
+    """
+    owner = _owner_match(userEmail, uid)
+    rollups_col.delete_many(owner or {})
+
+    now = datetime.utcnow()
+    written = 0
+    batch = []
+    for b in _recompute(expenses_col, owner):
+        batch.append({**b, "updatedAt": now})
+        if len(batch) >= batch_size:
+            rollups_col.insert_many(batch, ordered=False)
+            written += len(batch)
+            batch = []
+    if batch:
+        rollups_col.insert_many(batch, ordered=False)
+        written += len(batch)
+    return written
+
+
+def verify_rollups(expenses_col, rollups_col, *, userEmail=None, uid=None) -> list:
+    """
+    Compare stored buckets with a fresh recompute.
+    Returns [{userEmail, month, category, expected: {...}, actual: {...}}] for mismatches;
+    `userEmail` holds the active owner key (an email, or a uid once switched).
+    Totals are integer minor units, so they must match exactly.
+    """
+    owner = _owner_match(userEmail, uid)
+
+    def _key(d):
+        return (owner_value(d), d["month"], d.get("category") or "Other")
+
+    expected = {_key(b): b for b in _recompute(expenses_col, owner)}
+    actual = {
+        _key(d): d
+        for d in rollups_col.find(owner or {}, {"_id": 0})
+        if int(d.get("count", 0)) != 0
+    }
+
+    diffs = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (str(k[0]), k[1], k[2])):
+        e = expected.get(key, {})
+        a = actual.get(key, {})
+        e_minor, a_minor = bucket_minor(e), bucket_minor(a)
+        if int(e.get("count", 0)) != int(a.get("count", 0)) or e_minor != a_minor:
+            diffs.append({
+                "userEmail": str(key[0]),
+                "month": key[1],
+                "category": key[2],
+                "expected": {"total": from_minor(e_minor), "count": int(e.get("count", 0))},
+                "actual": {"total": from_minor(a_minor), "count": int(a.get("count", 0))},
+            })
+    return diffs
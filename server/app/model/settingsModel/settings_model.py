@@ -2,6 +2,15 @@
 from datetime import datetime
 import re
 
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.indexes import ensure_collection_indexes
+from app.model.expenseModel.expense_model import reassign_category
+from app.model.ownerModel.owner_model import owner_fields, owner_filter
+from app.model.versionModel.version_model import SETTINGS, bump_version
+from app.utils.cache import TTLCache
+
 DEFAULT_CATEGORIES = [
     {"name": "Food", "color": "#10B981"},
     {"name": "Transport", "color": "#3B82F6"},
@@ -20,9 +29,64 @@ PALETTE = [
 
 HEX_RE = re.compile(r"^#[0-9A-Fa-f]{6}$")
 
+# v2 settings docs keep `categories` sorted by `key` (the lowercased name)
+SETTINGS_VERSION = 2
+WRITE_ATTEMPTS = 3  # guarded writes retried after a concurrent change
+
+# per-user allowed category names (frozenset), used by expense validation
+_allowed_categories_cache = TTLCache(maxsize=10000, ttl=60)
+_invalidation_listeners = []
+
 
 def ensure_settings_indexes(settings_col):
-    settings_col.create_index([("userEmail", 1)], unique=True, name="uniq_user_settings")
+    # declared in app/db/indexes.py; reconciled at startup
+    return ensure_collection_indexes(settings_col)
+
+
+def configure_category_cache(maxsize: int | None = None, ttl: float | None = None) -> None:
+    _allowed_categories_cache.configure(maxsize=maxsize, ttl=ttl)
+
+
+def add_category_invalidation_listener(fn) -> None:
+    """
+    fn(userEmail) is called whenever a user's categories change in this process.
+    Use it to publish the change to other workers (Redis pub/sub, etc.); the receiver
+    should call invalidate_allowed_categories(userEmail, notify=False).
+    """
+    _invalidation_listeners.append(fn)
+
+
+def invalidate_allowed_categories(userEmail: str, notify: bool = True) -> None:
+    userEmail = (userEmail or "").strip().lower()
+    _allowed_categories_cache.delete(userEmail)
+    if not notify:
+        return
+    for fn in list(_invalidation_listeners):
+        try:
+            fn(userEmail)
+        except Exception:
+            # a broken listener must not fail the write; TTL still bounds staleness
+            pass
+
+
+def cached_allowed_categories(userEmail: str) -> frozenset | None:
+    return _allowed_categories_cache.get((userEmail or "").strip().lower())
+
+
+def cache_allowed_categories(userEmail: str, cats: list) -> frozenset:
+    allowed = frozenset(c.get("name") for c in cats if c.get("name"))
+    _allowed_categories_cache.set((userEmail or "").strip().lower(), allowed)
+    return allowed
+
+
+def get_allowed_categories(settings_col, userEmail: str, uid=None) -> frozenset:
+    """
+    Allowed category names for a user, served from the process-local cache when fresh.
+    """
+    cached = cached_allowed_categories(userEmail)
+    if cached is not None:
+        return cached
+    return cache_allowed_categories(userEmail, list_categories(settings_col, userEmail, uid))
 
 
 def _normalize_name(name: str) -> str:
@@ -64,93 +128,323 @@ def _pick_unused_color(used: set[str]) -> str:
     return "#6B7280"
 
 
-def get_or_create_settings(settings_col, userEmail: str) -> dict:
-    doc = settings_col.find_one({"userEmail": userEmail})
-    if doc:
-        if not isinstance(doc.get("categories"), list) or len(doc["categories"]) == 0:
-            settings_col.update_one(
-                {"_id": doc["_id"]},
-                {"$set": {"categories": DEFAULT_CATEGORIES, "updatedAt": datetime.utcnow()}},
-            )
-            doc["categories"] = DEFAULT_CATEGORIES
-        return doc
-
-    doc = {
-        "userEmail": userEmail,
-        "categories": DEFAULT_CATEGORIES,
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow(),
-    }
-    settings_col.insert_one(doc)
-    return doc
+def _key(name: str) -> str:
+    # categories are unique, and kept sorted, by their lowercased name
+    return (name or "").strip().lower()
 
 
-def list_categories(settings_col, userEmail: str) -> list:
-    doc = get_or_create_settings(settings_col, userEmail)
-    cats = doc.get("categories") or []
-    # sort for UX
-    return sorted(cats, key=lambda c: (c.get("name") or "").lower())
+def keyed_categories(categories: list) -> list:
+    """
+    Stored form of a category list: each entry carries its `key`, sorted by it.
+    """
+    cats = [{**c, "key": _key(c.get("name"))} for c in categories or [] if c.get("name")]
+    return sorted(cats, key=lambda c: c["key"])
 
 
-def add_category(settings_col, userEmail: str, name: str, color: str | None = None) -> list:
-    name = _normalize_name(name)
+def new_settings_doc(userEmail: str, uid=None) -> dict:
+    now = datetime.utcnow()
+    return {
+        **owner_fields(userEmail, uid),
+        "v": SETTINGS_VERSION,
+        "categories": keyed_categories(DEFAULT_CATEGORIES),
+        "createdAt": now,
+        "updatedAt": now,
+    }
 
-    doc = get_or_create_settings(settings_col, userEmail)
-    categories = doc.get("categories") or []
 
-    # name unique (case-insensitive)
-    exists = any((c.get("name") or "").strip().lower() == name.lower() for c in categories)
-    if exists:
-        raise ValueError("Category already exists")
+def settings_upsert(userEmail: str, uid=None) -> tuple:
+    """
+    (filter, update) for find_one_and_update(..., upsert=True): returns the user's
+    settings, creating them with the defaults on first use.
+    """
+    owned = owner_filter(userEmail, uid)
+    defaults = {k: v for k, v in new_settings_doc(userEmail, uid).items() if k not in owned}
+    return owned, {"$setOnInsert": defaults}
 
-    used_colors = _color_set(categories)
 
-    normalized_color = _normalize_color(color)
-    if normalized_color:
-        if normalized_color in used_colors:
-            raise ValueError("Color already used by another category")
-        final_color = normalized_color
-    else:
-        final_color = _pick_unused_color(used_colors)
-
-    new_cat = {
-        "name": name,
-        "color": final_color,
-        "createdAt": datetime.utcnow(),
+def settings_upgrade(doc: dict) -> dict | None:
+    """
+    (filter, update) bringing a pre-v2 settings doc (unsorted, no keys, maybe empty)
+    to the current layout, or None when it is current.
+    """
+    if doc.get("v") == SETTINGS_VERSION and doc.get("categories"):
+        return None
+    categories = doc.get("categories") if isinstance(doc.get("categories"), list) else []
+    update = {
+        "$set": {
+            "v": SETTINGS_VERSION,
+            "categories": keyed_categories(categories or DEFAULT_CATEGORIES),
+            "updatedAt": datetime.utcnow(),
+        }
     }
+    return {"_id": doc["_id"]}, update
 
-    settings_col.update_one(
-        {"userEmail": userEmail},
-        {"$push": {"categories": new_cat}, "$set": {"updatedAt": datetime.utcnow()}},
-        upsert=True,
-    )
 
-    return list_categories(settings_col, userEmail)
+def public_categories(doc: dict | None) -> list:
+    # stored already sorted; the key is internal
+    return [{k: v for k, v in c.items() if k != "key"} for c in (doc or {}).get("categories") or []]
 
 
-def delete_category(settings_col, userEmail: str, name: str) -> list:
-    name = _normalize_name(name)
+def get_or_create_settings(settings_col, userEmail: str, uid=None) -> dict:
+    """
+    One round trip: an upsert that only writes when the doc does not exist yet.
+    """
+    flt, update = settings_upsert(userEmail, uid)
+    try:
+        doc = settings_col.find_one_and_update(flt, update, upsert=True, return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        # lost a first-request race to another upsert; the doc exists now
+        doc = settings_col.find_one(flt)
 
-    # protect "Other" (optional but recommended)
-    if name.strip().lower() == "other":
-        raise ValueError("Cannot delete 'Other' category")
+    upgrade = settings_upgrade(doc)
+    if upgrade:
+        doc = settings_col.find_one_and_update(*upgrade, return_document=ReturnDocument.AFTER)
+    return doc
 
-    doc = get_or_create_settings(settings_col, userEmail)
-    categories = doc.get("categories") or []
 
-    # find actual stored name to delete (case-insensitive)
-    target = None
+def list_categories(settings_col, userEmail: str, uid=None) -> list:
+    return public_categories(get_or_create_settings(settings_col, userEmail, uid))
+
+
+def _find_category(categories: list, name: str) -> dict | None:
+    key = _key(name)
     for c in categories:
-        if (c.get("name") or "").strip().lower() == name.lower():
-            target = c.get("name")
-            break
+        if _key(c.get("name")) == key:
+            return c
+    return None
+
+
+def _changed(settings_col, userEmail: str) -> None:
+    invalidate_allowed_categories(userEmail)
+    bump_version(settings_col, userEmail, SETTINGS)
+
 
-    if not target:
-        raise ValueError("Category not found")
+def add_category(settings_col, userEmail: str, name: str, color: str | None = None, uid=None) -> list:
+    """
+    A single conditional $push: the filter requires the name and the color to be unused,
+    and $sort keeps the array ordered. Picking a color from the palette needs the colors
+    in use, so that case reads the doc first (the filter still guards the pick).
+    """
+    name = _normalize_name(name)
+    key = _key(name)
+    color = _normalize_color(color)
+
+    doc = None
+    for _ in range(WRITE_ATTEMPTS):
+        if color:
+            pick = color
+        else:
+            doc = doc or get_or_create_settings(settings_col, userEmail, uid)
+            pick = _pick_unused_color(_color_set(doc.get("categories")))
+
+        now = datetime.utcnow()
+        entry = {"name": name, "key": key, "color": pick, "createdAt": now}
+        updated = settings_col.find_one_and_update(
+            {
+                **owner_filter(userEmail, uid),
+                "v": SETTINGS_VERSION,
+                "categories.key": {"$ne": key},
+                "categories.color": {"$ne": pick},
+            },
+            {"$push": {"categories": {"$each": [entry], "$sort": {"key": 1}}}, "$set": {"updatedAt": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated:
+            _changed(settings_col, userEmail)
+            return public_categories(updated)
+
+        # no match: find out why (only failed adds pay for this read)
+        doc = get_or_create_settings(settings_col, userEmail, uid)
+        if _find_category(doc["categories"], name):
+            raise ValueError("Category already exists")
+        if color and color in _color_set(doc["categories"]):
+            raise ValueError("Color already used by another category")
+        # the doc was missing or pre-v2 (both fixed now), or a concurrent add took the picked color
+    raise ValueError("Categories changed concurrently, please retry")
+
+
+def _source_keys(sources) -> list:
+    keys = list(dict.fromkeys(_key(_normalize_name(s)) for s in sources or []))
+    if not keys:
+        raise ValueError("At least one source category is required")
+    if "other" in keys:
+        raise ValueError("Cannot rename or merge 'Other'")
+    return keys
+
+
+def _plan_fold(categories: list, keys: list, sources, target: str, create=True, exclusive=False) -> tuple:
+    """
+    (stored names of the sources, stored name of the target) for folding `sources`
+    into `target` within `categories`; raises ValueError when the fold is not allowed.
+    """
+    names = []
+    for s in sources:
+        c = _find_category(categories, _normalize_name(s))
+        if not c:
+            raise ValueError(f"Category not found: {s}")
+        if c["name"] not in names:
+            names.append(c["name"])
+
+    existing = _find_category(categories, target)
+    if existing and existing["key"] not in keys:
+        if exclusive:
+            raise ValueError("Category already exists")
+        return names, existing["name"]
+    if not existing and not create:
+        raise ValueError("Category to reassign to not found")
+    return names, target
+
+
+def _fold_categories(settings_col, userEmail, sources, target, uid=None, create=True, exclusive=False) -> tuple:
+    """
+    Removes `sources` from the settings doc, leaving `target`. Returns
+    (stored names of the sources, categories after the change).
+
+    An existing target is one conditional $pull: the filter requires every source
+    and the target to exist. A new target (or a case change) renames the first source
+    in place; that rewrites the array, guarded by the updatedAt that was read.
+    create=False requires the target to exist; exclusive=True requires it not to.
+    """
+    target = _normalize_name(target)
+    target_key = _key(target)
+    keys = _source_keys(sources)
+    owned = owner_filter(userEmail, uid)
+
+    if not exclusive and target_key not in keys:
+        before = settings_col.find_one_and_update(
+            {**owned, "v": SETTINGS_VERSION, "categories.key": {"$all": keys + [target_key]}},
+            {"$pull": {"categories": {"key": {"$in": keys}}}, "$set": {"updatedAt": datetime.utcnow()}},
+            # BEFORE: the sources' stored names are needed to re-tag expenses
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before:
+            names = [c["name"] for c in before["categories"] if c["key"] in keys]
+            return names, [c for c in before["categories"] if c["key"] not in keys]
+
+    for _ in range(WRITE_ATTEMPTS):
+        doc = get_or_create_settings(settings_col, userEmail, uid)
+        categories = doc["categories"]
+        names, _ = _plan_fold(categories, keys, sources, target, create=create, exclusive=exclusive)
+
+        existing = _find_category(categories, target)
+        if existing and existing["key"] not in keys:
+            kept = [c for c in categories if c["key"] not in keys]
+        else:
+            # new name (or a case change of a source): the first matching source entry becomes the target
+            keep = existing["key"] if existing else keys[0]
+            kept = keyed_categories(
+                {**c, "name": target} if c["key"] == keep else c
+                for c in categories
+                if c["key"] == keep or c["key"] not in keys
+            )
 
-    settings_col.update_one(
-        {"userEmail": userEmail},
-        {"$pull": {"categories": {"name": target}}, "$set": {"updatedAt": datetime.utcnow()}},
+        res = settings_col.update_one(
+            {"_id": doc["_id"], "updatedAt": doc.get("updatedAt")},
+            {"$set": {"categories": kept, "updatedAt": datetime.utcnow()}},
+        )
+        if res.matched_count:
+            return names, kept
+    raise ValueError("Categories changed concurrently, please retry")
+
+
+def _move_and_fold(
+    settings_col, userEmail, sources, target, uid, expenses_col, rollups_col, chunk_size, create=True, exclusive=False
+) -> dict:
+    """
+    Moves the sources' expenses and rollups to `target`, then folds the settings doc.
+    Expenses go first: if the move fails part-way, the sources are still categories,
+    so the same request can simply be retried. Expenses added to a source between
+    the move and the fold are swept up by a second (usually empty) pass.
+    """
+    target = _normalize_name(target)
+    keys = _source_keys(sources)
+    doc = get_or_create_settings(settings_col, userEmail, uid)
+    names, target_name = _plan_fold(doc["categories"], keys, sources, target, create=create, exclusive=exclusive)
+
+    def move(names):
+        if expenses_col is None:
+            return 0
+        return reassign_category(
+            expenses_col,
+            userEmail=userEmail,
+            uid=uid,
+            sources=names,
+            target=target_name,
+            rollups_col=rollups_col,
+            chunk_size=chunk_size,
+        )
+
+    moved = move(names)
+    names, categories = _fold_categories(
+        settings_col, userEmail, sources, target, uid=uid, create=create, exclusive=exclusive
     )
+    _changed(settings_col, userEmail)
+    moved += move(names)
+    return {"categories": public_categories({"categories": categories}), "moved": moved}
+
+
+def merge_categories(
+    settings_col,
+    userEmail: str,
+    sources: list,
+    target: str,
+    uid=None,
+    expenses_col=None,
+    rollups_col=None,
+    chunk_size: int = 0,
+) -> dict:
+    """
+    Folds `sources` into `target` (an existing category, or a new name that takes the
+    first source's color) and rewrites the user's expenses and rollups to match.
+    rename_category and delete_category are the one-source cases.
+    Returns {"categories": [...], "moved": <expenses re-categorized>}.
+    """
+    return _move_and_fold(settings_col, userEmail, sources, target, uid, expenses_col, rollups_col, chunk_size)
+
+
+def rename_category(
+    settings_col,
+    userEmail: str,
+    name: str,
+    new_name: str,
+    uid=None,
+    expenses_col=None,
+    rollups_col=None,
+    chunk_size: int = 0,
+) -> dict:
+    """
+    Renames a category (a case-only change is allowed) and its expenses.
+    """
+    return _move_and_fold(
+        settings_col, userEmail, [name], new_name, uid, expenses_col, rollups_col, chunk_size, exclusive=True
+    )
+
 
-    return list_categories(settings_col, userEmail)
+def delete_category(
+    settings_col,
+    userEmail: str,
+    name: str,
+    uid=None,
+    reassign_to: str | None = None,
+    expenses_col=None,
+    rollups_col=None,
+    chunk_size: int = 0,
+) -> dict:
+    """
+    Removes a category; its expenses move to `reassign_to` (an existing category,
+    default 'Other'), so none is left with a name that validation rejects.
+    """
+    name = _normalize_name(name)
+
+    # protect "Other" (optional but recommended)
+    if _key(name) == "other":
+        raise ValueError("Cannot delete 'Other' category")
+
+    target = _normalize_name(reassign_to) if reassign_to else "Other"
+    if _key(target) == _key(name):
+        raise ValueError("Cannot reassign a category to itself")
+    # a settings doc without 'Other' gets it back, in the deleted category's place
+    return _move_and_fold(
+        settings_col, userEmail, [name], target, uid, expenses_col, rollups_col, chunk_size,
+        create=_key(target) == "other",
+    )
@@ -0,0 +1,35 @@
+# app/model/settingsModel/settings_model_async.py
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.model.settingsModel.settings_model import (
+    cache_allowed_categories,
+    cached_allowed_categories,
+    public_categories,
+    settings_upgrade,
+    settings_upsert,
+)
+
+
+async def get_or_create_settings(settings_col, userEmail: str, uid=None) -> dict:
+    flt, update = settings_upsert(userEmail, uid)
+    try:
+        doc = await settings_col.find_one_and_update(flt, update, upsert=True, return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        doc = await settings_col.find_one(flt)
+
+    upgrade = settings_upgrade(doc)
+    if upgrade:
+        doc = await settings_col.find_one_and_update(*upgrade, return_document=ReturnDocument.AFTER)
+    return doc
+
+
+async def list_categories(settings_col, userEmail: str, uid=None) -> list:
+    return public_categories(await get_or_create_settings(settings_col, userEmail, uid))
+
+
+async def get_allowed_categories(settings_col, userEmail: str, uid=None) -> frozenset:
+    cached = cached_allowed_categories(userEmail)
+    if cached is not None:
+        return cached
+    return cache_allowed_categories(userEmail, await list_categories(settings_col, userEmail, uid))
@@ -0,0 +1,47 @@
+# app/model/versionModel/version_model.py
+"""
+Per-user, per-collection change counters backing conditional GETs.
+
+Every write function in the expense/budget/settings models bumps its counter
+(one upserted $inc on `data_versions`, _id = userEmail). GET handlers read the
+counter with a single _id lookup and answer 304 when the client's ETag still
+matches, skipping the real query and serialization.
+"""
+import hashlib
+
+VERSIONS_COLLECTION = "data_versions"
+
+EXPENSES = "expenses"
+BUDGETS = "budgets"
+SETTINGS = "settings"
+
+
+def _versions_col(col):
+    # the counters live next to the data collection being written
+    return col.database[VERSIONS_COLLECTION]
+
+
+def build_bump(userEmail: str, *names):
+    return (
+        {"_id": (userEmail or "").strip().lower()},
+        {"$inc": {n: 1 for n in names}},
+    )
+
+
+def bump_version(col, userEmail: str, *names) -> None:
+    filt, update = build_bump(userEmail, *names)
+    _versions_col(col).update_one(filt, update, upsert=True)
+
+
+def get_versions(versions_col, userEmail: str, names) -> dict:
+    doc = versions_col.find_one({"_id": (userEmail or "").strip().lower()}, {n: 1 for n in names}) or {}
+    return {n: int(doc.get(n, 0)) for n in names}
+
+
+def build_etag(userEmail: str, versions: dict, variant: str = "") -> str:
+    """
+    Opaque tag for (user, counters, request variant). The user is hashed in so a
+    shared browser cache can never revalidate one user's body for another.
+    """
+    parts = [(userEmail or "").strip().lower(), variant] + [f"{k}{v}" for k, v in sorted(versions.items())]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
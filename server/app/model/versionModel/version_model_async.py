@@ -0,0 +1,12 @@
+# app/model/versionModel/version_model_async.py
+from app.model.versionModel.version_model import VERSIONS_COLLECTION, build_bump
+
+
+async def bump_version(col, userEmail: str, *names) -> None:
+    filt, update = build_bump(userEmail, *names)
+    await col.database[VERSIONS_COLLECTION].update_one(filt, update, upsert=True)
+
+
+async def get_versions(versions_col, userEmail: str, names) -> dict:
+    doc = await versions_col.find_one({"_id": (userEmail or "").strip().lower()}, {n: 1 for n in names}) or {}
+    return {n: int(doc.get(n, 0)) for n in names}
@@ -3,6 +3,7 @@ from .authRoutes import auth_bp
 from .expenseRoutes.expense_routes import expense_bp
 from .budgetRoutes.budget_routes import budget_bp
 from .settingsRoutes.settings_routes import settings_bp
+from .dashboardRoutes.dashboard_routes import dashboard_bp
 
 def register_routes(app):
     app.register_blueprint(health_bp)
@@ -10,3 +11,4 @@ def register_routes(app):
     app.register_blueprint(expense_bp)
     app.register_blueprint(budget_bp)
     app.register_blueprint(settings_bp)
+    app.register_blueprint(dashboard_bp)
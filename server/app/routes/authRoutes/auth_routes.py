@@ -1,17 +1,26 @@
-from flask import Blueprint, current_app, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from pymongo.errors import DuplicateKeyError
 from app.model.authModel.user_model import verify_user_password
-from app.utils.jwt_utils import sign_token, verify_token
-import jwt  # PyJWT exceptions
-
-
-
+from app.utils.jwt_utils import sign_token
+from app.utils.auth import (
+    REVOKED_COLLECTION,
+    authenticate_request,
+    extract_bearer_token,
+    get_jwt_secret,
+    require_admin,
+    require_auth,
+    revoke_token,
+)
 from app.db.mongo import get_db
+from app.utils.export import EXPORT_FORMATS, encode_chunks, ndjson_chunks
+from app.utils.passwords import PasswordHasherBusy
 from app.model.authModel.user_model import (
-    ensure_user_indexes,
     create_user,
-    get_all_users,
     get_user_by_email,
+    get_user_profile,
+    iter_users,
+    list_users,
+    update_user_profile,
     verify_user_password,
 )
 
@@ -38,7 +47,6 @@ def signup():
 
     db = get_db(current_app)
     users = db["users"]
-    ensure_user_indexes(users)
 
     try:
         user = create_user(users, name=name, email=email, password=password)
@@ -47,6 +55,9 @@ def signup():
     except DuplicateKeyError:
         return jsonify({"success": False, "message": "Email already exists"}), 409
 
+    except PasswordHasherBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 503
+
     except Exception:
         return jsonify({"success": False, "message": "Server error"}), 500
 
@@ -72,7 +83,7 @@ def signin():
 
         user_token = sign_token(
             payload={"email": user["email"], "uid": user["_id"]},
-            secret=current_app.config["JWT_SECRET"],
+            secret=get_jwt_secret(),
             expires_seconds=current_app.config["JWT_EXPIRES_SECONDS"],
         )
 
@@ -83,17 +94,24 @@ def signin():
             "user": user
         }), 200
 
+    except PasswordHasherBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 503
+
     except Exception:
         return jsonify({"success": False, "message": "Server error"}), 500
 
 
-
 # -------------------- GET USERS --------------------
 @auth_bp.get("/users")
+@require_admin
 def get_users():
     """
-    GET /api/auth/users
-    Optional query param: ?email=
+    GET /api/auth/users (admins only: ADMIN_EMAILS)
+        ?email=                  single user by exact email
+        ?email_prefix=           users whose email starts with it (served from the email index)
+        ?fields=name,email       projection (default: all public fields)
+        ?limit=&cursor=          keyset pages; follow next_cursor
+        ?format=ndjson           stream every matching user instead of a page
     """
     db = get_db(current_app)
     users = db["users"]
@@ -107,35 +125,94 @@ def get_users():
 
         return jsonify({"success": True, "user": user}), 200
 
-    # If no email param → return all users
-    all_users = get_all_users(users)
-    return jsonify({"success": True, "users": all_users}), 200
+    fields = request.args.get("fields")
+    email_prefix = (request.args.get("email_prefix") or "").strip() or None
+
+    try:
+        if (request.args.get("format") or "").lower() == "ndjson":
+            rows = iter_users(users, fields=fields, email_prefix=email_prefix)
+            # pull the first row now so query errors surface as a normal JSON error
+            first = next(rows, None)
+
+            def _all_rows():
+                if first is not None:
+                    yield first
+                    yield from rows
+
+            return Response(
+                stream_with_context(encode_chunks(ndjson_chunks(_all_rows()))),
+                status=200,
+                headers={"Cache-Control": "no-store"},
+                content_type=EXPORT_FORMATS["ndjson"][0],
+            )
+
+        items, next_cursor = list_users(
+            users,
+            limit=request.args.get("limit", 200),
+            cursor=request.args.get("cursor"),
+            fields=fields,
+            email_prefix=email_prefix,
+        )
+        return jsonify({"success": True, "users": items, "next_cursor": next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
 
 
 @auth_bp.get("/me")
 def me():
-    auth = request.headers.get("Authorization", "")
-    if not auth.startswith("Bearer "):
-        return jsonify({"success": False, "message": "Missing token"}), 401
+    decoded, err = authenticate_request()
+    if err:
+        return err
 
-    user_token = auth.split(" ", 1)[1].strip()
+    email = decoded.get("email")
+    if not email:
+        return jsonify({"success": False, "message": "Invalid token"}), 401
 
-    try:
-        decoded = verify_token(user_token, current_app.config["JWT_SECRET"])
-        email = decoded.get("email")
-        if not email:
-            return jsonify({"success": False, "message": "Invalid token"}), 401
+    db = get_db(current_app)
+    users = db["users"]
 
-        db = get_db(current_app)
-        users = db["users"]
+    found = get_user_profile(users, decoded.get("uid"), email)
+    if not found:
+        return jsonify({"success": False, "message": "User not found"}), 404
 
-        user = get_user_by_email(users, email)
+    user, etag = found
+    resp = jsonify({"success": True, "user": user})
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp.make_conditional(request)
+
+
+@auth_bp.patch("/me")
+@require_auth
+def update_me():
+    data = request.get_json(silent=True) or {}
+    db = get_db(current_app)
+    try:
+        user = update_user_profile(db["users"], request.user.get("uid"), name=data.get("name"))
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
+        return jsonify({"success": True, "message": "Profile updated", "user": user}), 200
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
 
-        return jsonify({"success": True, "user": user}), 200
 
-    except jwt.ExpiredSignatureError:
-        return jsonify({"success": False, "message": "Token expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"success": False, "message": "Invalid token"}), 401
+# -------------------- SIGN OUT --------------------
+@auth_bp.post("/signout")
+@require_auth
+def signout():
+    """
+    Revokes the presented token until it expires.
+    """
+    try:
+        revoke_token(
+            extract_bearer_token(),
+            revoked_col=get_db(current_app)[REVOKED_COLLECTION],
+            claims=request.user,
+        )
+        return jsonify({"success": True, "message": "Signed out"}), 200
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
@@ -3,12 +3,15 @@ from flask import Blueprint, current_app, request, jsonify
 from bson.errors import InvalidId
 
 from app.db.mongo import get_db
-from app.utils.auth import require_auth, get_authed_email
+from app.utils.auth import require_auth, get_authed_email, get_authed_uid
+from app.utils.conditional import conditional_get
 from app.model.budgetModel.budget_model import (
-    ensure_budget_indexes,
     create_budget,
+    delete_budget_by_id,
     list_budgets,
+    next_budget_cursor,
 )
+from app.model.versionModel.version_model import BUDGETS
 
 budget_bp = Blueprint("budgets", __name__, url_prefix="/api/budgets")
 
@@ -18,6 +21,7 @@ budget_bp = Blueprint("budgets", __name__, url_prefix="/api/budgets")
 def create_budget_route():
     data = request.get_json(silent=True) or {}
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     month = data.get("month")
     amount = data.get("amount")
@@ -25,10 +29,9 @@ def create_budget_route():
 
     db = get_db(current_app)
     col = db["budgets"]
-    ensure_budget_indexes(col)
 
     try:
-        b = create_budget(col, userEmail=userEmail, month=month, amount=amount, notes=notes)
+        b = create_budget(col, userEmail=userEmail, uid=uid, month=month, amount=amount, notes=notes)
         return jsonify({"success": True, "message": "Budget created", "budget": b}), 201
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
@@ -38,19 +41,25 @@ def create_budget_route():
 
 @budget_bp.get("")
 @require_auth
+@conditional_get(BUDGETS)
 def list_all_budgets():
     userEmail = get_authed_email()
+    uid = get_authed_uid()
     month = request.args.get("month")  # optional filter
     limit = request.args.get("limit", 200)
     skip = request.args.get("skip", 0)
+    cursor = request.args.get("cursor")
 
     db = get_db(current_app)
     col = db["budgets"]
-    ensure_budget_indexes(col)
 
     try:
-        items = list_budgets(col, userEmail=userEmail, month=month, limit=limit, skip=skip)
-        return jsonify({"success": True, "budgets": items}), 200
+        items = list_budgets(col, userEmail=userEmail, uid=uid, month=month, limit=limit, skip=skip, cursor=cursor)
+        return jsonify({
+            "success": True,
+            "budgets": items,
+            "next_cursor": next_budget_cursor(items, limit),
+        }), 200
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
     except Exception:
@@ -61,13 +70,13 @@ def list_all_budgets():
 @require_auth
 def delete_budget(budget_id):
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
     col = db["budgets"]
-    ensure_budget_indexes(col)
 
     try:
-        ok = delete_budget_by_id(col, userEmail=userEmail, budget_id=budget_id)
+        ok = delete_budget_by_id(col, userEmail=userEmail, uid=uid, budget_id=budget_id)
         if not ok:
             return jsonify({"success": False, "message": "Budget not found"}), 404
         return jsonify({"success": True, "message": "Budget deleted"}), 200
@@ -0,0 +1,66 @@
+# app/routes/dashboardRoutes/dashboard_routes.py
+from flask import Blueprint, current_app, request, jsonify
+
+from app.db.mongo import get_db
+from app.utils.auth import require_auth, get_authed_email, get_authed_uid
+from app.utils.dashboard import SECTIONS, combined_etag, load_sections, section_etags, unchanged_sections
+from app.utils.periods import range_from_args
+from app.model.budgetModel.budget_model import list_budgets
+from app.model.expenseModel.expense_model import get_expenses, next_expense_cursor
+from app.model.settingsModel.settings_model import list_categories
+from app.model.versionModel.version_model import VERSIONS_COLLECTION, get_versions
+
+dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/api/dashboard")
+
+
+def _with_etag(resp, etag):
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+@dashboard_bp.get("")
+@require_auth
+def dashboard():
+    """
+    GET /api/dashboard[?month= | ?year= | ?from=&to=][&limit=]
+    Expenses in the range, budgets and categories in one response (see app/utils/dashboard.py).
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    limit = request.args.get("limit", 200)
+
+    try:
+        date_from, date_to = range_from_args(request.args)
+
+        db = get_db(current_app)
+        versions = get_versions(db[VERSIONS_COLLECTION], userEmail, SECTIONS.values())
+        etags = section_etags(userEmail, versions, {"expenses": f"{date_from}|{date_to}|{limit}"})
+        etag = combined_etag(etags)
+
+        unchanged = unchanged_sections(request.if_none_match, etags)
+        if len(unchanged) == len(SECTIONS):
+            return _with_etag(current_app.response_class(status=304), etag)
+
+        loaders = {
+            "expenses": lambda: get_expenses(
+                db["expenses"], userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to, limit=limit
+            ),
+            "budgets": lambda: list_budgets(db["budgets"], userEmail=userEmail, uid=uid),
+            "categories": lambda: list_categories(db["settings"], userEmail, uid=uid),
+        }
+        data = load_sections({name: fn for name, fn in loaders.items() if name not in unchanged})
+
+        body = {
+            "success": True,
+            **{name: data.get(name) for name in SECTIONS},
+            "next_cursor": next_expense_cursor(data["expenses"], limit) if "expenses" in data else None,
+            "etags": etags,
+            "unchanged": sorted(unchanged),
+        }
+        return _with_etag(jsonify(body), etag), 200
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
@@ -1,22 +1,37 @@
 # app/routes/expenseRoutes.py
-from datetime import datetime
-import calendar
-
-from flask import Blueprint, current_app, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from bson.errors import InvalidId
 
 from app.db.mongo import get_db
-from app.utils.auth import require_auth, get_authed_email
+from app.utils.auth import require_auth, get_authed_email, get_authed_uid
+from app.utils.conditional import conditional_get
 from app.model.expenseModel.expense_model import (
-    ensure_expense_indexes,
     create_expense,
+    bulk_create_expenses,
     get_expenses,
+    iter_expenses,
+    next_expense_cursor,
+    summarize_expenses,
+    with_budget,
     update_expense,
     delete_expense,
+    get_expense_changes,
+    SyncTokenExpired,
 )
-from app.model.settingsModel.settings_model import (
-    ensure_settings_indexes,
-    list_categories,
+from app.model.budgetModel.budget_model import budget_months, sum_budgets
+from app.model.rollupModel.rollup_model import get_rollups
+from app.model.settingsModel.settings_model import get_allowed_categories
+from app.model.versionModel.version_model import BUDGETS, EXPENSES
+from app.utils.periods import valid_month, valid_year, range_from_args
+from app.utils.bulk_import import detect_format, parse_import
+from app.utils.export import (
+    EXPORT_FORMATS,
+    accepts_gzip,
+    csv_chunks,
+    encode_chunks,
+    gzip_chunks,
+    json_array_chunks,
+    ndjson_chunks,
 )
 
 expense_bp = Blueprint("expenses", __name__, url_prefix="/api/expenses")
@@ -27,60 +42,11 @@ def health():
     return jsonify({"ok": True, "service": "expenses"}), 200
 
 
-def _valid_year(year: str) -> str:
-    y = (year or "").strip()
-    if len(y) != 4 or not y.isdigit():
-        raise ValueError("year must be YYYY")
-    yi = int(y)
-    if yi < 2000 or yi > 2100:
-        raise ValueError("Invalid year")
-    return y
-
-
-def _valid_month(month: str) -> str:
-    m = (month or "").strip()
-    if len(m) != 7 or m[4] != "-":
-        raise ValueError("month must be YYYY-MM")
-    y, mm = m.split("-", 1)
-    if not (y.isdigit() and mm.isdigit()):
-        raise ValueError("month must be YYYY-MM")
-    yi = int(y)
-    mi = int(mm)
-    if yi < 2000 or yi > 2100:
-        raise ValueError("Invalid year")
-    if mi < 1 or mi > 12:
-        raise ValueError("Invalid month")
-    return m
-
-
-def _valid_date(date_str: str) -> str:
-    d = (date_str or "").strip()
-    datetime.strptime(d, "%Y-%m-%d")
-    return d
-
-
-def _month_to_from_to(month: str) -> tuple[str, str]:
-    month = _valid_month(month)
-    y, m = month.split("-", 1)
-    yi = int(y)
-    mi = int(m)
-    last_day = calendar.monthrange(yi, mi)[1]
-    return (f"{month}-01", f"{month}-{last_day:02d}")
-
-
-def _year_to_from_to(year: str) -> tuple[str, str]:
-    year = _valid_year(year)
-    return (f"{year}-01-01", f"{year}-12-31")
-
-
-def _get_allowed_categories(db, userEmail: str) -> set[str]:
+def _get_allowed_categories(db, userEmail: str, uid=None) -> frozenset[str]:
     """
-    Pull allowed categories for this user from settings collection.
+    Allowed categories for this user (cached per process, invalidated on category changes).
     """
-    settings_col = db["settings"]
-    ensure_settings_indexes(settings_col)
-    cats = list_categories(settings_col, userEmail)  # [{name,color}, ...]
-    return {c.get("name") for c in cats if c.get("name")}
+    return get_allowed_categories(db["settings"], userEmail, uid=uid)
 
 
 @expense_bp.post("/add")
@@ -88,24 +54,26 @@ def _get_allowed_categories(db, userEmail: str) -> set[str]:
 def add_expense():
     data = request.get_json(silent=True) or {}
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
 
     col = db["expenses"]
-    ensure_expense_indexes(col)
 
     try:
-        allowed = _get_allowed_categories(db, userEmail)
+        allowed = _get_allowed_categories(db, userEmail, uid=uid)
 
         exp = create_expense(
             col,
             userEmail=userEmail,
+            uid=uid,
             title=data.get("title"),
             amount=data.get("amount"),
             category=data.get("category"),
             date=data.get("date"),
             notes=data.get("notes", ""),
             allowed_categories=allowed,  # ✅
+            rollups_col=db["expense_rollups"],
         )
         return jsonify({"success": True, "message": "Expense added", "expense": exp}), 201
     except ValueError as e:
@@ -114,44 +82,104 @@ def add_expense():
         return jsonify({"success": False, "message": "Server error"}), 500
 
 
+@expense_bp.post("/bulk")
+@require_auth
+def bulk_add_expenses():
+    """
+    POST /api/expenses/bulk[?dedup=1]
+    Body: JSON array (or {"expenses": [...]}), NDJSON, or CSV with Date,Title,Amount,Category,Notes
+    headers. A multipart upload under the "file" field works too.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    dedup = request.args.get("dedup", "0") == "1"
+
+    upload = request.files.get("file")
+    if upload:
+        raw = upload.read()
+        fmt = detect_format(upload.mimetype, upload.filename)
+    else:
+        raw = request.get_data(cache=False)
+        fmt = detect_format(request.content_type)
+
+    try:
+        rows = parse_import(raw, fmt)
+        max_rows = current_app.config.get("BULK_IMPORT_MAX_ROWS", 20000)
+        if not rows:
+            raise ValueError("No rows to import")
+        if len(rows) > max_rows:
+            raise ValueError(f"Too many rows (max {max_rows} per request)")
+
+        db = get_db(current_app)
+        col = db["expenses"]
+
+        # one settings lookup for the whole batch
+        allowed = _get_allowed_categories(db, userEmail, uid=uid)
+
+        result = bulk_create_expenses(
+            col,
+            userEmail=userEmail,
+            uid=uid,
+            rows=rows,
+            allowed_categories=allowed,
+            chunk_size=current_app.config.get("BULK_IMPORT_CHUNK_SIZE", 500),
+            dedup=dedup,
+            rollups_col=db["expense_rollups"],
+        )
+        status = 201 if result["inserted"] else 200
+        return jsonify({
+            "success": True,
+            "message": f"Imported {result['inserted']} of {len(rows)} rows",
+            "total": len(rows),
+            **result,
+        }), status
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
 @expense_bp.get("")
 @require_auth
+@conditional_get(EXPENSES)
 def list_expenses():
+    """
+    GET /api/expenses[?month= | ?year= | ?from=&to=][&category=A&category=B][&min=&max=][&q=words]
+        [&limit=&cursor=]
+    Filters run in Mongo; `q` matches words in title/notes (the last word as a prefix).
+    """
     userEmail = get_authed_email()
-
-    date_from = request.args.get("from")
-    date_to = request.args.get("to")
-    month = request.args.get("month")
-    year = request.args.get("year")
+    uid = get_authed_uid()
 
     limit = request.args.get("limit", 200)
     skip = request.args.get("skip", 0)
+    cursor = request.args.get("cursor")
 
     try:
-        if date_from:
-            date_from = _valid_date(date_from)
-        if date_to:
-            date_to = _valid_date(date_to)
-
-        if (not date_from and not date_to) and month:
-            date_from, date_to = _month_to_from_to(month)
-
-        if (not date_from and not date_to) and year:
-            date_from, date_to = _year_to_from_to(year)
+        date_from, date_to = range_from_args(request.args)
 
         db = get_db(current_app)
         col = db["expenses"]
-        ensure_expense_indexes(col)
 
         items = get_expenses(
             col,
             userEmail=userEmail,
+            uid=uid,
             date_from=date_from,
             date_to=date_to,
             limit=limit,
             skip=skip,
+            cursor=cursor,
+            categories=request.args.getlist("category"),
+            min_amount=request.args.get("min"),
+            max_amount=request.args.get("max"),
+            q=request.args.get("q"),
         )
-        return jsonify({"success": True, "expenses": items}), 200
+        return jsonify({
+            "success": True,
+            "expenses": items,
+            "next_cursor": next_expense_cursor(items, limit),
+        }), 200
 
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
@@ -159,25 +187,201 @@ def list_expenses():
         return jsonify({"success": False, "message": "Server error"}), 500
 
 
+@expense_bp.get("/changes")
+@require_auth
+def expense_changes():
+    """
+    GET /api/expenses/changes?since=<next_since>&limit=
+    Created/updated expenses and deleted ids since the previous call; omit `since`
+    for the initial load. 410 means the token is too old: reload and start over.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    db = get_db(current_app)
+
+    try:
+        res = get_expense_changes(
+            db["expenses"],
+            db["expense_tombstones"],
+            userEmail=userEmail,
+            uid=uid,
+            since=request.args.get("since"),
+            limit=request.args.get("limit", 500),
+        )
+        return jsonify({"success": True, **res}), 200
+    except SyncTokenExpired as e:
+        return jsonify({"success": False, "message": str(e)}), 410
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
+@expense_bp.get("/summary")
+@require_auth
+@conditional_get(EXPENSES, BUDGETS)
+def expenses_summary():
+    """
+    GET /api/expenses/summary?month=YYYY-MM | ?year=YYYY | ?from=&to=
+    Totals, per-category and per-day sums computed in Mongo, plus budget for the same months.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+
+    try:
+        date_from, date_to = range_from_args(request.args)
+
+        db = get_db(current_app)
+        col = db["expenses"]
+
+        summary = summarize_expenses(col, userEmail=userEmail, uid=uid, date_from=date_from, date_to=date_to)
+
+        budget = sum_budgets(db["budgets"], userEmail=userEmail, uid=uid, **budget_months(date_from, date_to))
+        summary = with_budget(summary, budget, date_from, date_to)
+
+        return jsonify({"success": True, "summary": summary}), 200
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
+@expense_bp.get("/monthly")
+@require_auth
+@conditional_get(EXPENSES)
+def monthly_totals():
+    """
+    GET /api/expenses/monthly?year=YYYY | ?from=YYYY-MM&to=YYYY-MM
+    Per-month totals and category breakdown read from the expense_rollups collection.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+
+    try:
+        year = request.args.get("year")
+        if year:
+            year = valid_year(year)
+            month_from, month_to = f"{year}-01", f"{year}-12"
+        else:
+            month_from = request.args.get("from")
+            month_to = request.args.get("to")
+            month_from = valid_month(month_from) if month_from else None
+            month_to = valid_month(month_to) if month_to else None
+
+        db = get_db(current_app)
+        buckets = get_rollups(
+            db["expense_rollups"], userEmail=userEmail, uid=uid, month_from=month_from, month_to=month_to
+        )
+
+        months = {}
+        for b in buckets:
+            m = months.setdefault(b["month"], {"month": b["month"], "total": 0.0, "count": 0, "byCategory": []})
+            m["total"] = round(m["total"] + b["total"], 2)
+            m["count"] += b["count"]
+            m["byCategory"].append({"category": b["category"], "total": b["total"], "count": b["count"]})
+
+        items = list(months.values())
+        return jsonify({
+            "success": True,
+            "months": items,
+            "total": round(sum(m["total"] for m in items), 2),
+            "count": sum(m["count"] for m in items),
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
+@expense_bp.get("/export")
+@require_auth
+def export_expenses():
+    """
+    GET /api/expenses/export?format=csv|ndjson|json
+        [&from=&to= | &month= | &year=] [&category=A&category=B] [&notes=0]
+    Streams rows straight from a batched Mongo cursor; gzip when the client accepts it.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    fmt = (request.args.get("format") or "csv").strip().lower()
+    include_notes = request.args.get("notes", "1") != "0"
+    categories = [c for c in request.args.getlist("category") if c and c != "All"]
+
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"success": False, "message": "format must be csv, ndjson or json"}), 400
+
+    try:
+        date_from, date_to = range_from_args(request.args)
+
+        db = get_db(current_app)
+        col = db["expenses"]
+
+        rows = iter_expenses(
+            col,
+            userEmail=userEmail,
+            uid=uid,
+            date_from=date_from,
+            date_to=date_to,
+            categories=categories,
+            include_notes=include_notes,
+        )
+        # pull the first row now so query errors surface as a normal JSON error
+        first = next(rows, None)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+    def _all_rows():
+        if first is not None:
+            yield first
+            yield from rows
+
+    if fmt == "csv":
+        columns = ["date", "title", "amount", "category"] + (["notes"] if include_notes else [])
+        chunks = csv_chunks(_all_rows(), columns)
+    elif fmt == "ndjson":
+        chunks = ndjson_chunks(_all_rows())
+    else:
+        chunks = json_array_chunks(_all_rows())
+
+    body = encode_chunks(chunks)
+    mimetype, ext = EXPORT_FORMATS[fmt]
+    headers = {
+        "Content-Disposition": f'attachment; filename="expenses-{date_from or "all"}-{date_to or "all"}.{ext}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("Accept-Encoding")):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(stream_with_context(body), status=200, headers=headers, content_type=mimetype)
+
+
 @expense_bp.put("/<expense_id>")
 @require_auth
 def edit_expense(expense_id):
     data = request.get_json(silent=True) or {}
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
     col = db["expenses"]
-    ensure_expense_indexes(col)
 
     try:
-        allowed = _get_allowed_categories(db, userEmail)
+        allowed = _get_allowed_categories(db, userEmail, uid=uid)
 
         updated = update_expense(
             col,
             expense_id=expense_id,
             userEmail=userEmail,
+            uid=uid,
             patch=data,
             allowed_categories=allowed,  # ✅
+            rollups_col=db["expense_rollups"],
         )
         if not updated:
             return jsonify({"success": False, "message": "Expense not found"}), 404
@@ -194,13 +398,20 @@ def edit_expense(expense_id):
 @require_auth
 def remove_expense(expense_id):
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
     col = db["expenses"]
-    ensure_expense_indexes(col)
 
     try:
-        ok = delete_expense(col, expense_id=expense_id, userEmail=userEmail)
+        ok = delete_expense(
+            col,
+            expense_id=expense_id,
+            userEmail=userEmail,
+            uid=uid,
+            rollups_col=db["expense_rollups"],
+            tombstones_col=db["expense_tombstones"],
+        )
         if not ok:
             return jsonify({"success": False, "message": "Expense not found"}), 404
         return jsonify({"success": True, "message": "Expense deleted"}), 200
@@ -1,5 +1,6 @@
-from flask import Blueprint, current_app, jsonify
-from app.db.mongo import get_db
+from flask import Blueprint, Response, current_app, jsonify
+from app.db.mongo import get_client, get_db, get_pool_stats
+from app.utils.instrumentation import get_metrics
 
 health_bp = Blueprint("health", __name__, url_prefix="/api")
 
@@ -10,8 +11,28 @@ def health():
     """
     db = get_db(current_app)
     # ping the server
-    current_app.extensions["mongo_client"].admin.command("ping")
+    get_client(current_app).admin.command("ping")
     return jsonify({
         "status": "ok",
         "db": db.name
     })
+
+
+@health_bp.get("/health/pool")
+def pool_health():
+    """
+    Connection pool counters for this worker process (checkout latency, waiters, failures).
+    """
+    return jsonify({"status": "ok", "pool": get_pool_stats(current_app)})
+
+
+@health_bp.get("/metrics")
+def metrics():
+    """
+    Prometheus scrape endpoint for this worker process (404 unless METRICS_ENABLED=1).
+    """
+    m = get_metrics(current_app)
+    if m is None:
+        return jsonify({"success": False, "message": "Metrics are disabled"}), 404
+    pool = current_app.extensions["mongo_pool_stats"].snapshot()
+    return Response(m.render_prometheus(pool=pool), mimetype="text/plain; version=0.0.4")
@@ -2,12 +2,15 @@
 from flask import Blueprint, request, jsonify, current_app
 
 from app.db.mongo import get_db
-from app.utils.auth import require_auth, get_authed_email
+from app.utils.auth import require_auth, get_authed_email, get_authed_uid
+from app.utils.conditional import conditional_get
+from app.model.versionModel.version_model import SETTINGS
 from app.model.settingsModel.settings_model import (
-    ensure_settings_indexes,
     list_categories,
     add_category,
     delete_category,
+    merge_categories,
+    rename_category,
 )
 
 settings_bp = Blueprint("settings", __name__, url_prefix="/api/settings")
@@ -20,15 +23,16 @@ def health():
 
 @settings_bp.get("/categories")
 @require_auth
+@conditional_get(SETTINGS)
 def get_categories():
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
     col = db["settings"]
-    ensure_settings_indexes(col)
 
     try:
-        cats = list_categories(col, userEmail)
+        cats = list_categories(col, userEmail, uid=uid)
         return jsonify({"success": True, "categories": cats}), 200
     except Exception:
         return jsonify({"success": False, "message": "Server error"}), 500
@@ -38,6 +42,7 @@ def get_categories():
 @require_auth
 def create_category():
     userEmail = get_authed_email()
+    uid = get_authed_uid()
     data = request.get_json(silent=True) or {}
 
     name = data.get("name")
@@ -45,10 +50,9 @@ def create_category():
 
     db = get_db(current_app)
     col = db["settings"]
-    ensure_settings_indexes(col)
 
     try:
-        cats = add_category(col, userEmail, name=name, color=color)
+        cats = add_category(col, userEmail, uid=uid, name=name, color=color)
         return jsonify({"success": True, "message": "Category added", "categories": cats}), 201
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
@@ -56,18 +60,85 @@ def create_category():
         return jsonify({"success": False, "message": "Server error"}), 500
 
 
+def _rewrite_kwargs(db) -> dict:
+    # expenses and rollups follow every category rename/merge/delete
+    return {
+        "expenses_col": db["expenses"],
+        "rollups_col": db["expense_rollups"],
+        "chunk_size": current_app.config.get("CATEGORY_REWRITE_CHUNK_SIZE", 0),
+    }
+
+
+@settings_bp.put("/categories/<name>")
+@require_auth
+def edit_category(name):
+    """
+    PUT /api/settings/categories/<name>  {"name": "<new name>"}
+    Renames the category and every expense that uses it.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    data = request.get_json(silent=True) or {}
+
+    db = get_db(current_app)
+
+    try:
+        res = rename_category(db["settings"], userEmail, name, data.get("name"), uid=uid, **_rewrite_kwargs(db))
+        return jsonify({"success": True, "message": "Category renamed", **res}), 200
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
+@settings_bp.post("/categories/merge")
+@require_auth
+def merge_category():
+    """
+    POST /api/settings/categories/merge  {"sources": ["A", "B"], "target": "C"}
+    C may be an existing category or a new name; A and B and their expenses become C.
+    """
+    userEmail = get_authed_email()
+    uid = get_authed_uid()
+    data = request.get_json(silent=True) or {}
+
+    sources = data.get("sources")
+    if not isinstance(sources, list):
+        return jsonify({"success": False, "message": "sources must be a list"}), 400
+
+    db = get_db(current_app)
+
+    try:
+        res = merge_categories(db["settings"], userEmail, sources, data.get("target"), uid=uid, **_rewrite_kwargs(db))
+        return jsonify({"success": True, "message": "Categories merged", **res}), 200
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+
 @settings_bp.delete("/categories/<name>")
 @require_auth
 def remove_category(name):
+    """
+    DELETE /api/settings/categories/<name>[?reassign=<category>]
+    The category's expenses move to `reassign` (default 'Other').
+    """
     userEmail = get_authed_email()
+    uid = get_authed_uid()
 
     db = get_db(current_app)
-    col = db["settings"]
-    ensure_settings_indexes(col)
 
     try:
-        cats = delete_category(col, userEmail, name=name)
-        return jsonify({"success": True, "message": "Category deleted", "categories": cats}), 200
+        res = delete_category(
+            db["settings"],
+            userEmail,
+            uid=uid,
+            name=name,
+            reassign_to=request.args.get("reassign"),
+            **_rewrite_kwargs(db),
+        )
+        return jsonify({"success": True, "message": "Category deleted", **res}), 200
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
     except Exception:
@@ -1,11 +1,214 @@
 # app/utils/auth.py
-import os
-import jwt
+"""
+Single auth layer for every protected route (and /api/auth/me).
+
+Verified claims are cached per process, keyed by a digest of (secret, token),
+until the token's own `exp` (capped by AUTH_CACHE_TTL_SECONDS), so chatty
+dashboard polling does not pay an HMAC check + claim parsing on every request.
+
+Revocation: revoke_token() stores the token digest in the `revoked_tokens`
+collection (TTL-indexed on expiresAt) and drops it from this process's caches.
+Each process keeps the set of revoked digests in memory and pulls the ones
+revoked since its last pull at most every AUTH_REVOCATION_REFRESH_SECONDS (one
+indexed query on revokedAt, made by a single request). Cache hits are checked
+against that set only; a cache miss also looks its digest up by _id. So another
+worker's signout is honoured here within AUTH_REVOCATION_REFRESH_SECONDS, and
+this worker's own signouts immediately.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-from flask import request, jsonify
 
-JWT_SECRET = os.getenv("JWT_SECRET", "super_secret_change_me")
-JWT_ALGO = "HS256"
+import jwt
+from flask import current_app, jsonify, request
+
+from app.model.ownerModel.owner_model import to_uid
+from app.utils.cache import TTLCache
+from app.utils.jwt_utils import JWT_ALGO, verify_token
+
+DEFAULT_JWT_SECRET = "super_secret_change_me"
+REVOKED_COLLECTION = "revoked_tokens"
+
+_claims_cache = TTLCache(maxsize=10000, ttl=300)
+_revoked_cache = TTLCache(maxsize=10000, ttl=300)  # token digest -> True (this process)
+
+# pulls of recent revocations: "pulledAt" is the wall clock of the last pull (None = never)
+_revocations = {"interval": 5.0, "next": 0.0, "pulledAt": None}
+_revocations_lock = threading.Lock()
+# re-read revocations this far before the last pull, for clock skew between workers
+REVOCATION_OVERLAP_SECONDS = 30
+
+
+def configure_auth_cache(maxsize=None, ttl=None, revocation_refresh=None):
+    _claims_cache.configure(maxsize=maxsize, ttl=ttl)
+    _revoked_cache.configure(maxsize=maxsize)
+    _claims_cache.clear()
+    with _revocations_lock:
+        if revocation_refresh is not None:
+            _revocations["interval"] = max(0.0, float(revocation_refresh))
+        _revocations.update(next=0.0, pulledAt=None)
+
+
+def get_jwt_secret(config=None) -> str:
+    """
+    The one place the signing/verification secret is resolved.
+    """
+    config = current_app.config if config is None else config
+    return config.get("JWT_SECRET") or DEFAULT_JWT_SECRET
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _cache_key(token: str, secret: str) -> bytes:
+    return hashlib.sha256(secret.encode("utf-8") + b"\x00" + token.encode("utf-8")).digest()
+
+
+def _seconds_left(claims: dict) -> float:
+    exp = claims.get("exp")
+    if exp is None:
+        return _claims_cache.ttl
+    return float(exp) - time.time()
+
+
+def _is_revoked_in_db(revoked_col, digest: str) -> bool:
+    if revoked_col is None:
+        return False
+    return revoked_col.find_one({"_id": digest}, {"_id": 1}) is not None
+
+
+def is_revoked_locally(digest: str) -> bool:
+    """
+    True when this process already knows the token is revoked (no lookup needed).
+    """
+    return bool(_revoked_cache.get(digest))
+
+
+def revocations_query():
+    """
+    (filter, projection) for the revocations to pull, or None when no pull is due.
+    At most one caller per interval gets a query; it must pass the result to
+    apply_revocations() (the async app runs the query with its own driver).
+    """
+    now = time.monotonic()
+    with _revocations_lock:
+        if now < _revocations["next"]:
+            return None
+        _revocations["next"] = now + _revocations["interval"]
+        pulled_at = _revocations["pulledAt"]
+        _revocations["pulledAt"] = datetime.now(timezone.utc)
+    if pulled_at is None:
+        # first pull: every revocation that is still live
+        flt = {"expiresAt": {"$gt": datetime.now(timezone.utc)}}
+    else:
+        flt = {"revokedAt": {"$gte": pulled_at - timedelta(seconds=REVOCATION_OVERLAP_SECONDS)}}
+    return flt, {"_id": 1, "expiresAt": 1}
+
+
+def apply_revocations(docs) -> None:
+    """
+    Adds pulled revocations to this process's revoked set, each until its token expires.
+    """
+    now = datetime.now(timezone.utc)
+    for doc in docs:
+        expires_at = doc.get("expiresAt")
+        if expires_at is None:
+            ttl = _claims_cache.ttl
+        else:
+            if expires_at.tzinfo is None:  # PyMongo returns naive UTC by default
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            ttl = (expires_at - now).total_seconds()
+        _revoked_cache.set(doc["_id"], True, ttl=max(1.0, ttl))
+
+
+def sync_revocations(revoked_col) -> None:
+    if revoked_col is None:
+        return
+    query = revocations_query()
+    if query is not None:
+        apply_revocations(revoked_col.find(*query))
+
+
+def cached_claims(token: str, secret: str):
+    """
+    Claims from this process's cache, or None on a miss. Does not check revocation.
+    """
+    key = _cache_key(token, secret)
+    claims = _claims_cache.get(key)
+    if claims is None:
+        return None
+    # entries never outlive exp, but a clock jump could leave one slightly stale
+    if _seconds_left(claims) > 0:
+        return claims
+    _claims_cache.delete(key)
+    raise jwt.ExpiredSignatureError("Signature has expired")
+
+
+def claims_for(token: str, secret: str, revoked_in_db: bool = False) -> dict:
+    """
+    Verified claims, from the cache when possible. revoked_in_db is the caller's
+    _id lookup, needed only when cached_claims() missed (the async app does it
+    with its own driver).
+    """
+    digest = token_digest(token)
+    if revoked_in_db or _revoked_cache.get(digest):
+        _revoked_cache.set(digest, True)
+        _claims_cache.delete(_cache_key(token, secret))
+        raise jwt.InvalidTokenError("Token revoked")
+
+    claims = cached_claims(token, secret)
+    if claims is not None:
+        return claims
+    claims = verify_token(token, secret)
+    _claims_cache.set(_cache_key(token, secret), claims, ttl=min(_seconds_left(claims), _claims_cache.ttl))
+    return claims
+
+
+def decode_token(token: str, secret: str | None = None, revoked_col=None) -> dict:
+    """
+    Returns verified claims for token, serving repeats from the claims cache.
+    Only a cache miss looks the token up in revoked_col. Raises
+    jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode.
+    """
+    secret = secret or get_jwt_secret()
+    sync_revocations(revoked_col)
+    digest = token_digest(token)
+    if is_revoked_locally(digest):
+        return claims_for(token, secret, True)
+    claims = cached_claims(token, secret)
+    if claims is not None:
+        return claims
+    return claims_for(token, secret, _is_revoked_in_db(revoked_col, digest))
+
+
+def revoke_token(token: str, revoked_col=None, claims: dict | None = None, secret: str | None = None):
+    """
+    Revokes token until its exp. Safe to call for already-revoked tokens.
+    """
+    digest = token_digest(token)
+    exp = (claims or {}).get("exp")
+    expires_at = (
+        datetime.fromtimestamp(float(exp), tz=timezone.utc)
+        if exp is not None
+        else datetime.now(timezone.utc)
+    )
+    if revoked_col is not None:
+        revoked_col.update_one(
+            {"_id": digest},
+            {"$setOnInsert": {"expiresAt": expires_at, "revokedAt": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    _revoked_cache.set(digest, True, ttl=max(1.0, _seconds_left(claims or {})))
+    _claims_cache.delete(_cache_key(token, secret or get_jwt_secret()))
+
+
+def _revoked_collection():
+    from app.db.mongo import get_db
+
+    return get_db(current_app)[REVOKED_COLLECTION]
 
 
 def extract_bearer_token():
@@ -15,23 +218,53 @@ def extract_bearer_token():
     return auth.split(" ", 1)[1].strip()
 
 
-def decode_token(token: str):
-    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
+def authenticate_request():
+    """
+    Decodes the request's bearer token and attaches the claims to request.user.
+    Returns (claims, None) or (None, (response, status)).
+    """
+    token = extract_bearer_token()
+    if not token:
+        return None, (jsonify({"success": False, "message": "Missing Bearer token"}), 401)
+    try:
+        payload = decode_token(token, revoked_col=_revoked_collection())
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({"success": False, "message": "Token expired"}), 401)
+    except Exception:
+        return None, (jsonify({"success": False, "message": "Invalid or expired token"}), 401)
+
+    # attach to request context
+    request.user = payload
+    return payload, None
 
 
 def require_auth(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        token = extract_bearer_token()
-        if not token:
-            return jsonify({"success": False, "message": "Missing Bearer token"}), 401
-        try:
-            payload = decode_token(token)
-        except Exception:
-            return jsonify({"success": False, "message": "Invalid or expired token"}), 401
-
-        # attach to request context
-        request.user = payload
+        _, err = authenticate_request()
+        if err:
+            return err
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def is_admin(claims: dict, config=None) -> bool:
+    """
+    True when the token's email is listed in ADMIN_EMAILS.
+    """
+    config = current_app.config if config is None else config
+    admins = {e.strip().lower() for e in (config.get("ADMIN_EMAILS") or "").split(",") if e.strip()}
+    return (claims.get("email") or "").strip().lower() in admins
+
+
+def require_admin(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        claims, err = authenticate_request()
+        if err:
+            return err
+        if not is_admin(claims):
+            return jsonify({"success": False, "message": "Admin access required"}), 403
         return fn(*args, **kwargs)
     return wrapper
 
@@ -40,3 +273,9 @@ def get_authed_email():
     # request.user is set by require_auth
     u = getattr(request, "user", {}) or {}
     return (u.get("email") or "").strip().lower()
+
+
+def get_authed_uid():
+    # ObjectId from the token's uid claim (None for tokens that predate it)
+    u = getattr(request, "user", {}) or {}
+    return to_uid(u.get("uid"))
@@ -0,0 +1,59 @@
+# app/utils/bulk_import.py
+import csv
+import io
+import json
+
+
+def detect_format(content_type: str | None, filename: str | None = None) -> str:
+    ct = (content_type or "").split(";", 1)[0].strip().lower()
+    name = (filename or "").lower()
+    if ct in ("text/csv", "application/csv") or name.endswith(".csv"):
+        return "csv"
+    if ct in ("application/x-ndjson", "application/ndjson", "application/jsonl") or name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "json"
+
+
+def _csv_rows(text: str):
+    reader = csv.DictReader(io.StringIO(text))
+    # header names are matched case-insensitively (exports use "Date,Title,...")
+    for r in reader:
+        yield {(k or "").strip().lower(): v for k, v in r.items() if k}
+
+
+def _ndjson_rows(text: str):
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # keeps row numbering; reported as an invalid row
+            yield None
+
+
+def parse_import(raw: bytes, fmt: str) -> list:
+    """
+    Decodes an upload into a list of row dicts. Raises ValueError if the payload
+    itself can't be read; bad individual rows are reported later per row.
+    """
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded")
+
+    if fmt == "csv":
+        return list(_csv_rows(text))
+    if fmt == "ndjson":
+        return list(_ndjson_rows(text))
+
+    try:
+        data = json.loads(text or "null")
+    except json.JSONDecodeError:
+        raise ValueError("Body must be a JSON array of expenses")
+    if isinstance(data, dict):
+        data = data.get("expenses")
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array of expenses")
+    return data
@@ -0,0 +1,36 @@
+# app/utils/conditional.py
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from app.db.mongo import get_db
+from app.model.versionModel.version_model import VERSIONS_COLLECTION, build_etag, get_versions
+from app.utils.auth import get_authed_email
+
+
+def conditional_get(*names):
+    """
+    Weak-ETag support for a per-user GET whose body depends only on the given
+    collections (see version_model) and the query string. Use below @require_auth.
+    A matching If-None-Match returns 304 before the view runs.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            userEmail = get_authed_email()
+            versions = get_versions(get_db(current_app)[VERSIONS_COLLECTION], userEmail, names)
+            etag = build_etag(userEmail, versions, request.full_path)
+
+            if request.if_none_match.contains_weak(etag):
+                resp = current_app.response_class(status=304)
+                resp.set_etag(etag, weak=True)
+                resp.headers["Cache-Control"] = "private, no-cache"
+                return resp
+
+            resp = make_response(fn(*args, **kwargs))
+            if resp.status_code == 200:
+                resp.set_etag(etag, weak=True)
+                resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return wrapper
+    return decorator
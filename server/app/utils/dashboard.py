@@ -0,0 +1,104 @@
+# app/utils/dashboard.py
+"""
+GET /api/dashboard: the expenses, budgets and categories one dashboard load needs,
+behind a single auth check and a single data_versions lookup.
+
+Every section has its own weak ETag (`etags` in the body); the response ETag covers
+all three. A client sends the section tags it holds in If-None-Match: those sections
+come back as null and are listed in `unchanged`, and when none changed (or the
+combined tag matches) the answer is a bodiless 304.
+
+The Flask view loads the remaining sections concurrently on a small thread pool
+(DASHBOARD_WORKERS threads per process); the ASGI app gathers them on its loop.
+Either way the load takes about as long as the slowest read.
+"""
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextvars import copy_context
+
+from app.model.versionModel.version_model import BUDGETS, EXPENSES, SETTINGS, build_etag
+from app.utils.instrumentation import add_request_commands, run_counting_commands
+
+# section -> the version counter its body depends on
+SECTIONS = {"expenses": EXPENSES, "budgets": BUDGETS, "categories": SETTINGS}
+
+_settings = {"workers": 4}
+_executor = None
+_lock = threading.Lock()
+
+
+def configure_dashboard_pool(workers: int | None = None) -> None:
+    global _executor
+    with _lock:
+        if workers is not None:
+            if int(workers) < 1:
+                raise ValueError("DASHBOARD_WORKERS must be >= 1")
+            _settings["workers"] = int(workers)
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_settings["workers"], thread_name_prefix="dashboard")
+    return _executor
+
+
+def section_etags(userEmail: str, versions: dict, variants: dict | None = None) -> dict:
+    """
+    {section: etag}. variants[section] is whatever else its body depends on (the expense range).
+    """
+    variants = variants or {}
+    return {
+        name: build_etag(userEmail, {key: versions[key]}, f"dashboard:{name}:{variants.get(name, '')}")
+        for name, key in SECTIONS.items()
+    }
+
+
+def combined_etag(etags: dict) -> str:
+    return hashlib.sha1("|".join(etags[name] for name in SECTIONS).encode()).hexdigest()[:20]
+
+
+def unchanged_sections(if_none_match, etags: dict) -> set:
+    """
+    Sections the client already holds, from a werkzeug ETags (request.if_none_match).
+    """
+    if if_none_match.contains_weak(combined_etag(etags)):
+        return set(SECTIONS)
+    return {name for name, tag in etags.items() if if_none_match.contains_weak(tag)}
+
+
+def load_sections(loaders: dict) -> dict:
+    """
+    Runs {section: fn} concurrently: all but the last on the pool, the last on the
+    calling thread. Each pool task counts its Mongo commands separately; the counts are
+    added to this request's Server-Timing on the calling thread as tasks complete.
+    Re-raises the first error, after cancelling the tasks that have not started and
+    waiting for the ones that have, so none outlives the request.
+    """
+    items = list(loaders.items())
+    if not items:
+        return {}
+    futures = {
+        _pool().submit(copy_context().run, run_counting_commands, fn): name for name, fn in items[:-1]
+    }
+    pending = set(futures)
+    try:
+        name, fn = items[-1]
+        out = {name: fn()}
+        for future in as_completed(futures):
+            pending.discard(future)
+            out[futures[future]], commands = future.result()
+            add_request_commands(commands)
+    finally:
+        for future in pending:
+            future.cancel()
+        for future in wait(pending).done:
+            if not future.cancelled() and future.exception() is None:
+                add_request_commands(future.result()[1])
+    return {name: out[name] for name in loaders}
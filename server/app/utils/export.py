@@ -0,0 +1,96 @@
+# app/utils/export.py
+import csv
+import io
+import json
+import zlib
+
+# rows buffered before a chunk is handed to the WSGI server
+ROWS_PER_CHUNK = 500
+
+CSV_HEADERS = {
+    "date": "Date",
+    "title": "Title",
+    "amount": "Amount",
+    "category": "Category",
+    "notes": "Notes",
+}
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+    "json": ("application/json; charset=utf-8", "json"),
+}
+
+
+def csv_chunks(rows, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([CSV_HEADERS.get(c, c) for c in columns])
+
+    n = 0
+    for r in rows:
+        writer.writerow([r.get(c, "") for c in columns])
+        n += 1
+        if n % ROWS_PER_CHUNK == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+
+def ndjson_chunks(rows):
+    parts = []
+    for r in rows:
+        parts.append(json.dumps(r, ensure_ascii=False, separators=(",", ":")))
+        if len(parts) >= ROWS_PER_CHUNK:
+            yield "\n".join(parts) + "\n"
+            parts = []
+    if parts:
+        yield "\n".join(parts) + "\n"
+
+
+def json_array_chunks(rows):
+    """
+    A single JSON array, written incrementally.
+    """
+    yield "["
+    first = True
+    parts = []
+    for r in rows:
+        parts.append(("" if first else ",") + json.dumps(r, ensure_ascii=False, separators=(",", ":")))
+        first = False
+        if len(parts) >= ROWS_PER_CHUNK:
+            yield "".join(parts)
+            parts = []
+    if parts:
+        yield "".join(parts)
+    yield "]"
+
+
+def encode_chunks(chunks, encoding: str = "utf-8"):
+    for c in chunks:
+        if c:
+            yield c.encode(encoding)
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """
+    Compress a byte-chunk stream on the fly (gzip container, not raw deflate).
+    """
+    z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for c in chunks:
+        out = z.compress(c)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") != "q=0"
+    return False
@@ -0,0 +1,235 @@
+# app/utils/instrumentation.py
+"""
+Request and Mongo command metrics, switched on with METRICS_ENABLED=1:
+
+    - latency histogram per (method, route template) and response counts per status
+    - a pymongo CommandListener timing every command by name, and per request
+    - a Server-Timing header on each response: app;dur=<ms>, mongo;dur=<ms>;desc="<n> cmds"
+
+Everything is rendered as Prometheus text on /api/metrics. When disabled, no hook
+or listener is registered, so requests pay nothing. Numbers are per worker process
+(scrape every worker, or sum them). Streamed responses (ndjson/CSV) are timed until
+the response object is returned, not until the body has been sent.
+
+Overhead: python -m bench.bench_metrics
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import g, request
+from pymongo import monitoring
+
+# upper bounds in seconds (Prometheus convention); one extra +Inf bucket
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# [command count, seconds] for the request running in this context; None outside requests.
+# Only ever updated from one thread: pool tasks count into their own list (run_counting_commands).
+_request_commands: ContextVar = ContextVar("request_commands", default=None)
+
+
+def run_counting_commands(fn):
+    """
+    Runs fn with a fresh command counter; for pool tasks, inside copy_context().run.
+    Returns (result, [count, seconds]), or (result, None) outside a metered request.
+    """
+    if _request_commands.get() is None:
+        return fn(), None
+    acc = [0, 0.0]
+    _request_commands.set(acc)
+    return fn(), acc
+
+
+def add_request_commands(acc) -> None:
+    """
+    Adds a pool task's counter to the current request's, on the request's own thread.
+    """
+    own = _request_commands.get()
+    if own is not None and acc is not None:
+        own[0] += acc[0]
+        own[1] += acc[1]
+
+
+class Histogram:
+    """Not thread-safe on its own; Metrics holds its lock around observe()."""
+
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    def __init__(self, metrics):
+        self._metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def _record(self, event, failed: bool) -> None:
+        seconds = (event.duration_micros or 0) / 1e6
+        self._metrics.observe_command(event.command_name, seconds, failed)
+        acc = _request_commands.get()
+        if acc is not None:
+            acc[0] += 1
+            acc[1] += seconds
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, labels: str, h: Histogram) -> list:
+    lines, cumulative = [], 0
+    for bound, n in zip(LATENCY_BUCKETS, h.counts):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.n}')
+    lines.append(f"{name}_sum{{{labels}}} {h.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {h.n}")
+    return lines
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = {}  # (method, route) -> Histogram
+        self.responses = {}  # (method, route, status) -> count
+        self.commands = {}  # command name -> Histogram
+        self.command_failures = {}  # command name -> count
+        self.command_listener = CommandTimingListener(self)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            h = self.requests.get((method, route))
+            if h is None:
+                h = self.requests[(method, route)] = Histogram()
+            h.observe(seconds)
+            key = (method, route, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def observe_command(self, name: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            h = self.commands.get(name)
+            if h is None:
+                h = self.commands[name] = Histogram()
+            h.observe(seconds)
+            if failed:
+                self.command_failures[name] = self.command_failures.get(name, 0) + 1
+
+    def render_prometheus(self, pool: dict | None = None) -> str:
+        """
+        Prometheus text exposition (format 0.0.4). `pool` is a PoolStatsListener snapshot.
+        """
+        with self._lock:
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route template.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), h in sorted(self.requests.items()):
+                lines += _histogram_lines(
+                    "http_request_duration_seconds", f'method="{_label(method)}",route="{_label(route)}"', h
+                )
+
+            lines += [
+                "# HELP http_responses_total Responses by route template and status.",
+                "# TYPE http_responses_total counter",
+            ]
+            for (method, route, status), n in sorted(self.responses.items()):
+                lines.append(
+                    f'http_responses_total{{method="{_label(method)}",route="{_label(route)}",status="{status}"}} {n}'
+                )
+
+            lines += [
+                "# HELP mongodb_command_duration_seconds Mongo command latency by command name.",
+                "# TYPE mongodb_command_duration_seconds histogram",
+            ]
+            for name, h in sorted(self.commands.items()):
+                lines += _histogram_lines("mongodb_command_duration_seconds", f'command="{_label(name)}"', h)
+
+            lines += [
+                "# HELP mongodb_command_failures_total Failed Mongo commands.",
+                "# TYPE mongodb_command_failures_total counter",
+            ]
+            for name, n in sorted(self.command_failures.items()):
+                lines.append(f'mongodb_command_failures_total{{command="{_label(name)}"}} {n}')
+
+        if pool:
+            conns, checkout = pool["connections"], pool["checkout"]
+            lines += [
+                "# TYPE mongodb_pool_connections_open gauge",
+                f"mongodb_pool_connections_open {conns['open']}",
+                "# TYPE mongodb_pool_connections_in_use gauge",
+                f"mongodb_pool_connections_in_use {conns['inUse']}",
+                "# TYPE mongodb_pool_checkout_waiting gauge",
+                f"mongodb_pool_checkout_waiting {checkout['waitingNow']}",
+                "# TYPE mongodb_pool_checkouts_total counter",
+                f"mongodb_pool_checkouts_total {checkout['succeeded']}",
+                "# TYPE mongodb_pool_checkout_failures_total counter",
+                f"mongodb_pool_checkout_failures_total {sum(checkout['failed'].values())}",
+            ]
+
+        lines += ["# TYPE process_start_time_seconds gauge", f"process_start_time_seconds {self.started_at:.3f}"]
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics(app) -> Metrics | None:
+    return app.extensions.get("metrics")
+
+
+def init_instrumentation(app) -> None:
+    """
+    Registers the request hooks and the Mongo command listener (call before the
+    first get_client(), which attaches the listener). No-op unless METRICS_ENABLED.
+    """
+    if not app.config.get("METRICS_ENABLED"):
+        return
+
+    metrics = Metrics()
+    app.extensions["metrics"] = metrics
+    app.extensions["mongo_command_listener"] = metrics.command_listener
+    server_timing = app.config.get("METRICS_SERVER_TIMING", True)
+
+    # one g attribute and one proxy lookup each way: werkzeug LocalProxy access is most of the cost
+    @app.before_request
+    def _metrics_start():
+        cmds = [0, 0.0]
+        g._metrics = (time.perf_counter(), cmds, _request_commands.set(cmds))
+
+    # registered first, so it runs after every other after_request hook
+    @app.after_request
+    def _metrics_record(resp):
+        state = g.get("_metrics")
+        if state is None:
+            return resp
+        seconds = time.perf_counter() - state[0]
+        req = request._get_current_object()
+        route = req.url_rule.rule if req.url_rule is not None else "unmatched"
+        metrics.observe_request(req.method, route, resp.status_code, seconds)
+        if server_timing:
+            n, db_seconds = state[1]
+            resp.headers.add(
+                "Server-Timing", f'app;dur={seconds * 1000:.1f}, mongo;dur={db_seconds * 1000:.1f};desc="{n} cmds"'
+            )
+        return resp
+
+    @app.teardown_request
+    def _metrics_reset(exc=None):
+        state = g.pop("_metrics", None)
+        if state is not None:
+            _request_commands.reset(state[2])
@@ -0,0 +1,73 @@
+# app/utils/json_provider.py
+"""
+Flask JSON provider that understands Mongo types (ObjectId, Decimal128,
+datetime) so routes can hand raw documents to jsonify. Uses orjson when it is
+installed, otherwise falls back to the stdlib encoder.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, Decimal128):
+        return float(o.to_decimal())
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    Stdlib fallback. Datetimes are ISO 8601 (like the rest of the API) rather
+    than Flask's HTTP-date default.
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonProvider(MongoJSONProvider):
+    _OPTS = 0 if orjson is None else (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # callers asking for stdlib options (indent, sort_keys...) get the stdlib path
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._OPTS).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self._OPTS)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    """
+    Install the fastest available provider (JSON_PROVIDER=orjson|stdlib overrides).
+    """
+    choice = (app.config.get("JSON_PROVIDER") or "auto").lower()
+    if choice == "stdlib" or orjson is None:
+        app.json = MongoJSONProvider(app)
+    else:
+        app.json = OrjsonProvider(app)
+
@@ -1,10 +1,14 @@
 import jwt
+import uuid
 from datetime import datetime, timedelta, timezone
 
+JWT_ALGO = "HS256"
+
 def sign_token(payload: dict, secret: str, expires_seconds: int):
     exp = datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
-    to_encode = {**payload, "exp": exp}
-    return jwt.encode(to_encode, secret, algorithm="HS256")
+    # jti keeps two tokens issued in the same second distinct (revocation is per token)
+    to_encode = {"jti": uuid.uuid4().hex, **payload, "exp": exp}
+    return jwt.encode(to_encode, secret, algorithm=JWT_ALGO)
 
 def verify_token(token: str, secret: str):
-    return jwt.decode(token, secret, algorithms=["HS256"])
+    return jwt.decode(token, secret, algorithms=[JWT_ALGO])
@@ -0,0 +1,103 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+MAX_PAGE_SIZE = 1000
+
+
+def parse_limit(limit, default: int = 200, maximum: int = MAX_PAGE_SIZE) -> int:
+    try:
+        n = int(limit if limit not in (None, "") else default)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    if n < 1:
+        raise ValueError("limit must be >= 1")
+    return min(n, maximum)
+
+
+def _epoch_ms(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _from_epoch_ms(ms) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(key, oid, issued_at: datetime = None) -> str:
+    """
+    Opaque keyset cursor for (sort key, _id). Datetimes are stored as epoch millis
+    (BSON datetime precision) so they round-trip exactly. issued_at optionally
+    stamps when the cursor's sequence started (see cursor_issued_at).
+    """
+    if isinstance(key, datetime):
+        payload = {"t": "dt", "k": _epoch_ms(key)}
+    else:
+        payload = {"t": "s", "k": key}
+    payload["id"] = str(oid)
+    if issued_at is not None:
+        payload["at"] = _epoch_ms(issued_at)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """
+    Returns (key, ObjectId). Raises ValueError on anything malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key = payload["k"]
+        if payload.get("t") == "dt":
+            # budgets store naive UTC datetimes
+            key = _from_epoch_ms(key)
+        return key, ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def cursor_issued_at(token: str):
+    """
+    The issued_at stamp of a cursor as a naive UTC datetime, None when it has none.
+    Raises ValueError on anything malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        at = json.loads(raw).get("at")
+        return None if at is None else _from_epoch_ms(at)
+    except (ValueError, TypeError, AttributeError, OverflowError, OSError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_after(field: str, key, oid, ascending: bool = False) -> dict:
+    """
+    Range predicate for the next page of a (field DESC, _id DESC) ordering,
+    or (field ASC, _id ASC) with ascending=True.
+    """
+    op = "$gt" if ascending else "$lt"
+    return {
+        "$or": [
+            {field: {op: key}},
+            {field: key, "_id": {op: oid}},
+        ]
+    }
+
+
+def keyset_after_typed(field: str, key, oid, ascending: bool = False) -> dict:
+    """
+    keyset_after for a field that holds legacy strings next to BSON dates.
+    Mongo sorts every string before every date, so paging down past a date
+    still has all strings ahead of it (and paging up past a string, all dates).
+    """
+    pred = keyset_after(field, key, oid, ascending=ascending)
+    if not ascending and isinstance(key, datetime):
+        pred["$or"].append({field: {"$type": "string"}})
+    elif ascending and not isinstance(key, datetime):
+        pred["$or"].append({field: {"$type": "date"}})
+    return pred
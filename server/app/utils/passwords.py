@@ -0,0 +1,172 @@
+# app/utils/passwords.py
+"""
+Password hashing driven by Config:
+
+    PASSWORD_HASH_METHOD      scrypt | pbkdf2 | argon2 (argon2 needs `pip install argon2-cffi`)
+    PASSWORD_PBKDF2_ITERATIONS, PASSWORD_SCRYPT_N/R/P, PASSWORD_ARGON2_TIME_COST/MEMORY_KIB/PARALLELISM
+
+Hashing and checking run on a small dedicated thread pool (PASSWORD_HASH_WORKERS)
+with a bounded queue (PASSWORD_HASH_MAX_PENDING), so a burst of sign-ins cannot
+occupy every request thread with KDF work; excess callers get PasswordHasherBusy.
+hashlib's pbkdf2/scrypt and argon2-cffi release the GIL while they run.
+
+Hashes from any supported scheme still verify; needs_rehash() reports the ones that
+do not match the current setting so sign-in can upgrade them.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:  # optional
+    import argon2
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover - depends on environment
+    argon2 = None
+
+METHODS = ("pbkdf2", "scrypt", "argon2")
+
+# defaults match werkzeug 3.x generate_password_hash(): scrypt:32768:8:1
+_settings = {
+    "method": "scrypt",
+    "pbkdf2_iterations": 600_000,
+    "scrypt_n": 2**15,
+    "scrypt_r": 8,
+    "scrypt_p": 1,
+    "argon2_time_cost": 3,
+    "argon2_memory_kib": 65536,
+    "argon2_parallelism": 1,
+    "workers": 2,
+    "max_pending": 32,
+    "wait_seconds": 5.0,
+}
+_argon2_hasher = None
+_executor = None
+_slots = threading.BoundedSemaphore(_settings["workers"] + _settings["max_pending"])
+_lock = threading.Lock()
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full for longer than PASSWORD_HASH_WAIT_SECONDS."""
+
+
+def configure_password_hashing(**settings) -> None:
+    """
+    Applies settings (keys of _settings; None keeps the current value).
+    """
+    global _argon2_hasher, _executor, _slots
+    with _lock:
+        for k, v in settings.items():
+            if k not in _settings:
+                raise ValueError(f"Unknown password hashing setting: {k}")
+            if v is not None:
+                _settings[k] = v
+
+        method = _settings["method"]
+        if method not in METHODS:
+            raise ValueError(f"PASSWORD_HASH_METHOD must be one of {', '.join(METHODS)}")
+        if method == "argon2" and argon2 is None:
+            raise RuntimeError("PASSWORD_HASH_METHOD=argon2 requires `pip install argon2-cffi`")
+
+        _argon2_hasher = None
+        if argon2 is not None:
+            _argon2_hasher = argon2.PasswordHasher(
+                time_cost=int(_settings["argon2_time_cost"]),
+                memory_cost=int(_settings["argon2_memory_kib"]),
+                parallelism=int(_settings["argon2_parallelism"]),
+            )
+
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        _slots = threading.BoundedSemaphore(int(_settings["workers"]) + int(_settings["max_pending"]))
+
+
+def configure_from_config(config) -> None:
+    configure_password_hashing(
+        method=(config.get("PASSWORD_HASH_METHOD") or "scrypt").lower(),
+        pbkdf2_iterations=config.get("PASSWORD_PBKDF2_ITERATIONS"),
+        scrypt_n=config.get("PASSWORD_SCRYPT_N"),
+        scrypt_r=config.get("PASSWORD_SCRYPT_R"),
+        scrypt_p=config.get("PASSWORD_SCRYPT_P"),
+        argon2_time_cost=config.get("PASSWORD_ARGON2_TIME_COST"),
+        argon2_memory_kib=config.get("PASSWORD_ARGON2_MEMORY_KIB"),
+        argon2_parallelism=config.get("PASSWORD_ARGON2_PARALLELISM"),
+        workers=config.get("PASSWORD_HASH_WORKERS"),
+        max_pending=config.get("PASSWORD_HASH_MAX_PENDING"),
+        wait_seconds=config.get("PASSWORD_HASH_WAIT_SECONDS"),
+    )
+
+
+def _werkzeug_method() -> str:
+    if _settings["method"] == "scrypt":
+        return f"scrypt:{int(_settings['scrypt_n'])}:{int(_settings['scrypt_r'])}:{int(_settings['scrypt_p'])}"
+    return f"pbkdf2:sha256:{int(_settings['pbkdf2_iterations'])}"
+
+
+# ---------- synchronous primitives (also used by bench/bench_passwords.py) ----------
+def hash_password_sync(password: str) -> str:
+    if _settings["method"] == "argon2":
+        return _argon2_hasher.hash(password)
+    return generate_password_hash(password, method=_werkzeug_method())
+
+
+def check_password_sync(stored_hash: str, password: str) -> bool:
+    if not stored_hash:
+        return False
+    if stored_hash.startswith("$argon2"):
+        if argon2 is None:
+            return False
+        try:
+            return _argon2_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    try:
+        return check_password_hash(stored_hash, password)
+    except ValueError:
+        return False
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """
+    True when stored_hash was made with a different scheme/cost than the current setting.
+    """
+    if not stored_hash:
+        return False
+    if _settings["method"] == "argon2":
+        if not stored_hash.startswith("$argon2"):
+            return True
+        return _argon2_hasher.check_needs_rehash(stored_hash)
+    if stored_hash.startswith("$argon2"):
+        return True
+    return stored_hash.split("$", 1)[0] != _werkzeug_method()
+
+
+# ---------- bounded pool ----------
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(_settings["workers"]), thread_name_prefix="pwhash"
+                )
+    return _executor
+
+
+def _run(fn, *args):
+    slots = _slots
+    if not slots.acquire(timeout=float(_settings["wait_seconds"])):
+        raise PasswordHasherBusy("Too many concurrent sign-ins, try again shortly")
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(password: str) -> str:
+    return _run(hash_password_sync, password)
+
+
+def check_password(stored_hash: str, password: str) -> bool:
+    return _run(check_password_sync, stored_hash, password)
@@ -0,0 +1,75 @@
+# app/utils/periods.py
+"""
+Query-string period parsing shared by the sync and async expense routes.
+"""
+from datetime import datetime
+import calendar
+
+
+def valid_year(year: str) -> str:
+    y = (year or "").strip()
+    if len(y) != 4 or not y.isdigit():
+        raise ValueError("year must be YYYY")
+    yi = int(y)
+    if yi < 2000 or yi > 2100:
+        raise ValueError("Invalid year")
+    return y
+
+
+def valid_month(month: str) -> str:
+    m = (month or "").strip()
+    if len(m) != 7 or m[4] != "-":
+        raise ValueError("month must be YYYY-MM")
+    y, mm = m.split("-", 1)
+    if not (y.isdigit() and mm.isdigit()):
+        raise ValueError("month must be YYYY-MM")
+    yi = int(y)
+    mi = int(mm)
+    if yi < 2000 or yi > 2100:
+        raise ValueError("Invalid year")
+    if mi < 1 or mi > 12:
+        raise ValueError("Invalid month")
+    return m
+
+
+def valid_date(date_str: str) -> str:
+    d = (date_str or "").strip()
+    datetime.strptime(d, "%Y-%m-%d")
+    return d
+
+
+def month_to_from_to(month: str) -> tuple[str, str]:
+    month = valid_month(month)
+    y, m = month.split("-", 1)
+    yi = int(y)
+    mi = int(m)
+    last_day = calendar.monthrange(yi, mi)[1]
+    return (f"{month}-01", f"{month}-{last_day:02d}")
+
+
+def year_to_from_to(year: str) -> tuple[str, str]:
+    year = valid_year(year)
+    return (f"{year}-01-01", f"{year}-12-31")
+
+
+def range_from_args(args) -> tuple[str | None, str | None]:
+    """
+    Resolve ?from=&to= (wins), else ?month=YYYY-MM, else ?year=YYYY into (date_from, date_to).
+    """
+    date_from = args.get("from")
+    date_to = args.get("to")
+    month = args.get("month")
+    year = args.get("year")
+
+    if date_from:
+        date_from = valid_date(date_from)
+    if date_to:
+        date_to = valid_date(date_to)
+
+    if (not date_from and not date_to) and month:
+        date_from, date_to = month_to_from_to(month)
+
+    if (not date_from and not date_to) and year:
+        date_from, date_to = year_to_from_to(year)
+
+    return date_from, date_to
@@ -0,0 +1,4 @@
+from app.async_app import create_async_app
+
+# ASGI entrypoint, e.g. `hypercorn asgi:app --workers 2`
+app = create_async_app()
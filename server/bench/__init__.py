@@ -0,0 +1 @@
+# Performance benchmarks (see module docstrings for usage)
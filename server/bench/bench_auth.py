@@ -0,0 +1,95 @@
+# bench/bench_auth.py
+"""
+Per-request overhead of require_auth: a full jwt.decode on every call (old
+behaviour) vs. the verified-claims cache, measured inside a request context.
+
+    python -m bench.bench_auth [--iterations 20000] [--mongo mongodb://localhost:27017]
+
+Revocation is on, as in production: the decorator reads `revoked_tokens` from
+mongomock (default) or a real mongod. A cache miss pays the _id lookup; a cache
+hit pays the periodic pull of recent revocations, shown both at the configured
+AUTH_REVOCATION_REFRESH_SECONDS and with a pull due on every call (worst case).
+"""
+import argparse
+import time
+
+import jwt
+from flask import Flask
+
+from app.config import Config
+from app.utils import auth
+from app.utils.jwt_utils import JWT_ALGO, sign_token, verify_token
+
+SECRET = "bench-secret-" + "x" * 32
+
+
+def _time(fn, iterations):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6  # µs per call
+
+
+def _revoked_col(mongo):
+    if mongo == "mongomock":
+        from bench import mongomock_compat
+
+        db = mongomock_compat.client()["bench_auth"]
+    else:
+        from pymongo import MongoClient
+
+        db = MongoClient(mongo)["bench_auth"]
+    from app.db.indexes import ensure_collection_indexes
+
+    db[auth.REVOKED_COLLECTION].drop()
+    ensure_collection_indexes(db, auth.REVOKED_COLLECTION)
+    # some revoked tokens for the lookups to search through
+    col = db[auth.REVOKED_COLLECTION]
+    for i in range(200):
+        other = sign_token({"email": f"gone{i}@example.com", "uid": "0" * 24}, SECRET, 3600)
+        auth.revoke_token(other, revoked_col=col, claims=verify_token(other, SECRET), secret=SECRET)
+    return col
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--mongo", default="mongomock", help="mongomock or a mongodb:// URI for revoked_tokens")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["JWT_SECRET"] = SECRET
+    token = sign_token({"email": "bench@example.com", "uid": "0" * 24}, SECRET, 3600)
+    revoked_col = _revoked_col(args.mongo)
+    auth._revoked_collection = lambda: revoked_col
+
+    @auth.require_auth
+    def view():
+        return auth.get_authed_email()
+
+    def uncached():
+        auth._claims_cache.clear()
+        return view()
+
+    refresh = Config.AUTH_REVOCATION_REFRESH_SECONDS
+    results = {}
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        results["jwt.decode only"] = _time(lambda: jwt.decode(token, SECRET, algorithms=[JWT_ALGO]), args.iterations)
+        results["verify_token only"] = _time(lambda: verify_token(token, SECRET), args.iterations)
+        auth.configure_auth_cache(revocation_refresh=refresh)
+        results["require_auth (no cache)"] = _time(uncached, args.iterations)
+        auth.configure_auth_cache(revocation_refresh=refresh)
+        results[f"require_auth (cached, {refresh:g}s pull)"] = _time(view, args.iterations)
+        auth.configure_auth_cache(revocation_refresh=0)
+        results["require_auth (cached, pull/call)"] = _time(view, max(1, args.iterations // 10))
+
+    print(f"{'path':<34}{'µs/call':>10}")
+    for name, us in results.items():
+        print(f"{name:<34}{us:>10.2f}")
+    base = results["require_auth (no cache)"]
+    print(f"\ncache speedup: {base / results[f'require_auth (cached, {refresh:g}s pull)']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench/bench_json.py
+"""
+Serialization cost of GET /api/expenses bodies: the old path (serialize_expense
+per row + Flask's stdlib jsonify) vs. Mongo-projected rows + the app provider.
+
+    python -m bench.bench_json [--rows 200 2000 20000] [--repeat 20]
+
+No database needed: rows are synthesized in the shape Mongo returns them.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.model.expenseModel.expense_model import serialize_expense
+from app.utils.json_provider import MongoJSONProvider, OrjsonProvider, orjson
+
+
+def _raw_rows(n):
+    base = datetime(2024, 1, 1)
+    cats = ["Food", "Transport", "Bills", "Shopping", "Health", "Other"]
+    rows = []
+    for i in range(n):
+        ts = (base + timedelta(minutes=i)).isoformat()
+        rows.append({
+            "_id": ObjectId(),
+            "userEmail": "bench@example.com",
+            "title": f"Expense {i}",
+            "amount": round(random.uniform(1, 500), 2),
+            "category": random.choice(cats),
+            "date": (base + timedelta(days=i % 730)).strftime("%Y-%m-%d"),
+            "notes": "",
+            "createdAt": ts,
+            "updatedAt": ts,
+        })
+    return rows
+
+
+def _projected(rows):
+    # what LIST_PROJECTION returns: _id already a string
+    return [{**r, "_id": str(r["_id"])} for r in rows]
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat):
+    app = Flask(__name__)
+    providers = {"stdlib-default": DefaultJSONProvider(app), "mongo-stdlib": MongoJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+
+    results = []
+    with app.test_request_context():
+        for n in sizes:
+            raw = _raw_rows(n)
+            lean = _projected(raw)
+
+            old = providers["stdlib-default"]
+            baseline = _time(
+                lambda: old.response({"success": True, "expenses": [serialize_expense(d) for d in raw]}),
+                repeat,
+            )
+            results.append((n, "serialize_expense + stdlib jsonify", baseline, 1.0))
+
+            for name, prov in providers.items():
+                if name == "stdlib-default":
+                    continue
+                t = _time(lambda: prov.response({"success": True, "expenses": lean}), repeat)
+                results.append((n, f"projected rows + {name}", t, baseline / t))
+
+    print(f"{'rows':>7}  {'path':<40} {'best ms':>9} {'resp/s':>9} {'speedup':>8}")
+    for n, path, t, speedup in results:
+        print(f"{n:>7}  {path:<40} {t * 1000:>9.2f} {1 / t:>9.1f} {speedup:>7.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[200, 2000, 20000])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
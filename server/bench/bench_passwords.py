@@ -0,0 +1,47 @@
+# bench/bench_passwords.py
+"""
+Sign-in cost per password-hash setting: time for one check_password (the CPU part
+of POST /api/auth/signin) and the resulting logins/sec on one core.
+
+    python -m bench.bench_passwords [--repeat 5]
+
+argon2 rows are skipped unless argon2-cffi is installed.
+"""
+import argparse
+import time
+
+from app.utils import passwords
+
+SETTINGS = [
+    ("pbkdf2-sha256 1,000,000", {"method": "pbkdf2", "pbkdf2_iterations": 1_000_000}),
+    ("pbkdf2-sha256 600,000", {"method": "pbkdf2", "pbkdf2_iterations": 600_000}),
+    ("pbkdf2-sha256 310,000", {"method": "pbkdf2", "pbkdf2_iterations": 310_000}),
+    ("scrypt N=2^15 r=8 p=1 (werkzeug 3.x default)", {"method": "scrypt", "scrypt_n": 2**15, "scrypt_r": 8, "scrypt_p": 1}),
+    ("scrypt N=2^14 r=8 p=1", {"method": "scrypt", "scrypt_n": 2**14, "scrypt_r": 8, "scrypt_p": 1}),
+    ("argon2id t=3 m=64MiB p=1", {"method": "argon2", "argon2_time_cost": 3, "argon2_memory_kib": 65536}),
+    ("argon2id t=2 m=19MiB p=1", {"method": "argon2", "argon2_time_cost": 2, "argon2_memory_kib": 19456}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'setting':<44}{'ms/check':>10}{'logins/s/core':>15}")
+    for name, cfg in SETTINGS:
+        if cfg["method"] == "argon2" and passwords.argon2 is None:
+            print(f"{name:<44}{'skipped (argon2-cffi not installed)':>25}")
+            continue
+        passwords.configure_password_hashing(**cfg)
+        stored = passwords.hash_password_sync("correct horse battery staple")
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            assert passwords.check_password_sync(stored, "correct horse battery staple")
+        ms = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{name:<44}{ms:>10.1f}{1000 / ms:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
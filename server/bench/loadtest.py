@@ -0,0 +1,471 @@
+# bench/loadtest.py
+"""
+Mixed-workload load test over every blueprint (health, auth, expenses, budgets,
+settings). Reports throughput and p50/p95/p99 per endpoint and writes them to
+JSON, so runs on two commits can be compared.
+
+In-process (Flask test client, one client per worker thread):
+
+    python -m bench.loadtest --mongo mongomock --users 5 --expenses 2000 --requests 3000
+    python -m bench.loadtest --mongo mongodb://localhost:27017 --db expense_bench --expenses 100000
+
+Over HTTP against a running server (seed its database with bench.seed first):
+
+    python -m bench.loadtest --url http://127.0.0.1:5000 --seeded-users 20 --concurrency 32
+
+(start that server with ADMIN_EMAILS listing the seeded users, or /api/auth/users answers 403)
+
+Compare with an earlier run (exit 1 if any endpoint's p95 got worse than --max-regression):
+
+    python -m bench.loadtest ... --out new.json --compare old.json
+
+Seeded users sign in once up front; sign-in/sign-up/sign-out still get their own
+(low-weight) scenarios, and their cost depends on PASSWORD_* settings.
+
+Token revocation runs as in production: every authed request goes through the
+claims cache and its periodic pull of `revoked_tokens`, and `auth.revoked` reuses
+a signed-out token, which must get 401 (anything else counts as an error; against
+several server processes that includes a 200 inside the refresh window). The
+in-process run records AUTH_REVOCATION_REFRESH_SECONDS in the results metadata.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+from bench.seed import PASSWORD, TITLES, seed, user_email
+
+
+# ---------- transports: (method, path, json, headers) -> (status, body bytes) ----------
+class InProcessTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def __call__(self, method, path, body=None, headers=None):
+        resp = self.client.open(path, method=method, json=body, headers=headers or {})
+        return resp.status_code, resp.get_data()
+
+
+class HttpTransport:
+    """One keep-alive connection per worker thread (http.client, no extra dependency)."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.conn = None
+
+    def __call__(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                resp = self.conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.HTTPException, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+# ---------- scenarios ----------
+class VirtualUser:
+    def __init__(self, email, token, rng):
+        self.email = email
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.rng = rng
+        self.since = None
+
+    def day(self, back=0):
+        return (date.today() - timedelta(days=back)).isoformat()
+
+
+def _json(body):
+    try:
+        return json.loads(body or b"{}")
+    except ValueError:
+        return {}
+
+
+def s_health(u, call):
+    call("health", "GET", "/api/health")
+    call("health.pool", "GET", "/api/health/pool")
+
+
+def s_me(u, call):
+    call("auth.me", "GET", "/api/auth/me", headers=u.auth)
+
+
+def s_me_patch(u, call):
+    call("auth.me.patch", "PATCH", "/api/auth/me", {"name": f"Bench {u.rng.randrange(1000)}"}, u.auth)
+
+
+def s_users(u, call):
+    call("auth.users", "GET", "/api/auth/users?limit=50&fields=name,email", headers=u.auth)
+
+
+def s_signup(u, call):
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    call("auth.signup", "POST", "/api/auth/signup", {"name": "Load", "email": email, "password": PASSWORD})
+
+
+def s_signin_signout(u, call):
+    status, body = call("auth.signin", "POST", "/api/auth/signin", {"email": u.email, "password": PASSWORD})
+    token = _json(body).get("user_token")
+    if status == 200 and token:
+        call("auth.signout", "POST", "/api/auth/signout", headers={"Authorization": f"Bearer {token}"})
+
+
+def s_revoked(u, call):
+    status, body = call("auth.signin", "POST", "/api/auth/signin", {"email": u.email, "password": PASSWORD})
+    token = _json(body).get("user_token")
+    if status != 200 or not token:
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+    # the first call caches the claims, so the reuse below is rejected on the cache-hit path
+    call("auth.me", "GET", "/api/auth/me", headers=headers)
+    call("auth.signout", "POST", "/api/auth/signout", headers=headers)
+    call("auth.revoked", "GET", "/api/auth/me", headers=headers, expect=401)
+
+
+def s_list(u, call):
+    status, body = call("expenses.list", "GET", "/api/expenses?limit=50", headers=u.auth)
+    cursor = _json(body).get("next_cursor")
+    if status == 200 and cursor:
+        call("expenses.list.page2", "GET", f"/api/expenses?limit=50&cursor={cursor}", headers=u.auth)
+
+
+def s_list_range(u, call):
+    call("expenses.list.range", "GET", f"/api/expenses?from={u.day(30)}&to={u.day()}&limit=100", headers=u.auth)
+
+
+def s_search(u, call):
+    call("expenses.search.text", "GET", f"/api/expenses?q={u.rng.choice(TITLES)[:3].lower()}&limit=50", headers=u.auth)
+    call("expenses.search.category", "GET", "/api/expenses?category=Food&category=Bills&limit=50", headers=u.auth)
+    call("expenses.search.amount", "GET", "/api/expenses?min=50&max=120&limit=50", headers=u.auth)
+
+
+def s_summary(u, call):
+    call("expenses.summary", "GET", f"/api/expenses/summary?from={u.day(90)}&to={u.day()}", headers=u.auth)
+
+
+def s_monthly(u, call):
+    call("expenses.monthly", "GET", f"/api/expenses/monthly?year={date.today().year}", headers=u.auth)
+
+
+def s_changes(u, call):
+    path = "/api/expenses/changes?limit=200" + (f"&since={u.since}" if u.since else "")
+    status, body = call("expenses.changes", "GET", path, headers=u.auth)
+    if status == 200:
+        u.since = _json(body).get("next_since") or u.since
+
+
+def s_export(u, call):
+    call("expenses.export", "GET", f"/api/expenses/export?format=csv&from={u.day(30)}&to={u.day()}", headers=u.auth)
+
+
+def s_expense_crud(u, call):
+    status, body = call(
+        "expenses.add",
+        "POST",
+        "/api/expenses/add",
+        {
+            "title": "Load",
+            "amount": round(u.rng.uniform(1, 99), 2),
+            "category": "Food",
+            "date": u.day(u.rng.randrange(60)),
+        },
+        u.auth,
+    )
+    exp_id = (_json(body).get("expense") or {}).get("_id")
+    if status != 201 or not exp_id:
+        return
+    call("expenses.update", "PUT", f"/api/expenses/{exp_id}", {"amount": round(u.rng.uniform(1, 99), 2)}, u.auth)
+    call("expenses.delete", "DELETE", f"/api/expenses/{exp_id}", headers=u.auth)
+
+
+def s_bulk(u, call):
+    rows = [
+        {
+            "title": "Bulk",
+            "amount": round(u.rng.uniform(1, 50), 2),
+            "category": "Other",
+            "date": u.day(u.rng.randrange(30)),
+        }
+        for _ in range(20)
+    ]
+    call("expenses.bulk", "POST", "/api/expenses/bulk", rows, u.auth)
+
+
+def s_budgets(u, call):
+    call("budgets.list", "GET", "/api/budgets?limit=50", headers=u.auth)
+
+
+def s_budget_crud(u, call):
+    status, body = call("budgets.add", "POST", "/api/budgets/add", {"month": u.day()[:7], "amount": 1000}, u.auth)
+    budget_id = (_json(body).get("budget") or {}).get("_id")
+    if status == 201 and budget_id:
+        call("budgets.delete", "DELETE", f"/api/budgets/{budget_id}", headers=u.auth)
+
+
+def s_dashboard(u, call):
+    call("dashboard", "GET", f"/api/dashboard?from={u.day(30)}&to={u.day()}", headers=u.auth)
+
+
+def s_categories(u, call):
+    call("settings.categories", "GET", "/api/settings/categories", headers=u.auth)
+
+
+def s_category_crud(u, call):
+    name = f"Load{uuid.uuid4().hex[:8]}"
+    status, _ = call("settings.categories.add", "POST", "/api/settings/categories", {"name": name}, u.auth)
+    if status == 201:
+        call("settings.categories.delete", "DELETE", f"/api/settings/categories/{name}", headers=u.auth)
+
+
+# weights roughly follow a dashboard-heavy client: many reads, some writes, rare auth
+SCENARIOS = [
+    (s_list, 20),
+    (s_summary, 12),
+    (s_monthly, 8),
+    (s_list_range, 8),
+    (s_search, 6),
+    (s_dashboard, 6),
+    (s_changes, 6),
+    (s_categories, 8),
+    (s_budgets, 6),
+    (s_me, 6),
+    (s_expense_crud, 8),
+    (s_budget_crud, 2),
+    (s_category_crud, 2),
+    (s_bulk, 1),
+    (s_export, 2),
+    (s_users, 1),
+    (s_me_patch, 1),
+    (s_health, 2),
+    (s_signin_signout, 1),
+    (s_revoked, 1),
+    (s_signup, 1),
+]
+
+
+# ---------- stats ----------
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # name -> [seconds]
+        self.errors = {}  # name -> count of 5xx / unexpected 4xx / exceptions
+
+    def add(self, name, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, wall_seconds):
+        endpoints = {}
+        everything = []
+        for name in sorted(self.samples):
+            values = sorted(self.samples[name])
+            everything += values
+            endpoints[name] = _row(values, self.errors.get(name, 0), wall_seconds)
+        return {"endpoints": endpoints, "total": _row(sorted(everything), sum(self.errors.values()), wall_seconds)}
+
+
+def _row(values, errors, wall_seconds):
+    n = len(values)
+    return {
+        "count": n,
+        "errors": errors,
+        "rps": round(n / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": round(sum(values) / n * 1000, 3) if n else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if n else 0.0,
+    }
+
+
+# ---------- runner ----------
+def _caller(transport, recorder):
+    def call(name, method, path, body=None, headers=None, expect=None):
+        """expect: the one status that counts as ok (default: anything below 400)."""
+        start = time.perf_counter()
+        try:
+            status, data = transport(method, path, body, headers)
+        except Exception:
+            recorder.add(name, time.perf_counter() - start, ok=False)
+            return 0, b""
+        recorder.add(name, time.perf_counter() - start, ok=status == expect if expect else status < 400)
+        return status, data
+
+    return call
+
+
+def _sign_in(transport, email):
+    status, body = transport("POST", "/api/auth/signin", {"email": email, "password": PASSWORD})
+    token = _json(body).get("user_token")
+    if status != 200 or not token:
+        raise SystemExit(f"sign-in failed for {email}: {status} {body[:200]!r}")
+    return token
+
+
+def run(make_transport, emails, *, requests, concurrency, seed_value=1):
+    recorder = Recorder()
+    funcs = [f for f, _ in SCENARIOS]
+    weights = [w for _, w in SCENARIOS]
+    tokens = {e: _sign_in(make_transport(), e) for e in emails}
+    per_worker = max(1, requests // concurrency)
+
+    def worker(i):
+        rng = random.Random(seed_value * 1000 + i)
+        email = emails[i % len(emails)]
+        user = VirtualUser(email, tokens[email], rng)
+        call = _caller(make_transport(), recorder)
+        for _ in range(per_worker):
+            rng.choices(funcs, weights)[0](user, call)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder.report(time.perf_counter() - start)
+
+
+def _git_commit():
+    try:
+        out = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL)
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _build_app(mongo, db_name, users):
+    # before the first `import app`: Config reads the environment at import time
+    os.environ["MONGO_DB_NAME"] = db_name
+    # /api/auth/users is admin-only; every seeded user may call it
+    os.environ.setdefault("ADMIN_EMAILS", ",".join(user_email(i) for i in range(users)))
+    os.environ["MONGO_AUTO_INDEXES"] = "0"  # seed() reconciles indexes itself
+    if mongo == "mongomock":
+        from bench import mongomock_compat
+
+        client = mongomock_compat.client()
+        os.environ.setdefault("MONGO_URI", "mongodb://mongomock.invalid")
+    else:
+        os.environ["MONGO_URI"] = mongo
+        client = None
+
+    from app import create_app
+    from app.db.mongo import get_db
+
+    app = create_app()
+    if client is not None:
+        app.extensions["mongo_client"] = client
+        app.extensions["mongo_client_pid"] = os.getpid()
+    return app, get_db(app)
+
+
+def compare(new, old, max_regression):
+    """Prints p95 deltas; returns the endpoints whose p95 grew by more than max_regression (fraction)."""
+    worse = []
+    print(f"\n{'endpoint':<28}{'old p95':>10}{'new p95':>10}{'delta':>9}")
+    for name, row in new["endpoints"].items():
+        prev = old.get("endpoints", {}).get(name)
+        if not prev or not prev["p95_ms"]:
+            continue
+        delta = row["p95_ms"] / prev["p95_ms"] - 1
+        print(f"{name:<28}{prev['p95_ms']:>10.2f}{row['p95_ms']:>10.2f}{delta:>+9.1%}")
+        if delta > max_regression:
+            worse.append(name)
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mongo", default="mongomock", help="'mongomock' or a mongodb:// URI (in-process runs)")
+    target.add_argument("--url", help="base URL of a running server (HTTP run)")
+    parser.add_argument("--db", default="expense_bench")
+    parser.add_argument("--users", type=int, default=5, help="users to seed (in-process runs)")
+    parser.add_argument("--expenses", type=int, default=2000, help="expenses per seeded user")
+    parser.add_argument("--seeded-users", type=int, default=5, help="bench.seed users to sign in as (HTTP runs)")
+    parser.add_argument("--fresh", action="store_true", help="clear the seeded collections before seeding")
+    parser.add_argument("--requests", type=int, default=2000, help="scenario runs in total")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--out", default="loadtest-results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.url:
+        emails = [user_email(i) for i in range(args.seeded_users)]
+        make_transport = lambda: HttpTransport(args.url)  # noqa: E731
+        backend = args.url
+        revocation_refresh = None  # the server's own setting
+    else:
+        app, db = _build_app(args.mongo, args.db, args.users)
+        fresh = args.fresh or args.mongo == "mongomock"
+        emails = [e for e, _ in seed(db, users=args.users, expenses_per_user=args.expenses, fresh=fresh)]
+        make_transport = lambda: InProcessTransport(app)  # noqa: E731
+        backend = args.mongo if args.mongo == "mongomock" else "mongod"
+        revocation_refresh = app.config.get("AUTH_REVOCATION_REFRESH_SECONDS")
+
+    report = run(make_transport, emails, requests=args.requests, concurrency=args.concurrency)
+    report["meta"] = {
+        "commit": _git_commit(),
+        "at": datetime.utcnow().isoformat() + "Z",
+        "backend": backend,
+        "driver": "http" if args.url else "in-process",
+        "users": len(emails),
+        "expensesPerUser": None if args.url else args.expenses,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "authRevocationRefreshSeconds": revocation_refresh,
+        "python": sys.version.split()[0],
+    }
+
+    print(f"{'endpoint':<28}{'count':>7}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for name, row in {**report["endpoints"], "TOTAL": report["total"]}.items():
+        print(
+            f"{name:<28}{row['count']:>7}{row['errors']:>5}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(report, json.load(f), args.max_regression)
+        if worse:
+            print(f"p95 regressed beyond {args.max_regression:.0%}: {', '.join(worse)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench/mongomock_compat.py
+"""
+Makes mongomock good enough to serve every route in-process for the load test.
+mongomock (4.x) lags pymongo: its bulk_write does not understand pymongo 4.9+
+operation objects, and its aggregation engine has no $substrCP, $round or
+allowDiskUse. Numbers from a mongomock run measure the Python side of the app
+only; use a real mongod for anything that involves query plans.
+"""
+import mongomock
+import mongomock.collection as _collection
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+_applied = False
+
+
+class _BulkResult:
+    def __init__(self):
+        self.inserted_count = self.matched_count = self.modified_count = 0
+        self.deleted_count = self.upserted_count = 0
+        self.acknowledged = True
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    res = _BulkResult()
+    for op in requests:
+        if isinstance(op, InsertOne):
+            self.insert_one(op._doc)
+            res.inserted_count += 1
+        elif isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+            fn = {UpdateOne: self.update_one, UpdateMany: self.update_many, ReplaceOne: self.replace_one}[type(op)]
+            r = fn(op._filter, op._doc, upsert=op._upsert)
+            res.matched_count += r.matched_count
+            res.modified_count += r.modified_count
+            res.upserted_count += 1 if r.upserted_id is not None else 0
+        elif isinstance(op, DeleteOne):
+            res.deleted_count += self.delete_one(op._filter).deleted_count
+        elif isinstance(op, DeleteMany):
+            res.deleted_count += self.delete_many(op._filter).deleted_count
+        else:
+            raise TypeError(f"unsupported bulk op {op!r}")
+    return res
+
+
+def _rewrite(stage):
+    if isinstance(stage, list):
+        return [_rewrite(s) for s in stage]
+    if not isinstance(stage, dict):
+        return stage
+    if set(stage) == {"$round"}:  # values are already integral cents in practice
+        return _rewrite(stage["$round"][0])
+    return {("$substr" if k == "$substrCP" else k): _rewrite(v) for k, v in stage.items()}
+
+
+def apply() -> None:
+    global _applied
+    if _applied:
+        return
+    aggregate = _collection.Collection.aggregate
+
+    def _aggregate(self, pipeline, *args, **kwargs):
+        kwargs.pop("allowDiskUse", None)
+        return aggregate(self, _rewrite(pipeline), *args, **kwargs)
+
+    _collection.Collection.bulk_write = _bulk_write
+    _collection.Collection.aggregate = _aggregate
+    _applied = True
+
+
+def client() -> "mongomock.MongoClient":
+    apply()
+    return mongomock.MongoClient()
@@ -0,0 +1,128 @@
+# bench/seed.py
+"""
+Synthetic data for the load test: users (one shared password), settings with the
+default categories, a year of monthly budgets and N expenses per user spread over
+the last `days` days. Documents are built with the app's own helpers, so they
+have the current schema, and rollups are rebuilt at the end.
+
+    python -m bench.seed --uri mongodb://localhost:27017 --db expense_bench \
+        [--users 20] [--expenses 50000] [--fresh]
+
+Used as a library by bench/loadtest.py (which also supports mongomock).
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from pymongo import MongoClient
+
+# app.* is imported inside the functions: importing `app` reads Config from the
+# environment, and bench.loadtest sets MONGO_* before that happens.
+
+PASSWORD = "bench-password"
+TITLES = ("Lunch", "Groceries", "Bus", "Taxi", "Electricity", "Internet", "Shoes", "Pharmacy", "Coffee", "Misc")
+SEEDED_COLLECTIONS = (
+    "users", "settings", "budgets", "expenses", "expense_rollups", "expense_tombstones", "data_versions",
+)
+
+
+def user_email(i: int) -> str:
+    return f"bench{i:05d}@example.com"
+
+
+def _month_back(now, m: int) -> str:
+    y, mo = divmod(now.year * 12 + now.month - 1 - m, 12)
+    return f"{y:04d}-{mo + 1:02d}"
+
+
+def _expense_docs(email, uid, n, days, rng, now):
+    from app.model.expenseModel.expense_model import _build_expense_doc
+    from app.model.settingsModel.settings_model import DEFAULT_CATEGORIES
+
+    cats = [c["name"] for c in DEFAULT_CATEGORIES]
+    today = now.date()
+    for _ in range(n):
+        day = today - timedelta(days=rng.randrange(days))
+        yield _build_expense_doc(
+            userEmail=email,
+            uid=uid,
+            title=rng.choice(TITLES),
+            amount=round(rng.uniform(1, 250), 2),
+            category=rng.choice(cats),
+            date=day.isoformat(),
+            notes="" if rng.random() < 0.8 else "seeded",
+            now=now,
+        )
+
+
+def seed(db, *, users=20, expenses_per_user=5000, days=730, batch_size=5000, fresh=False, seed_value=42, log=print):
+    """
+    Seeds `db` and returns [(email, password)]. fresh=True clears the seeded collections first.
+    """
+    from app.db.indexes import ensure_indexes
+    from app.model.ownerModel.owner_model import owner_fields
+    from app.model.rollupModel.rollup_model import rebuild_rollups
+    from app.model.settingsModel.settings_model import new_settings_doc
+    from app.utils.passwords import hash_password_sync
+
+    rng = random.Random(seed_value)
+    if fresh:
+        for name in SEEDED_COLLECTIONS:
+            db[name].delete_many({})
+    ensure_indexes(db, force=True)
+
+    now = datetime.utcnow()
+    password_hash = hash_password_sync(PASSWORD)  # once: KDF cost would dominate seeding otherwise
+    accounts = []
+    for i in range(users):
+        email = user_email(i)
+        accounts.append((email, PASSWORD))
+        if db["users"].find_one({"email": email}, {"_id": 1}):
+            continue
+        ts = datetime.now(timezone.utc)
+        uid = db["users"].insert_one(
+            {"name": f"Bench {i}", "email": email, "passwordHash": password_hash, "createdAt": ts, "updatedAt": ts}
+        ).inserted_id
+        db["settings"].insert_one(new_settings_doc(email, uid))
+        db["budgets"].insert_many([
+            {
+                **owner_fields(email, uid),
+                "month": _month_back(now, m),
+                "amount": float(rng.randrange(500, 3000)),
+                "notes": "",
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            for m in range(12)
+        ])
+
+        batch = []
+        for doc in _expense_docs(email, uid, expenses_per_user, days, rng, now):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                db["expenses"].insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            db["expenses"].insert_many(batch, ordered=False)
+        log(f"seeded {email}: {expenses_per_user} expenses")
+
+    rebuild_rollups(db["expenses"], db["expense_rollups"])
+    return accounts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="expense_bench")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--expenses", type=int, default=5000, help="expenses per user")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--fresh", action="store_true", help="clear the seeded collections first")
+    args = parser.parse_args()
+
+    db = MongoClient(args.uri)[args.db]
+    seed(db, users=args.users, expenses_per_user=args.expenses, days=args.days, fresh=args.fresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# tests/conftest.py
+"""
+Shared fixtures. Every test runs against mongomock (bench/mongomock_compat.py) unless
+TEST_MONGO_URI points at a local mongod, in which case both apps use the real drivers:
+
+    cd server && python -m pytest -q
+    TEST_MONGO_URI=mongodb://localhost:27017 python -m pytest -q
+
+`client` is parametrized over the Flask (sync) and Quart (async) apps, so a test that
+takes it runs the same assertions against both serving modes.
+"""
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+# before the first `import app`: Config reads the environment at import time
+MONGO_URI = os.getenv("TEST_MONGO_URI")
+os.environ["MONGO_URI"] = MONGO_URI or "mongodb://mongomock.invalid"
+os.environ["MONGO_DB_NAME"] = "test"  # each test switches to its own database
+os.environ["MONGO_AUTO_INDEXES"] = "0"
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 32)
+# sign-up/sign-in run a real KDF; keep it cheap here
+os.environ["PASSWORD_HASH_METHOD"] = "pbkdf2"
+os.environ["PASSWORD_PBKDF2_ITERATIONS"] = "1000"
+
+PASSWORD = "secret123"
+
+
+# ---------- mongomock behind PyMongo's async API ----------
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        return _AsyncCursor(self._cursor.sort(*args, **kwargs))
+
+    def limit(self, n):
+        return _AsyncCursor(self._cursor.limit(n))
+
+    async def to_list(self, length=None):
+        docs = list(self._cursor)
+        return docs[:length] if length else docs
+
+
+class _AsyncCollection:
+    def __init__(self, col, database):
+        self._col = col
+        self.database = database
+
+    def find(self, *args, **kwargs):
+        # like PyMongo's AsyncCollection.find: not a coroutine, returns a cursor
+        return _AsyncCursor(self._col.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        fn = getattr(self._col, name)
+
+        async def call(*args, **kwargs):
+            res = fn(*args, **kwargs)
+            return _AsyncCursor(res) if name == "aggregate" else res
+        return call
+
+
+class _AsyncDatabase:
+    def __init__(self, db):
+        self._db = db
+        self.name = db.name
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._db[name], self)
+
+    async def command(self, *args, **kwargs):
+        return {"ok": 1.0}
+
+
+class _AsyncClient:
+    def __init__(self, client):
+        self._client = client
+        self.admin = _AsyncDatabase(client["admin"])
+
+    def __getitem__(self, name):
+        return _AsyncDatabase(self._client[name])
+
+    async def close(self):
+        pass
+
+
+# ---------- apps ----------
+@pytest.fixture
+def db_name():
+    return f"test_{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def flask_app(db_name):
+    from app import create_app
+    from app.db.indexes import ensure_indexes
+    from app.db.mongo import get_db
+
+    app = create_app()
+    app.config["MONGO_DB_NAME"] = db_name
+    app.config["TESTING"] = True
+    if not MONGO_URI:
+        from bench import mongomock_compat
+
+        app.extensions["mongo_client"] = mongomock_compat.client()
+        app.extensions["mongo_client_pid"] = os.getpid()
+    ensure_indexes(get_db(app), force=True)
+    yield app
+    if MONGO_URI:
+        app.extensions["mongo_client"].drop_database(db_name)
+
+
+def _signin(flask_app, email):
+    c = flask_app.test_client()
+    c.post("/api/auth/signup", json={"name": "Test", "email": email, "password": PASSWORD})
+    r = c.post("/api/auth/signin", json={"email": email, "password": PASSWORD})
+    return {"Authorization": f"Bearer {r.get_json()['user_token']}"}
+
+
+class SyncClient:
+    mode = "sync"
+
+    def __init__(self, flask_app):
+        self._c = flask_app.test_client()
+
+    def request(self, method, path, headers=None, json=None):
+        r = self._c.open(path, method=method, headers=headers or {}, json=json)
+        return r.status_code, r.get_json(silent=True), r.headers
+
+
+class AsyncClient:
+    mode = "async"
+
+    def __init__(self, flask_app):
+        from app.async_app import create_async_app
+
+        self._loop = asyncio.new_event_loop()
+        self.app = create_async_app()
+        self.app.config["MONGO_DB_NAME"] = flask_app.config["MONGO_DB_NAME"]
+        if MONGO_URI:
+            from pymongo import AsyncMongoClient
+
+            async def _connect():
+                return AsyncMongoClient(MONGO_URI)
+            self.app.extensions["async_mongo_client"] = self._loop.run_until_complete(_connect())
+        else:
+            # same in-memory store as the Flask app
+            self.app.extensions["async_mongo_client"] = _AsyncClient(flask_app.extensions["mongo_client"])
+        self._c = self.app.test_client()
+
+    def request(self, method, path, headers=None, json=None):
+        async def _go():
+            r = await self._c.open(path, method=method, headers=headers or {}, json=json)
+            return r.status_code, await r.get_json(silent=True), r.headers
+        return self._loop.run_until_complete(_go())
+
+    def close(self):
+        self._loop.run_until_complete(self.app.extensions["async_mongo_client"].close())
+        self._loop.close()
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, flask_app):
+    """
+    A test client for either serving mode; .request() returns (status, json, headers).
+    """
+    if request.param == "sync":
+        yield SyncClient(flask_app)
+        return
+    c = AsyncClient(flask_app)
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def auth(flask_app):
+    # users sign up through the Flask app; the token is valid for both
+    return _signin(flask_app, "user@example.com")
+
+
+@pytest.fixture
+def other_auth(flask_app):
+    return _signin(flask_app, "other@example.com")
@@ -0,0 +1,29 @@
+# tests/test_auth.py
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("query", ["", "?format=ndjson", "?email=user@example.com"])
+def test_users_requires_admin(flask_app, auth, query):
+    c = flask_app.test_client()
+    assert c.get(f"/api/auth/users{query}").status_code == 401
+    r = c.get(f"/api/auth/users{query}", headers=auth)
+    assert r.status_code == 403
+    assert r.get_json()["success"] is False
+
+
+def test_users_for_admin(flask_app, auth, other_auth):
+    flask_app.config["ADMIN_EMAILS"] = "someone@example.com, User@example.com"
+    c = flask_app.test_client()
+
+    r = c.get("/api/auth/users?fields=email", headers=auth)
+    assert r.status_code == 200
+    assert sorted(u["email"] for u in r.get_json()["users"]) == ["other@example.com", "user@example.com"]
+
+    r = c.get("/api/auth/users?format=ndjson", headers=auth)
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert all("passwordHash" not in row for row in rows) and len(rows) == 2
+
+    assert c.get("/api/auth/users", headers=other_auth).status_code == 403
@@ -0,0 +1,76 @@
+# tests/test_categories.py
+"""
+Category rename, merge and delete-with-reassign: settings, expenses and rollups move together.
+"""
+import pytest
+
+from app.db.mongo import get_db
+from app.model.rollupModel.rollup_model import get_rollups, verify_rollups
+from app.model.settingsModel import settings_model
+
+
+@pytest.fixture
+def ledger(flask_app, auth):
+    c = flask_app.test_client()
+    for title, amount, category in [("Lunch", 10, "Food"), ("Bus", 3, "Transport"), ("Film", 8, "Shopping")]:
+        body = {"title": title, "amount": amount, "category": category, "date": "2026-03-10"}
+        assert c.post("/api/expenses/add", json=body, headers=auth).status_code == 201
+    return c
+
+
+def _state(flask_app, auth, c):
+    categories = [x["name"] for x in c.get("/api/settings/categories", headers=auth).get_json()["categories"]]
+    expenses = {e["title"]: e["category"] for e in c.get("/api/expenses", headers=auth).get_json()["expenses"]}
+    db = get_db(flask_app)
+    rollups = {r["category"]: r["total"] for r in get_rollups(db["expense_rollups"], userEmail="user@example.com")}
+    assert verify_rollups(db["expenses"], db["expense_rollups"]) == []
+    return categories, expenses, rollups
+
+
+def test_rename(flask_app, auth, ledger):
+    r = ledger.put("/api/settings/categories/food", json={"name": "Meals"}, headers=auth)
+    assert r.status_code == 200 and r.get_json()["moved"] == 1
+    categories, expenses, rollups = _state(flask_app, auth, ledger)
+    assert "Meals" in categories and "Food" not in categories
+    assert expenses["Lunch"] == "Meals"
+    assert rollups["Meals"] == 10 and "Food" not in rollups
+
+
+def test_merge_into_existing(flask_app, auth, ledger):
+    r = ledger.post(
+        "/api/settings/categories/merge", json={"sources": ["Food", "Shopping"], "target": "Transport"}, headers=auth
+    )
+    assert r.status_code == 200 and r.get_json()["moved"] == 2
+    categories, expenses, rollups = _state(flask_app, auth, ledger)
+    assert "Food" not in categories and "Shopping" not in categories
+    assert set(expenses.values()) == {"Transport"}
+    assert rollups == {"Transport": 21}
+
+
+def test_delete_with_reassign(flask_app, auth, ledger):
+    r = ledger.delete("/api/settings/categories/Shopping?reassign=food", headers=auth)
+    assert r.status_code == 200 and r.get_json()["moved"] == 1
+    categories, expenses, rollups = _state(flask_app, auth, ledger)
+    assert "Shopping" not in categories
+    assert expenses["Film"] == "Food"
+    assert rollups["Food"] == 18
+
+    r = ledger.delete("/api/settings/categories/Food?reassign=Nope", headers=auth)
+    assert r.status_code == 400
+    assert _state(flask_app, auth, ledger)[1]["Lunch"] == "Food"
+
+
+def test_failed_rewrite_can_be_retried(flask_app, auth, ledger, monkeypatch):
+    def failing(*args, **kwargs):
+        raise TimeoutError("worker killed mid-rewrite")
+
+    with monkeypatch.context() as m:
+        m.setattr(settings_model, "reassign_category", failing)
+        assert ledger.put("/api/settings/categories/Food", json={"name": "Meals"}, headers=auth).status_code == 500
+    # nothing was committed, so the category and its expenses still agree
+    categories, expenses, _ = _state(flask_app, auth, ledger)
+    assert "Food" in categories and expenses["Lunch"] == "Food"
+
+    r = ledger.put("/api/settings/categories/Food", json={"name": "Meals"}, headers=auth)
+    assert r.status_code == 200
+    assert _state(flask_app, auth, ledger)[1]["Lunch"] == "Meals"
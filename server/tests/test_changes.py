@@ -0,0 +1,121 @@
+# tests/test_changes.py
+"""
+GET /api/expenses/changes in both serving modes. Edits and deletes go through the
+Flask app (the async app serves reads and adds).
+"""
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.db.mongo import get_db
+from app.model.expenseModel import expense_model
+from app.utils.pagination import encode_cursor
+
+
+def _add(client, auth, title, **fields):
+    body = {"title": title, "amount": 5, "category": "Food", "date": "2026-03-10", **fields}
+    status, payload, _ = client.request("POST", "/api/expenses/add", headers=auth, json=body)
+    assert status == 201, payload
+    return payload["expense"]["_id"]
+
+
+def _changes(client, auth, since=None, limit=None):
+    params = [f"since={since}"] if since else []
+    params += [f"limit={limit}"] if limit else []
+    status, payload, _ = client.request("GET", "/api/expenses/changes?" + "&".join(params), headers=auth)
+    assert status == 200, payload
+    return payload
+
+
+def _walk(client, auth, since=None, limit=None):
+    """Follows next_since while has_more; returns ({id: title}, [deleted ids], last next_since)."""
+    changes, deleted = {}, []
+    while True:
+        page = _changes(client, auth, since, limit)
+        for e in page["changes"]:
+            assert e["_id"] not in changes, "row delivered twice within one walk"
+            changes[e["_id"]] = e["title"]
+        deleted += page["deleted"]
+        since = page["next_since"]
+        if not page["has_more"]:
+            return changes, deleted, since
+
+
+def test_create_update_delete_since(client, flask_app, auth, other_auth):
+    kept = _add(client, auth, "Lunch")
+    initial, deleted, since = _walk(client, auth)
+    assert initial == {kept: "Lunch"} and deleted == []
+
+    created = _add(client, auth, "Bus")
+    gone = _add(client, auth, "Film")
+    _add(client, other_auth, "Not mine")
+    c = flask_app.test_client()
+    assert c.put(f"/api/expenses/{created}", json={"title": "Train"}, headers=auth).status_code == 200
+    assert c.delete(f"/api/expenses/{gone}", headers=auth).status_code == 200
+
+    changes, deleted, _ = _walk(client, auth, since)
+    # the safety window may re-deliver Lunch; everything else shows up exactly as it ends up
+    assert changes.get(created) == "Train"
+    assert gone not in changes and deleted == [gone]
+    assert set(changes) <= {kept, created}
+
+
+def test_keyset_pages_across_tombstones(client, flask_app, auth):
+    _, _, since = _walk(client, auth)
+    ids = [_add(client, auth, f"e{i}") for i in range(7)]
+    c = flask_app.test_client()
+    for eid in ids[1::2]:
+        assert c.delete(f"/api/expenses/{eid}", headers=auth).status_code == 200
+
+    changes, deleted, _ = _walk(client, auth, since, limit=2)
+    assert set(changes) == set(ids[::2])
+    assert sorted(deleted) == sorted(ids[1::2])
+
+
+def test_safety_window(client, auth, monkeypatch):
+    eid = _add(client, auth, "Lunch")
+    _, _, since = _walk(client, auth)
+    # caught up: next_since trails the clock, so a just-written row comes back once more
+    assert eid in _walk(client, auth, since)[0]
+
+    monkeypatch.setattr(expense_model, "CHANGES_SAFETY_SECONDS", 0)
+    _, _, since = _walk(client, auth)
+    assert _walk(client, auth, since)[0] == {}
+
+
+def test_expired_and_invalid_tokens(client, auth):
+    old = datetime.utcnow() - timedelta(seconds=expense_model.TOMBSTONE_TTL_SECONDS + 60)
+    status, payload, _ = client.request(
+        "GET", f"/api/expenses/changes?since={encode_cursor(old, ObjectId())}", headers=auth
+    )
+    assert status == 410 and payload["success"] is False
+
+    # the stamp of when the sync started decides, not the row key
+    stale = encode_cursor(datetime.utcnow(), ObjectId(), issued_at=old)
+    status, _, _ = client.request("GET", f"/api/expenses/changes?since={stale}", headers=auth)
+    assert status == 410
+    fresh = encode_cursor(old - timedelta(days=365), ObjectId(), issued_at=datetime.utcnow())
+    _changes(client, auth, fresh)
+
+    status, _, _ = client.request("GET", "/api/expenses/changes?since=garbage", headers=auth)
+    assert status == 400
+
+
+def test_v1_string_timestamps_page_before_dates(client, flask_app, auth):
+    # v1 documents store updatedAt as an isoformat string, which Mongo sorts before every date;
+    # these are older than tombstone retention, which must not cut the initial sync short
+    db = get_db(flask_app)
+    v1 = [
+        {"userEmail": "user@example.com", "title": f"old{i}", "amount": 2.5, "category": "Food",
+         "date": "2025-01-0{}".format(i + 1), "notes": "", "createdAt": f"2025-01-0{i + 1}T10:00:00",
+         "updatedAt": f"2025-01-0{i + 1}T10:00:00"}
+        for i in range(3)
+    ]
+    v1_ids = [str(i) for i in db["expenses"].insert_many(v1).inserted_ids]
+    v2_ids = [_add(client, auth, f"new{i}") for i in range(2)]
+
+    status, first, _ = client.request("GET", "/api/expenses/changes?limit=2", headers=auth)
+    assert status == 200 and [e["_id"] for e in first["changes"]] == v1_ids[:2]
+
+    changes, _, _ = _walk(client, auth, limit=2)
+    assert list(changes) == v1_ids + v2_ids
@@ -0,0 +1,92 @@
+# tests/test_indexes.py
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+from app.db.indexes import (
+    INDEX_SCHEMA_VERSION,
+    INDEX_SPECS,
+    email_indexes_retired,
+    ensure_indexes,
+    get_applied_version,
+    retire_email_indexes,
+)
+from app.db.mongo import get_db
+from app.model.ownerModel.owner_model import EMAIL, UID, configure_owner_key
+
+
+def _names(db, collection):
+    return {idx["name"] for idx in db[collection].list_indexes()}
+
+
+@pytest.fixture
+def contracted():
+    configure_owner_key(read_key=UID, write_email=False)
+    yield
+    configure_owner_key(read_key=EMAIL, write_email=True)
+
+
+def test_both_owner_keys_indexed_before_contract(flask_app):
+    db = get_db(flask_app)
+    assert not email_indexes_retired(db)
+    assert {"idx_userEmail_date_desc_covering", "idx_uid_date_desc_covering"} <= _names(db, "expenses")
+    assert {"uniq_user_settings_partial", "uniq_uid_settings"} <= _names(db, "settings")
+
+
+def test_retire_requires_contract_settings(flask_app):
+    with pytest.raises(ValueError):
+        retire_email_indexes(get_db(flask_app))
+
+
+def test_retire_drops_email_led_indexes(flask_app, contracted):
+    db = get_db(flask_app)
+    changed = retire_email_indexes(db)
+    assert "-idx_userEmail_date_desc_covering" in changed["expenses"]
+    assert email_indexes_retired(db)
+
+    # a later forced reconcile keeps them dropped
+    ensure_indexes(db, force=True)
+    for collection, specs in INDEX_SPECS.items():
+        names = _names(db, collection)
+        for name, keys, _ in specs:
+            assert (name in names) == (keys[0][0] != "userEmail"), (collection, name)
+
+
+def test_replaced_index_is_built_before_the_old_one_is_dropped(flask_app):
+    db = get_db(flask_app)
+    expenses = db["expenses"]
+    expenses.drop_indexes()
+    # as created by an earlier release, under the name now retired
+    expenses.create_index([("userEmail", ASCENDING), ("date", DESCENDING)], name="idx_userEmail_date_desc")
+    dropped = []
+    drop_index = expenses.drop_index
+
+    def spy(name):
+        # the replacement already exists whenever an index is dropped
+        assert "idx_userEmail_date_desc_covering" in _names(db, "expenses")
+        dropped.append(name)
+        drop_index(name)
+
+    expenses.drop_index = spy
+    changed = ensure_indexes(db, force=True)
+    del expenses.drop_index
+    assert "idx_userEmail_date_desc_covering" in changed["expenses"]
+    assert "-idx_userEmail_date_desc" in changed["expenses"]
+    assert dropped == ["idx_userEmail_date_desc"]
+
+
+def test_drifted_index_is_left_alone_at_startup(flask_app):
+    db = get_db(flask_app)
+    db["_meta"].delete_many({})
+    settings = db["settings"]
+    settings.drop_index("uniq_uid_settings")
+    settings.create_index([("uid", ASCENDING)], name="uniq_uid_settings")  # not unique, not partial
+
+    changed = ensure_indexes(db)
+    assert "!uniq_uid_settings" in changed["settings"]
+    assert "unique" not in settings.index_information()["uniq_uid_settings"]
+    assert get_applied_version(db) is None  # reported again on the next start
+
+    changed = ensure_indexes(db, rebuild=True)
+    assert changed["settings"] == ["uniq_uid_settings"]
+    assert settings.index_information()["uniq_uid_settings"]["unique"]
+    assert get_applied_version(db) == INDEX_SCHEMA_VERSION
@@ -0,0 +1,86 @@
+# tests/test_instrumentation.py
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.dashboard import configure_dashboard_pool, load_sections
+from app.utils.instrumentation import CommandTimingListener, Metrics, _request_commands
+
+
+def test_section_commands_count_toward_the_request():
+    listener = CommandTimingListener(Metrics())
+    event = SimpleNamespace(command_name="find", duration_micros=1000)
+
+    def loader(value):
+        def fn():
+            for _ in range(500):
+                listener.succeeded(event)
+            return value
+        return fn
+
+    acc = [0, 0.0]
+    token = _request_commands.set(acc)
+    try:
+        out = load_sections({name: loader(name) for name in ("a", "b", "c", "d")})
+    finally:
+        _request_commands.reset(token)
+
+    assert list(out.items()) == [("a", "a"), ("b", "b"), ("c", "c"), ("d", "d")]
+    assert acc[0] == 2000
+    assert round(acc[1], 6) == 2.0
+
+
+def test_sections_outside_a_request():
+    assert load_sections({"a": lambda: 1, "b": lambda: 2}) == {"a": 1, "b": 2}
+
+
+def test_failing_section_waits_for_the_others():
+    listener = CommandTimingListener(Metrics())
+    event = SimpleNamespace(command_name="find", duration_micros=1000)
+    started, finished = threading.Event(), []
+
+    def slow():
+        started.set()
+        time.sleep(0.2)
+        for _ in range(10):
+            listener.succeeded(event)
+        finished.append(True)
+
+    def broken():
+        assert started.wait(5)
+        raise RuntimeError("boom")
+
+    acc = [0, 0.0]
+    token = _request_commands.set(acc)
+    try:
+        with pytest.raises(RuntimeError):
+            load_sections({"slow": slow, "broken": broken})
+    finally:
+        _request_commands.reset(token)
+
+    # the error surfaces only once the running section is done, and its commands still count
+    assert finished == [True]
+    assert acc[0] == 10
+
+
+def test_failing_section_cancels_queued_sections():
+    configure_dashboard_pool(workers=1)
+    started, ran = threading.Event(), []
+
+    def first():
+        started.set()
+        time.sleep(0.1)
+
+    def broken():
+        assert started.wait(5)
+        raise RuntimeError("boom")
+
+    try:
+        with pytest.raises(RuntimeError):
+            load_sections({"first": first, "queued": lambda: ran.append(True), "broken": broken})
+    finally:
+        configure_dashboard_pool(workers=4)
+    time.sleep(0.2)
+    assert ran == []
@@ -0,0 +1,180 @@
+# tests/test_modes.py
+"""
+The routes both serving modes implement, with identical assertions for each
+(`client` runs every test once against Flask and once against Quart).
+"""
+import pytest
+
+
+@pytest.fixture
+def seeded(flask_app, auth):
+    # budgets are created through the Flask app; only reads are served by both modes
+    c = flask_app.test_client()
+    assert c.post("/api/budgets/add", json={"month": "2026-03", "amount": 500}, headers=auth).status_code == 201
+    return auth
+
+
+def _add(client, auth, **fields):
+    body = {"title": "Lunch", "amount": 12.5, "category": "Food", "date": "2026-03-10", **fields}
+    status, payload, _ = client.request("POST", "/api/expenses/add", headers=auth, json=body)
+    assert status == 201, payload
+    return payload["expense"]
+
+
+def test_health(client):
+    status, payload, _ = client.request("GET", "/api/health")
+    assert status == 200
+
+
+@pytest.mark.parametrize("path", ["/api/expenses", "/api/budgets", "/api/settings/categories", "/api/dashboard"])
+def test_requires_auth(client, path):
+    status, payload, _ = client.request("GET", path)
+    assert status == 401
+    assert payload["success"] is False
+
+
+def _revoke_elsewhere(flask_app, auth):
+    # revoked by another worker: only the shared collection knows
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.mongo import get_db
+    from app.utils.auth import REVOKED_COLLECTION, token_digest
+
+    now = datetime.now(timezone.utc)
+    get_db(flask_app)[REVOKED_COLLECTION].insert_one({
+        "_id": token_digest(auth["Authorization"].split(" ", 1)[1]),
+        "revokedAt": now,
+        "expiresAt": now + timedelta(hours=1),
+    })
+
+
+def test_revocation_reaches_cached_tokens_on_next_pull(client, flask_app, auth, monkeypatch):
+    from app.utils import auth as auth_utils
+
+    assert client.request("GET", "/api/expenses", headers=auth)[0] == 200  # claims cached, revocations pulled
+    monkeypatch.setitem(auth_utils._revocations, "next", float("inf"))
+    _revoke_elsewhere(flask_app, auth)
+    # cache hits trust the last pull...
+    assert client.request("GET", "/api/expenses", headers=auth)[0] == 200
+    # ...until the next one
+    monkeypatch.setitem(auth_utils._revocations, "next", 0.0)
+    assert client.request("GET", "/api/expenses", headers=auth)[0] == 401
+
+
+def test_revocation_checked_on_cache_miss(client, flask_app, auth, monkeypatch):
+    from app.utils import auth as auth_utils
+
+    assert client.request("GET", "/api/expenses", headers=auth)[0] == 200
+    monkeypatch.setitem(auth_utils._revocations, "next", float("inf"))
+    _revoke_elsewhere(flask_app, auth)
+    auth_utils._claims_cache.clear()
+    assert client.request("GET", "/api/expenses", headers=auth)[0] == 401
+
+
+def test_add_and_list_expenses(client, auth, other_auth):
+    _add(client, auth)
+    _add(client, auth, title="Bus", amount=3, category="Transport", date="2026-04-01")
+
+    status, payload, _ = client.request("GET", "/api/expenses?month=2026-03", headers=auth)
+    assert status == 200
+    assert [e["title"] for e in payload["expenses"]] == ["Lunch"]
+    assert payload["expenses"][0]["amount"] == 12.5
+
+    status, payload, _ = client.request("GET", "/api/expenses?category=Transport", headers=auth)
+    assert [e["title"] for e in payload["expenses"]] == ["Bus"]
+
+    status, payload, _ = client.request("GET", "/api/expenses", headers=other_auth)
+    assert payload["expenses"] == []
+
+
+def test_add_expense_validation(client, auth):
+    body = {"title": "x", "amount": 1, "category": "Nope", "date": "2026-03-01"}
+    status, payload, _ = client.request("POST", "/api/expenses/add", headers=auth, json=body)
+    assert status == 400
+    status, _, _ = client.request("GET", "/api/expenses?month=2026-13", headers=auth)
+    assert status == 400
+
+
+def test_summary_includes_budget(client, seeded):
+    _add(client, seeded)
+    _add(client, seeded, amount=7.5)
+    status, payload, _ = client.request("GET", "/api/expenses/summary?month=2026-03", headers=seeded)
+    assert status == 200
+    summary = payload["summary"]
+    assert summary["total"] == 20.0
+    assert summary["count"] == 2
+    assert summary["budget"] == {"total": 500.0, "spent": 20.0, "remaining": 480.0, "exceeded": False}
+
+
+def test_budgets_and_categories(client, seeded):
+    status, payload, _ = client.request("GET", "/api/budgets", headers=seeded)
+    assert status == 200
+    assert [(b["month"], b["amount"]) for b in payload["budgets"]] == [("2026-03", 500.0)]
+
+    status, payload, _ = client.request("GET", "/api/settings/categories", headers=seeded)
+    assert status == 200
+    assert [c["name"] for c in payload["categories"]] == ["Bills", "Food", "Health", "Other", "Shopping", "Transport"]
+
+
+def _write_expense(c, auth):
+    body = {"title": "x", "amount": 1, "category": "Food", "date": "2026-03-02"}
+    return c.post("/api/expenses/add", json=body, headers=auth)
+
+
+def _write_budget(c, auth):
+    return c.post("/api/budgets/add", json={"month": "2026-04", "amount": 1}, headers=auth)
+
+
+def _write_category(c, auth):
+    return c.post("/api/settings/categories", json={"name": "Pets"}, headers=auth)
+
+
+@pytest.mark.parametrize(
+    "path,write",
+    [
+        ("/api/expenses?month=2026-03", _write_expense),
+        ("/api/budgets", _write_budget),
+        ("/api/settings/categories", _write_category),
+    ],
+)
+def test_conditional_get(flask_app, client, seeded, path, write):
+    status, _, headers = client.request("GET", path, headers=seeded)
+    etag = headers["ETag"]
+    assert status == 200 and etag
+
+    status, _, _ = client.request("GET", path, headers={**seeded, "If-None-Match": etag})
+    assert status == 304
+
+    # writes go through the Flask app (the async app serves reads and expense adds only)
+    assert write(flask_app.test_client(), seeded).status_code == 201
+    status, _, _ = client.request("GET", path, headers={**seeded, "If-None-Match": etag})
+    assert status == 200
+
+
+def test_etags_match_across_modes(flask_app, client, seeded):
+    # switching serving modes must not invalidate a client's cache
+    _, _, headers = client.request("GET", "/api/expenses?month=2026-03", headers=seeded)
+    flask_etag = flask_app.test_client().get("/api/expenses?month=2026-03", headers=seeded).headers["ETag"]
+    assert headers["ETag"] == flask_etag
+
+
+def test_dashboard_sections(client, seeded):
+    _add(client, seeded)
+    status, payload, headers = client.request("GET", "/api/dashboard?month=2026-03", headers=seeded)
+    assert status == 200
+    assert len(payload["expenses"]) == 1
+    assert len(payload["budgets"]) == 1
+    assert len(payload["categories"]) == 6
+    assert payload["unchanged"] == []
+
+    path = "/api/dashboard?month=2026-03"
+    status, _, _ = client.request("GET", path, headers={**seeded, "If-None-Match": headers["ETag"]})
+    assert status == 304
+
+    held = ", ".join(f'W/"{tag}"' for name, tag in payload["etags"].items() if name != "expenses")
+    _add(client, seeded, date="2026-03-11")
+    status, payload, _ = client.request("GET", path, headers={**seeded, "If-None-Match": held})
+    assert status == 200
+    assert payload["unchanged"] == ["budgets", "categories"]
+    assert payload["budgets"] is None and payload["categories"] is None
+    assert len(payload["expenses"]) == 2
@@ -0,0 +1,19 @@
+# tests/test_mongo.py
+from app.config import Config
+from app.db.mongo import client_options
+
+
+def _config(**overrides):
+    return {**{k: getattr(Config, k) for k in dir(Config) if k.isupper()}, **overrides}
+
+
+def test_unset_pool_options_keep_driver_defaults():
+    opts = client_options(_config(
+        MONGO_MAX_POOL_SIZE=None, MONGO_MIN_POOL_SIZE=None, MONGO_MAX_IDLE_TIME_MS=None, MONGO_WAIT_QUEUE_TIMEOUT_MS=None
+    ))
+    assert not {"maxPoolSize", "minPoolSize", "maxIdleTimeMS", "waitQueueTimeoutMS"} & set(opts)
+
+
+def test_pool_options_from_config():
+    opts = client_options(_config(MONGO_MAX_POOL_SIZE=20, MONGO_WAIT_QUEUE_TIMEOUT_MS=2000))
+    assert opts["maxPoolSize"] == 20 and opts["waitQueueTimeoutMS"] == 2000
@@ -0,0 +1,104 @@
+# tests/test_owner_key.py
+"""
+The owner key cutover run through backfill_owner_uid (uid backfill, then drop-email)
+over documents inserted directly, and the batch jobs that keep bumping data_versions
+once documents only carry `uid`.
+"""
+import pytest
+
+from app.db.mongo import get_db
+from app.model.expenseModel.expense_model import backfill_search_terms, migrate_expenses_v2
+from app.model.ownerModel.owner_model import EMAIL, UID, backfill_owner_uid, configure_owner_key
+
+USER = "user@example.com"
+
+
+@pytest.fixture
+def contracted():
+    configure_owner_key(read_key=UID, write_email=False)
+    yield
+    configure_owner_key(read_key=EMAIL, write_email=True)
+
+
+def _legacy(email, title, date="2026-03-02"):
+    # v1, written before `uid` and `terms` existed
+    return {"userEmail": email, "title": title, "amount": 4.5, "category": "Food", "date": date,
+            "notes": "", "createdAt": f"{date}T09:00:00", "updatedAt": f"{date}T09:00:00"}
+
+
+def _expenses_version(db, email=USER):
+    return (db["data_versions"].find_one({"_id": email}) or {}).get("expenses", 0)
+
+
+def test_backfill_uid_resumes_and_counts_orphans(flask_app, auth):
+    db = get_db(flask_app)
+    col = db["expenses"]
+    uid = db["users"].find_one({"email": USER})["_id"]
+    col.insert_many([_legacy(USER, "a"), _legacy("ghost@example.com", "orphan"), _legacy(USER, "b"), _legacy(USER, "c")])
+
+    bulk_write = col.bulk_write
+    calls = []
+
+    def fail_second(ops, **kwargs):
+        calls.append(len(ops))
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return bulk_write(ops, **kwargs)
+
+    col.bulk_write = fail_second
+    try:
+        with pytest.raises(RuntimeError):
+            backfill_owner_uid(db, collections=("expenses",), batch_size=2)
+    finally:
+        col.bulk_write = bulk_write
+    assert col.count_documents({"uid": uid}) == 1
+
+    stats = backfill_owner_uid(db, collections=("expenses",), batch_size=2)["expenses"]
+    # only the batch after the checkpoint is rescanned
+    assert stats == {"scanned": 2, "updated": 2, "orphans": 0}
+    assert col.count_documents({"uid": uid}) == 3
+
+    stats = backfill_owner_uid(db, collections=("expenses",), batch_size=2, restart=True)["expenses"]
+    assert stats == {"scanned": 1, "updated": 0, "orphans": 1}
+    assert "uid" not in col.find_one({"title": "orphan"})
+
+
+def test_drop_email_needs_contract_then_keeps_orphans(flask_app, auth, contracted):
+    db = get_db(flask_app)
+    col = db["expenses"]
+    col.insert_many([_legacy(USER, "a"), _legacy("ghost@example.com", "orphan")])
+
+    configure_owner_key(write_email=True)
+    with pytest.raises(ValueError):
+        backfill_owner_uid(db, collections=("expenses",), drop_email=True)
+    configure_owner_key(write_email=False)
+
+    backfill_owner_uid(db, collections=("expenses",))
+    stats = backfill_owner_uid(db, collections=("expenses",), drop_email=True)["expenses"]
+    assert stats == {"scanned": 1, "updated": 1, "orphans": 0}
+    assert "userEmail" not in col.find_one({"title": "a"})
+    assert col.find_one({"title": "orphan"})["userEmail"] == "ghost@example.com"
+
+
+def test_batch_jobs_bump_versions_after_drop_email(flask_app, auth, contracted):
+    db = get_db(flask_app)
+    col = db["expenses"]
+    col.insert_many([_legacy(USER, "a"), _legacy(USER, "b", "2026-03-05")])
+    backfill_owner_uid(db, collections=("expenses",))
+    backfill_owner_uid(db, collections=("expenses",), drop_email=True)
+    assert col.count_documents({"userEmail": {"$exists": True}}) == 0
+
+    # cached list ETags must expire even though the documents no longer name the user
+    before = _expenses_version(db)
+    assert backfill_search_terms(col, meta_col=db["_meta"])["updated"] == 2
+    after_terms = _expenses_version(db)
+    assert after_terms > before
+
+    stats = migrate_expenses_v2(col, meta_col=db["_meta"], userEmail=USER)
+    assert stats["upgraded"] == 2
+    assert _expenses_version(db) > after_terms
+
+    # the per-user run finds the user's documents by uid
+    c = flask_app.test_client()
+    r = c.get("/api/expenses?month=2026-03", headers=auth)
+    assert [e["title"] for e in r.get_json()["expenses"]] == ["b", "a"]
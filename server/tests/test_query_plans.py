@@ -0,0 +1,29 @@
+# tests/test_query_plans.py
+"""
+`flask check-query-plans` as tests. explain() needs a real mongod, so these are
+skipped unless TEST_MONGO_URI is set (see conftest.py).
+"""
+import os
+
+import pytest
+
+from app.db.mongo import get_db
+from app.db.query_plans import check_query_plans
+from app.model.ownerModel.owner_model import EMAIL, UID, configure_owner_key
+from bench.seed import seed
+
+pytestmark = pytest.mark.skipif(not os.getenv("TEST_MONGO_URI"), reason="explain needs a mongod (set TEST_MONGO_URI)")
+
+
+@pytest.mark.parametrize("owner_key", [EMAIL, UID])
+def test_hot_queries_use_their_indexes(flask_app, owner_key):
+    db = get_db(flask_app)
+    (email, _), _ = seed(db, users=2, expenses_per_user=2000, log=lambda *a: None)
+    configure_owner_key(read_key=owner_key)
+    try:
+        results = check_query_plans(db, userEmail=email, limit=50)
+    finally:
+        configure_owner_key(read_key=EMAIL)
+
+    assert results
+    assert {r["name"]: r["problems"] for r in results if r["problems"]} == {}
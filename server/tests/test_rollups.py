@@ -0,0 +1,75 @@
+# tests/test_rollups.py
+from app.db.mongo import get_db
+from app.model.rollupModel.rollup_model import get_rollups, rebuild_rollups, verify_rollups
+
+
+def test_totals_are_exact_minor_units(flask_app, auth):
+    c = flask_app.test_client()
+    ids = []
+    for _ in range(30):
+        r = c.post(
+            "/api/expenses/add",
+            json={"title": "Gum", "amount": 0.1, "category": "Food", "date": "2026-03-01"},
+            headers=auth,
+        )
+        ids.append(r.get_json()["expense"]["_id"])
+    for eid in ids[:10]:
+        assert c.put(f"/api/expenses/{eid}", json={"amount": 0.7}, headers=auth).status_code == 200
+    for eid in ids[10:15]:
+        assert c.delete(f"/api/expenses/{eid}", headers=auth).status_code == 200
+
+    db = get_db(flask_app)
+    bucket = db["expense_rollups"].find_one({"category": "Food"})
+    assert bucket["totalMinor"] == 10 * 70 + 15 * 10
+    assert "total" not in bucket
+    assert verify_rollups(db["expenses"], db["expense_rollups"]) == []
+    assert get_rollups(db["expense_rollups"], userEmail="user@example.com")[0]["total"] == 8.5
+
+
+def test_legacy_float_buckets(flask_app, auth):
+    c = flask_app.test_client()
+    c.post("/api/expenses/add", json={"title": "a", "amount": 2.2, "category": "Food", "date": "2026-03-01"}, headers=auth)
+    db = get_db(flask_app)
+    rollups = db["expense_rollups"]
+    # as written by a release that stored float totals
+    rollups.update_one({"category": "Food"}, {"$set": {"total": 2.2}, "$unset": {"totalMinor": ""}})
+    c.post("/api/expenses/add", json={"title": "b", "amount": 1.1, "category": "Food", "date": "2026-03-02"}, headers=auth)
+
+    assert get_rollups(rollups, userEmail="user@example.com")[0]["total"] == 3.3
+    assert verify_rollups(db["expenses"], rollups) == []
+
+    rebuild_rollups(db["expenses"], rollups)
+    bucket = rollups.find_one({"category": "Food"})
+    assert bucket["totalMinor"] == 330 and "total" not in bucket
+
+
+def test_category_fold_keeps_concurrent_deltas(flask_app, auth):
+    from app.model.expenseModel.expense_schema import to_minor
+    from app.model.rollupModel.rollup_model import rollup_add, rollup_move_category
+
+    db = get_db(flask_app)
+    rollups = db["expense_rollups"]
+    doc = {"userEmail": "user@example.com", "date": "2026-03-01", "category": "Coffee", "amountMinor": to_minor(4)}
+    rollup_add(rollups, [doc, {**doc, "date": "2026-04-01"}])
+
+    # a create validated before the rename lands on a source bucket mid-fold
+    find_one_and_delete = rollups.find_one_and_delete
+    late = []
+
+    def racing(flt, *args, **kwargs):
+        taken = find_one_and_delete(flt, *args, **kwargs)
+        if not late:
+            late.append(doc)
+            rollup_add(rollups, [doc])
+        return taken
+
+    rollups.find_one_and_delete = racing
+    try:
+        rollup_move_category(rollups, userEmail="user@example.com", sources=["Coffee"], target="Food")
+    finally:
+        del rollups.find_one_and_delete
+
+    buckets = {(b["month"], b["category"]): (b["totalMinor"], b["count"]) for b in rollups.find()}
+    total = sum(t for t, _ in buckets.values())
+    assert total == 3 * 400 and sum(n for _, n in buckets.values()) == 3
+    assert buckets[("2026-04", "Food")] == (400, 1)
@@ -0,0 +1,141 @@
+# tests/test_schema_v2.py
+"""
+Legacy v1 expenses (string date/timestamps, float amount, no `v`) inserted directly:
+dual-read listing and summaries, the upgrade-on-edit in _patch_expense, and
+migrate_expenses_v2 with its checkpoint.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.db.mongo import get_db
+from app.model.expenseModel import expense_model
+from app.model.expenseModel.expense_schema import SCHEMA_VERSION, configure_expense_schema, date_range_filter
+
+EMAIL = "user@example.com"
+
+
+def _v1(title, date, amount, category="Food"):
+    return {
+        "userEmail": EMAIL, "title": title, "amount": amount, "category": category, "date": date,
+        "notes": "", "createdAt": f"{date}T09:00:00", "updatedAt": f"{date}T09:00:00",
+    }
+
+
+@pytest.fixture
+def v1_ids(flask_app):
+    col = get_db(flask_app)["expenses"]
+    docs = [
+        _v1("Old lunch", "2026-03-02", 12.1),
+        _v1("Old taxi", "2026-03-20", 7.45, "Transport"),
+        _v1("February", "2026-02-27", 3.0),
+    ]
+    return [str(i) for i in col.insert_many(docs).inserted_ids]
+
+
+@pytest.fixture
+def dual_read():
+    yield
+    configure_expense_schema(dual_read=True)
+
+
+def test_date_range_filter_covers_both_representations(dual_read):
+    f = date_range_filter("2026-03-01", "2026-03-31")
+    v2, v1 = f["$or"]
+    assert v2["date"] == {"$gte": datetime(2026, 3, 1), "$lte": datetime(2026, 3, 31)}
+    assert v1["date"] == {"$gte": "2026-03-01", "$lte": "2026-03-31"}
+
+    configure_expense_schema(dual_read=False)
+    assert date_range_filter("2026-03-01", "2026-03-31") == {"date": v2["date"]}
+
+
+def test_list_and_summary_mix_v1_and_v2(client, auth, v1_ids):
+    body = {"title": "New lunch", "amount": 0.2, "category": "Food", "date": "2026-03-10"}
+    status, _, _ = client.request("POST", "/api/expenses/add", headers=auth, json=body)
+    assert status == 201
+
+    status, payload, _ = client.request("GET", "/api/expenses?month=2026-03", headers=auth)
+    assert status == 200
+    # Mongo sorts BSON dates above strings, so until the migration v2 rows list first
+    assert [(e["title"], e["date"], e["amount"]) for e in payload["expenses"]] == [
+        ("New lunch", "2026-03-10", 0.2),
+        ("Old taxi", "2026-03-20", 7.45),
+        ("Old lunch", "2026-03-02", 12.1),
+    ]
+
+    # cursor paging crosses from the v2 rows into the v1 strings without gaps
+    titles, cursor = [], ""
+    while cursor is not None:
+        status, payload, _ = client.request("GET", f"/api/expenses?month=2026-03&limit=1&cursor={cursor}", headers=auth)
+        assert status == 200
+        titles += [e["title"] for e in payload["expenses"]]
+        cursor = payload["next_cursor"]
+    assert titles == ["New lunch", "Old taxi", "Old lunch"]
+
+    status, payload, _ = client.request("GET", "/api/expenses/summary?month=2026-03", headers=auth)
+    assert status == 200
+    summary = payload["summary"]
+    assert (summary["total"], summary["count"]) == (19.75, 3)  # exact in cents: 12.10 + 7.45 + 0.20
+    assert {c["category"]: c["total"] for c in summary["byCategory"]} == {"Food": 12.3, "Transport": 7.45}
+    assert [d["date"] for d in summary["byDay"]] == ["2026-03-02", "2026-03-10", "2026-03-20"]
+
+
+def test_edit_upgrades_v1_in_the_same_write(flask_app, auth, v1_ids):
+    c = flask_app.test_client()
+    r = c.put(f"/api/expenses/{v1_ids[0]}", json={"title": "Lunch"}, headers=auth)
+    assert r.status_code == 200
+
+    doc = get_db(flask_app)["expenses"].find_one({"title": "Lunch"})
+    assert doc["v"] == SCHEMA_VERSION and "amount" not in doc
+    assert doc["amountMinor"] == 1210
+    assert doc["date"] == datetime(2026, 3, 2)
+    assert doc["createdAt"] == datetime(2026, 3, 2, 9)
+    assert isinstance(doc["updatedAt"], datetime) and doc["updatedAt"] > doc["createdAt"]
+
+    # an edit that moves the date lands on the v2 representation too
+    r = c.put(f"/api/expenses/{v1_ids[1]}", json={"date": "2026-04-01", "amount": 8}, headers=auth)
+    assert r.status_code == 200
+    doc = get_db(flask_app)["expenses"].find_one({"title": "Old taxi"})
+    assert (doc["v"], doc["date"], doc["amountMinor"]) == (SCHEMA_VERSION, datetime(2026, 4, 1), 800)
+
+
+def test_migrate_v2_resumes_from_checkpoint(flask_app, auth, v1_ids, dual_read):
+    db = get_db(flask_app)
+    col = db["expenses"]
+    col.insert_one(_v1("Broken", "not-a-date", 1.0))
+    before = (db["data_versions"].find_one({"_id": EMAIL}) or {}).get("expenses", 0)
+
+    # an interrupted run: the first batch is checkpointed, the second never happens
+    bulk_write = col.bulk_write
+    calls = []
+
+    def fail_second(ops, **kwargs):
+        calls.append(len(ops))
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return bulk_write(ops, **kwargs)
+
+    col.bulk_write = fail_second
+    try:
+        with pytest.raises(RuntimeError):
+            expense_model.migrate_expenses_v2(col, meta_col=db["_meta"], batch_size=2)
+    finally:
+        col.bulk_write = bulk_write
+    assert col.count_documents({"v": SCHEMA_VERSION}) == 2
+
+    stats = expense_model.migrate_expenses_v2(col, meta_col=db["_meta"], batch_size=2)
+    # resumed after the checkpointed batch: the other v1 row plus the unparseable one
+    assert stats["scanned"] == 2 and stats["upgraded"] == 1 and stats["errors"] == 1
+    assert col.count_documents({"v": SCHEMA_VERSION}) == 3
+    assert col.find_one({"title": "Broken"}).get("v") is None
+    assert db["data_versions"].find_one({"_id": EMAIL})["expenses"] > before
+
+    stats = expense_model.migrate_expenses_v2(col, meta_col=db["_meta"], batch_size=2, restart=True)
+    assert (stats["scanned"], stats["upgraded"], stats["errors"]) == (1, 0, 1)
+
+    # once migrated, the v2-only read path still sees every row
+    col.delete_one({"title": "Broken"})
+    configure_expense_schema(dual_read=False)
+    c = flask_app.test_client()
+    titles = [e["title"] for e in c.get("/api/expenses?from=2026-02-01&to=2026-03-31", headers=auth).get_json()["expenses"]]
+    assert titles == ["Old taxi", "Old lunch", "February"]
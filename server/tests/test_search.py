@@ -0,0 +1,32 @@
+# tests/test_search.py
+from app.db.mongo import get_db
+
+
+def _titles(c, auth, q):
+    r = c.get(f"/api/expenses?q={q}", headers=auth)
+    assert r.status_code == 200
+    return [e["title"] for e in r.get_json()["expenses"]]
+
+
+def test_edit_updates_terms_in_the_same_write(flask_app, auth):
+    c = flask_app.test_client()
+    body = {"title": "Groceries", "amount": 20, "category": "Food", "date": "2026-03-01", "notes": "weekly market"}
+    eid = c.post("/api/expenses/add", json=body, headers=auth).get_json()["expense"]["_id"]
+    assert _titles(c, auth, "gro") == ["Groceries"]
+
+    col = get_db(flask_app)["expenses"]
+    update_one = col.update_one
+    col.update_one = lambda *a, **k: (_ for _ in ()).throw(AssertionError("terms need a second write"))
+    try:
+        assert c.put(f"/api/expenses/{eid}", json={"title": "Pharmacy"}, headers=auth).status_code == 200
+        assert c.put(f"/api/expenses/{eid}", json={"amount": 25}, headers=auth).status_code == 200
+    finally:
+        col.update_one = update_one
+
+    assert _titles(c, auth, "gro") == []
+    assert _titles(c, auth, "pharm") == ["Pharmacy"]
+    assert _titles(c, auth, "weekly mark") == ["Pharmacy"]  # untouched notes keep their words
+
+    assert c.put(f"/api/expenses/{eid}", json={"notes": "cold medicine"}, headers=auth).status_code == 200
+    assert _titles(c, auth, "weekly") == []
+    assert _titles(c, auth, "pharmacy cold") == ["Pharmacy"]